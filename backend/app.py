@@ -1,17 +1,74 @@
 import os
-import tempfile
+import io
 import json
-import re
+import hashlib
+import tempfile
+import time
+from contextlib import ExitStack
 from datetime import datetime
-from flask import Flask, request, jsonify
+from threading import BoundedSemaphore
+from flask import Flask, Request, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-import fitz  # PyMuPDF
 from dotenv import load_dotenv
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.api_core.exceptions import FailedPrecondition
 
 # Load environment variables from .env file in the same directory
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
+# Most operations accepted by one POST /jobs/batch request
+JOBS_BATCH_MAX_OPERATIONS = int(os.getenv('JOBS_BATCH_MAX_OPERATIONS', 2000))
+
+# Largest page GET /jobs?limit= will return
+JOBS_PAGE_MAX_LIMIT = int(os.getenv('JOBS_PAGE_MAX_LIMIT', 500))
+
+# Most results GET /jobs/search will return
+JOBS_SEARCH_MAX_LIMIT = int(os.getenv('JOBS_SEARCH_MAX_LIMIT', 100))
+
+# Live job updates (GET /jobs/stream): each open stream holds a server thread,
+# so streams are capped and closed after a while (clients reconnect on their own)
+JOBS_STREAM_MAX_CLIENTS = int(os.getenv('JOBS_STREAM_MAX_CLIENTS', 16))
+JOBS_STREAM_MAX_SECONDS = float(os.getenv('JOBS_STREAM_MAX_SECONDS', 300))
+
+# Upload limits for estimate PDFs. Uploads up to PDF_SPOOL_MAX_BYTES are parsed
+# straight from memory; larger ones spill to a temp file that is mmapped instead.
+# Request bodies are capped while they stream in: PDF_MAX_UPLOAD_BYTES for a
+# single estimate, PDF_MAX_BATCH_BYTES in total for multi-file uploads (and
+# any other request).
+PDF_MAX_UPLOAD_BYTES = int(os.getenv('PDF_MAX_UPLOAD_BYTES', 40 * 1024 * 1024))
+PDF_MAX_BATCH_BYTES = int(os.getenv('PDF_MAX_BATCH_BYTES', 200 * 1024 * 1024))
+PDF_SPOOL_MAX_BYTES = int(os.getenv('PDF_SPOOL_MAX_BYTES', 8 * 1024 * 1024))
+
+# Room for multipart boundaries and headers around a single estimate
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Endpoints that take exactly one estimate upload
+SINGLE_UPLOAD_ENDPOINTS = {'analyze_pdf'}
+
+
+class UploadRequest(Request):
+    """
+    Request that keeps uploads in memory up to PDF_SPOOL_MAX_BYTES and caps
+    single-estimate bodies at PDF_MAX_UPLOAD_BYTES.
+    """
+
+    @property
+    def max_content_length(self):
+        if self.endpoint in SINGLE_UPLOAD_ENDPOINTS:
+            return PDF_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        size = content_length or total_content_length
+        if size is not None and size <= PDF_SPOOL_MAX_BYTES:
+            return io.BytesIO()
+        return tempfile.TemporaryFile('w+b')
+
+
 app = Flask(__name__)
+app.request_class = UploadRequest
+# Werkzeug rejects larger bodies with a 413 while reading them, chunked or not
+app.config['MAX_CONTENT_LENGTH'] = PDF_MAX_BATCH_BYTES
 
 # Configure CORS for production
 # In production, set ALLOWED_ORIGINS to your GitHub Pages URL
@@ -21,229 +78,352 @@ if allowed_origins != '*':
 else:
     origins = '*'
 
-CORS(app, origins=origins, supports_credentials=True)
+CORS(app, origins=origins, supports_credentials=True, expose_headers=['ETag', 'X-Partial-Job'])
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({'error': 'Upload too large'}), 413
 
 from database import (
-    get_all_jobs, get_job_by_id, create_job, update_job, delete_job,
+    get_all_jobs, get_jobs_page, get_job_changes, get_job_by_id, create_job, create_jobs_batch, update_job_with_update_time, delete_job,
+    get_job_with_update_time, get_jobs_version, get_job_stats, apply_job_operations,
+    get_job_events, new_sync_token, get_job_timeline, append_job_timeline, search_jobs,
+    add_job_item, update_job_item, delete_job_item,
+    archive_done_jobs, prune_tombstones, search_archived_jobs, get_archived_job, restore_archived_job,
+    get_jobs_by_vehicle, find_open_job_for_vehicle, vehicle_key, VEHICLE_KEY_FIELDS,
     get_all_insurance_cases, get_insurance_case_by_id, create_insurance_case, 
-    update_insurance_case, delete_insurance_case
+    update_insurance_case, delete_insurance_case,
+    get_insurance_case_with_update_time, get_insurance_cases_version, WriteConflict,
+    summarize_job, project_job, JOB_FIELDS, JOB_SUMMARY_FIELDS, JOB_STAGES, JOB_FLAGS
 )
-from auth import require_auth
+from auth import require_auth, require_stream_auth, get_current_user, issue_stream_ticket, STREAM_TICKET_TTL_SECONDS
+from extraction import pdf_buffer, EXTRACTION_MODES, UnsupportedEstimateFormat
+from extraction_pool import ExtractionTimeout, ExtractionPoolBusy
+from extraction_cache import extract_cached, extract_batch_cached, get_extraction_cache
+from extraction_tasks import get_extraction_tasks, TaskQueueFull
+from metrics import get_metrics
 
 
-def extract_from_mitchell_estimate(pdf_path):
+# --- Conditional request helpers ---
+# Single documents use their Firestore update_time as a strong ETag. Lists use a
+# hash of the collection's latest updated_at, its size and the query string.
+
+def document_etag(update_time):
+    """ETag for a document version (its update_time in RFC 3339 with nanoseconds)."""
+    return update_time.rfc3339() if update_time else None
+
+
+def list_etag(version):
+    """ETag for a list response, given the collection's (latest updated_at, count)."""
+    payload = json.dumps([list(version), request.query_string.decode()])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def not_modified(etag):
+    """A 304 response if If-None-Match already has this ETag, else None."""
+    if etag and request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_etag(response, etag):
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def updated_job_response(job, update_time, complete, status=200):
     """
-    Extract data from Mitchell Estimate PDF format.
-    This uses direct text extraction (no OCR needed for digital PDFs).
+    Response for a job write: the job with its new ETag. X-Partial-Job marks a
+    job that only holds the id and the written fields (no server-side counters
+    such as timeline_count); merge it, and refetch the job when those matter.
     """
-    doc = fitz.open(pdf_path)
-    full_text = ''
-    for page in doc:
-        full_text += page.get_text()
-    doc.close()
-    
-    lines = [l.strip() for l in full_text.split('\n') if l.strip()]
-    
-    result = {
-        'customer': {'name': '', 'phone': ''},
-        'vehicle': {'year': '', 'makeModel': '', 'plate': '', 'vin': ''},
-        'items': [],
-        'notes': ''
-    }
-    
-    # Extract VIN (17 character alphanumeric)
-    vin_match = re.search(r'VIN\s*\n?\s*([A-HJ-NPR-Z0-9]{17})', full_text)
-    if vin_match:
-        result['vehicle']['vin'] = vin_match.group(1)
-    
-    # Extract License Plate (format: XX-XXXXXXX, allowing spaces)
-    plate_match = re.search(r'License\s*\n?\s*([A-Z]{2}-[A-Z0-9 ]+)', full_text)
-    if plate_match:
-        result['vehicle']['plate'] = plate_match.group(1)
-    
-    # Extract Vehicle Description
-    makes_pattern = r'(Honda|Toyota|Ford|Chevrolet|Nissan|Hyundai|Kia|BMW|Mercedes-Benz|Mercedes|Audi|Lexus|Mazda|Subaru|Volkswagen|Jeep|Dodge|GMC|Ram|Acura|Infiniti|Volvo|Porsche|Land\s*Rover|Range\s*Rover|Cadillac|Lincoln|Buick|Chrysler|Tesla|Rivian|Lucid)'
-    
-    vehicle_match = re.search(r'((?:19|20)\d{2})\s+' + makes_pattern + r'\s+([^\n]+?)(?:\s+\d+\s*Door|\s+Van|\s+\d+\.\d+L)', full_text, re.IGNORECASE)
-    if vehicle_match:
-        result['vehicle']['year'] = vehicle_match.group(1)
-        make = vehicle_match.group(2).strip()
-        model_raw = vehicle_match.group(3).strip()
-        model = re.sub(r'\s+\d+["\']?\s*WB.*$', '', model_raw, flags=re.IGNORECASE).strip()
-        result['vehicle']['makeModel'] = f"{make} {model}"
-    
-    # Extract job descriptions
-    line_items_start = 0
-    for i, line in enumerate(lines):
-        if 'Line #' in line or 'Description' in line and 'Operation' in ' '.join(lines[max(0,i-1):i+2]):
-            line_items_start = i
-            break
-    
-    body_parts = [
-        'bumper', 'cover', 'grille', 'hood', 'fender', 'door', 'panel', 
-        'rocker', 'quarter', 'trunk', 'tailgate', 'mirror', 'lamp',
-        'garnish', 'molding', 'bracket', 'support', 'assembly', 'guard',
-        'handle', 'mudguard', 'wheel opening', 'belt', 'sensor', 'pump',
-        'glass', 'absorber', 'condenser', 'radiator', 'frame', 'plate',
-        'shield', 'lock', 'latch', 'hinge', 'regulator', 'motor', 'pillar'
-    ]
-    
-    exclude_terms = [
-        'automatic headlights', 'power door locks', 'power remote', 'power steering',
-        'power windows', 'heated mirror', 'lumbar support', 'daytime running', 
-        'tonneau cover', 'air conditioning', 'cruise control', 'steering wheel', 
-        'bluetooth', 'keyless', '4wd', 'awd', 'cyl gas', 'door utility', 'audio control'
-    ]
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if i < line_items_start:
-            i += 1
-            continue
-            
-        line_lower = line.lower()
-        if any(term in line_lower for term in exclude_terms):
-            i += 1
-            continue
-        
-        has_part = any(part in line_lower for part in body_parts) or \
-                   'air bag' in line_lower or \
-                   'seat belt' in line_lower or \
-                   'w/shield' in line_lower
-        
-        if not has_part:
-            i += 1
-            continue
-            
-        if line in ['Front Bumper', 'Front Fender', 'Front Door', 'Rear Bumper', 'Hood', 'Headlamps', 'Fog Lamps', 'Front Lamps', 'Grille', 'Seat Belts', 'Air Bags', 'Cooling', 'Radiator Support', 'Air Bag System']:
-            i += 1
-            continue
-            
-        if line in ['Garnish', 'Assembly', 'Support', 'Bracket']:
-            i += 1
-            continue
-        
-        search_range = lines[i:min(len(lines), i+5)]
-        search_text = ' '.join(search_range)
-        
-        job_type = None
-        if 'Blend' in search_text:
-            job_type = 'Blend'
-        elif 'Remove /' in search_text and 'Replace' in search_text:
-            job_type = 'Replace'
-        elif 'Repair' in search_text:
-            job_type = 'Repair'
-        
-        if job_type is None:
-            i += 1
-            continue
-        
-        desc = line.strip()
-        lines_consumed = 0
-        end_keywords = ['Remove', 'Replace', 'Blend', 'Refinish', 'Repair', 'Overhaul', 
-                       'Body', 'INC', 'Existing', 'Aftermarket', 'New', 'Yes', 'No']
-        
-        for kw in ['Remove /', 'Remove', 'Replace']:
-            if kw in desc:
-                desc = desc.split(kw)[0].strip()
-        
-        for j in range(i+1, min(len(lines), i+3)):
-            next_line = lines[j].strip()
-            if (not next_line or next_line in end_keywords or 
-                next_line.replace('.', '').replace('#', '').isdigit() or
-                any(next_line.startswith(kw) for kw in end_keywords)):
-                break
-            if len(next_line) > 2 and next_line[0].isupper():
-                desc = f"{desc} {next_line}"
-                lines_consumed += 1
-                break
-        
-        part_num_val = ''
-        if desc and len(desc) > 3 and desc not in ['AUTO', 'Body', 'INC', 'Inc', 'Existing']:
-            if job_type == 'Replace':
-                for k in range(i, min(len(lines), i+15)):
-                    line_k = lines[k].strip()
-                    if line_k in ['Body', 'Refinish', 'New', 'Aftermarket', 'Recycled', 'Existing', 'Remove /', 'Replace']:
-                        continue
-                    if line_k.replace('.', '').replace('#', '').replace('*', '').replace('$', '').isdigit():
-                        continue
-                        
-                    if len(line_k) >= 3 and re.match(r'^[A-Z0-9 -]+$', line_k) and any(c.isdigit() for c in line_k):
-                        if line_k not in ['Order', 'Labor', 'Total', 'Sublet', 'Notes']:
-                            part_num_val = line_k
-                            if k+1 < len(lines):
-                                next_p = lines[k+1].strip()
-                                if (re.match(r'^[A-Z0-9 -]+$', next_p) and len(next_p) < 15 and
-                                    not next_p.startswith('$') and not next_p.startswith('(') and
-                                    next_p not in ['Yes', 'No', 'New', 'Body', 'Refinish', '1', '2', '3']):
-                                    if not (len(next_p) <= 3 and next_p.isdigit()):
-                                        part_num_val = f"{part_num_val} {next_p}"
-                            break
-
-            result['items'].append({
-                'type': job_type,
-                'desc': desc,
-                'partNum': part_num_val,
-                'customTitle': ''
-            })
-            
-        i += 1 + lines_consumed
-    
-    seen = set()
-    unique_items = []
-    for item in result['items']:
-        key = (item['type'], item['desc'].lower())
-        if key not in seen:
-            seen.add(key)
-            unique_items.append(item)
-    result['items'] = unique_items
-    return result
+    response = with_etag(jsonify(job), document_etag(update_time))
+    if not complete:
+        response.headers['X-Partial-Job'] = 'true'
+    return response, status
+
+
+def parse_etag(value):
+    """Document update_time from an ETag string (quoted or not); raises ValueError."""
+    value = value.strip()
+    if value.startswith('W/'):
+        raise ValueError('Weak ETags cannot be used as preconditions')
+    return DatetimeWithNanoseconds.from_rfc3339(value.strip('"'))
+
+
+def if_match_update_time():
+    """
+    The document update_time sent in If-Match, or None without the header (or with *).
+    Raises WriteConflict for an ETag that cannot match any version.
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    tags = request.if_match.as_set()
+    if len(tags) != 1:
+        raise WriteConflict('If-Match must name exactly one version')
+    try:
+        return parse_etag(tags.pop())
+    except ValueError:
+        raise WriteConflict('If-Match does not name a version of this document')
 
 
 @app.route('/analyze', methods=['POST'])
 @require_auth
 def analyze_pdf():
-    """Main endpoint to analyze uploaded PDF. Protected by OAuth."""
+    """
+    Main endpoint to analyze uploaded PDF. Protected by OAuth.
+    With ?async=1 the PDF is queued and a 202 with a task id is returned;
+    follow it at /analyze/tasks/<id> or /analyze/tasks/<id>/events.
+    With ?debug=1 the result includes per-stage timings and counters.
+    """
+    if request.content_length and request.content_length > PDF_MAX_UPLOAD_BYTES:
+        return jsonify({'error': 'File too large'}), 413
+
     if 'file' not in request.files:
         return jsonify({'error': 'No file uploaded'}), 400
     
     file = request.files['file']
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
-    
-    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-        file.save(tmp.name)
-        pdf_path = tmp.name
+
+    mode = request.args.get('mode')
+    if mode and mode not in EXTRACTION_MODES:
+        return jsonify({'error': f"Invalid mode. Use one of: {', '.join(EXTRACTION_MODES)}"}), 400
+    debug = request.args.get('debug') in ('1', 'true')
     
     try:
-        result = extract_from_mitchell_estimate(pdf_path)
+        with pdf_buffer(file.stream) as data:
+            if len(data) > PDF_MAX_UPLOAD_BYTES:
+                return jsonify({'error': 'File too large'}), 413
+            if request.args.get('async') in ('1', 'true'):
+                task_id = get_extraction_tasks().submit(data, file.filename, mode, debug)
+                response = jsonify({
+                    'task_id': task_id,
+                    'status': 'queued',
+                    'status_url': f"/analyze/tasks/{task_id}",
+                    'events_url': f"/analyze/tasks/{task_id}/events",
+                })
+                response.headers['Location'] = f"/analyze/tasks/{task_id}"
+                return response, 202
+            result = extract_cached(data, mode)
+        if not debug:
+            result.pop('debug', None)
         return jsonify(result)
+    except TaskQueueFull as e:
+        return jsonify({'error': f"Extraction queue is full, try again shortly ({e})"}), 503
+    except ExtractionPoolBusy as e:
+        return jsonify({'error': f"Extraction workers are busy, try again shortly ({e})"}), 503
+    except UnsupportedEstimateFormat as e:
+        return jsonify({'error': str(e)}), 422
+    except ExtractionTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if os.path.exists(pdf_path):
-            os.unlink(pdf_path)
+
+
+def buffer_uploads(uploads, stack):
+    """
+    Memoryviews of uploaded PDFs, without copying them; they stay valid until
+    `stack` (an ExitStack) is closed.
+
+    Returns:
+        tuple: ([(index, filename, data)], [{'index', 'filename', 'error'} for oversized files])
+    """
+    files, oversized = [], []
+    for index, f in enumerate(uploads):
+        data = stack.enter_context(pdf_buffer(f.stream))
+        if len(data) > PDF_MAX_UPLOAD_BYTES:
+            oversized.append({'index': index, 'filename': f.filename, 'error': 'File too large'})
+        else:
+            files.append((index, f.filename, data))
+    return files, oversized
+
+
+@app.route('/analyze/batch', methods=['POST'])
+@require_auth
+def analyze_pdf_batch():
+    """
+    Analyze many uploaded PDFs in parallel. Protected by OAuth.
+    Streams newline-delimited JSON: one line per file as it finishes,
+    then a final summary line.
+    """
+    uploads = [f for f in request.files.getlist('files') if f.filename]
+    if not uploads:
+        return jsonify({'error': 'No files uploaded'}), 400
+
+    mode = request.args.get('mode')
+    if mode and mode not in EXTRACTION_MODES:
+        return jsonify({'error': f"Invalid mode. Use one of: {', '.join(EXTRACTION_MODES)}"}), 400
+    debug = request.args.get('debug') in ('1', 'true')
+
+    stack = ExitStack()
+    files, oversized = buffer_uploads(uploads, stack)
+
+    def generate():
+        # The request (and with it the uploads) stays open while this streams
+        with stack:
+            failed = len(oversized)
+            for outcome in oversized:
+                yield json.dumps(outcome) + '\n'
+            for outcome in extract_batch_cached(files, mode):
+                if 'error' in outcome:
+                    failed += 1
+                elif not debug:
+                    outcome['result'].pop('debug', None)
+                yield json.dumps(outcome) + '\n'
+            yield json.dumps({'done': True, 'total': len(uploads), 'failed': failed}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/analyze/tasks/<task_id>', methods=['GET'])
+@require_auth
+def get_analyze_task(task_id):
+    """Poll an asynchronous extraction task. Protected by OAuth."""
+    task = get_extraction_tasks().get(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    return jsonify(task)
+
+
+@app.route('/analyze/tasks/<task_id>/events', methods=['GET'])
+@require_auth
+def stream_analyze_task(task_id):
+    """
+    Server-sent events for an extraction task. Protected by OAuth.
+    Emits 'progress' events, then a final 'result' or 'error' event.
+    """
+    tasks = get_extraction_tasks()
+    if not tasks.get(task_id):
+        return jsonify({'error': 'Task not found'}), 404
+
+    def generate():
+        seen = 0
+        while True:
+            update = tasks.wait_for_events(task_id, seen, timeout=15)
+            if update is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Task expired'})}\n\n"
+                return
+            events, finished = update
+            if not events and not finished:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            seen += len(events)
+            if finished:
+                name = 'result' if finished['status'] == 'done' else 'error'
+                yield f"event: {name}\ndata: {json.dumps(finished)}\n\n"
+                return
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/analyze/cache', methods=['GET'])
+@require_auth
+def analyze_cache_stats():
+    """Extraction cache hit/miss counters and sizes. Protected by OAuth."""
+    return jsonify(get_extraction_cache().stats())
+
+
+@app.route('/metrics', methods=['GET'])
+@require_auth
+def metrics_snapshot():
+    """Process-wide counters, extraction stage timers and slowest estimates. Protected by OAuth."""
+    return jsonify(get_metrics().snapshot())
 
 
 @app.route('/jobs', methods=['GET'])
 @require_auth
 def list_jobs():
-    """Get all jobs. Protected by OAuth."""
-    jobs = get_all_jobs()
-    return jsonify(jobs)
+    """
+    Get all jobs, newest first. Protected by OAuth.
+    Optional query parameters:
+        limit/cursor: page through jobs; the response becomes {'jobs', 'next_cursor'}
+        fields: comma-separated fields to return (id is always included)
+        view=summary: compact jobs without items, timeline or notes
+        stage: comma-separated stages to include
+        car_here, parts_ordered, parts_arrived, customer_notified,
+        rental_requested: true/false to filter on that flag
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    view = request.args.get('view', 'full')
 
+    if view not in ('full', 'summary'):
+        return jsonify({'error': 'Invalid view. Use full or summary'}), 400
+    unknown = [f for f in fields if f != 'id' and f not in JOB_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= JOBS_PAGE_MAX_LIMIT:
+            return jsonify({'error': f"limit must be between 1 and {JOBS_PAGE_MAX_LIMIT}"}), 400
+    elif cursor:
+        return jsonify({'error': 'cursor requires limit'}), 400
 
-@app.route('/jobs', methods=['POST'])
-@require_auth
-def create_new_job():
-    """Create a new job from form data or PDF extraction result. Protected by OAuth."""
-    data = request.get_json()
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-    
-    job_data = {
+    filters = {}
+    if request.args.get('stage'):
+        stages = [s.strip() for s in request.args['stage'].split(',') if s.strip()]
+        unknown = [s for s in stages if s not in JOB_STAGES]
+        if unknown or not stages:
+            return jsonify({'error': f"Invalid stage. Use {', '.join(JOB_STAGES)}"}), 400
+        filters['stage'] = stages
+    for flag in JOB_FLAGS:
+        value = request.args.get(flag)
+        if value is None:
+            continue
+        if value.lower() not in ('true', '1', 'false', '0'):
+            return jsonify({'error': f"{flag} must be true or false"}), 400
+        filters[flag] = value.lower() in ('true', '1')
+
+    etag = list_etag(get_jobs_version())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if limit is None and not fields and not filters and view == 'full':
+        return with_etag(jsonify(get_all_jobs()), etag)
+
+    # Fields to fetch when the page comes straight from Firestore
+    select = [f for f in fields if f != 'id'] or None
+    if view == 'summary':
+        select = (select or JOB_SUMMARY_FIELDS) + ['items']
+
+    try:
+        jobs, next_cursor = get_jobs_page(limit, cursor, select, filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except FailedPrecondition as e:
+        # A Firestore index this filter needs is missing or still building
+        print(f"Jobs query needs an index: {e}")
+        return jsonify({'error': 'This filter is temporarily unavailable; try again later'}), 503
+
+    if view == 'summary':
+        jobs = [summarize_job(job) for job in jobs]
+    if fields:
+        jobs = [project_job(job, fields) for job in jobs]
+    if limit is None:
+        return with_etag(jsonify(jobs), etag)
+    return with_etag(jsonify({'jobs': jobs, 'next_cursor': next_cursor}), etag)
+
+
+def job_data_from_payload(data):
+    """Map a job payload (nested customer/vehicle/dates or flat fields) to create_job's field layout."""
+    return {
         'stage': data.get('stage', 'confirmed'),
         'customer_name': data.get('customer', {}).get('name', '') if isinstance(data.get('customer'), dict) else data.get('customer_name', ''),
         'customer_phone': data.get('customer', {}).get('phone', '') if isinstance(data.get('customer'), dict) else data.get('customer_phone', ''),
@@ -266,42 +446,568 @@ def create_new_job():
         'rental_notes': data.get('rental_notes', ''),
         'timeline': data.get('timeline', []),
     }
-    
+
+
+def bool_arg(name):
+    """A true/false query parameter (true/1 or false/0; missing is false); raises ValueError."""
+    value = request.args.get(name, 'false').lower()
+    if value not in ('true', '1', 'false', '0'):
+        raise ValueError(f"{name} must be true or false")
+    return value in ('true', '1')
+
+
+def job_payload_from_extraction(extracted, first_item_id):
+    """
+    Build a new-job payload from an /analyze result, the same way the dashboard's
+    quick upload does. Item ids count up from first_item_id.
+    """
+    items = extracted.get('items') or []
+    return {
+        'customer': {
+            'name': extracted.get('customer', {}).get('name', ''),
+            'phone': extracted.get('customer', {}).get('phone', ''),
+        },
+        'vehicle': {
+            'year': extracted.get('vehicle', {}).get('year', ''),
+            'makeModel': extracted.get('vehicle', {}).get('makeModel', ''),
+            'plate': extracted.get('vehicle', {}).get('plate', ''),
+            'vin': extracted.get('vehicle', {}).get('vin', ''),
+        },
+        'dates': {'start': '', 'end': ''},
+        'items': [{
+            'id': first_item_id + i,
+            'type': item.get('type') or 'Repair',
+            'desc': item.get('desc', ''),
+            'partNum': item.get('partNum', ''),
+            'customTitle': '',
+        } for i, item in enumerate(items)],
+        'notes': extracted.get('notes', ''),
+        'stage': 'confirmed',
+    }
+
+
+@app.route('/jobs', methods=['POST'])
+@require_auth
+def create_new_job():
+    """
+    Create a new job from form data or PDF extraction result. Protected by OAuth.
+    With ?dedupe=true an open (not done) job for the same VIN, or else plate,
+    is returned with 200 instead of creating a second one.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    try:
+        dedupe = bool_arg('dedupe')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job_data = job_data_from_payload(data)
+    if dedupe:
+        existing = find_open_job_for_vehicle(job_data)
+        if existing:
+            return jsonify(existing), 200
     job = create_job(job_data)
     return jsonify(job), 201
 
 
+@app.route('/jobs/import', methods=['POST'])
+@require_auth
+def import_jobs():
+    """
+    Create jobs straight from uploaded estimate PDFs. Protected by OAuth.
+    Extracts all files in parallel, then writes the new jobs in batched commits.
+    Returns {'created': [{index, filename, job}], 'failed': [{index, filename, error}], 'total'};
+    201 if at least one job was created, otherwise 422.
+    With ?dedupe=true, estimates for a vehicle that already has an open job,
+    or that an earlier file of the same import creates one for, are listed
+    under 'existing' with that job instead of being created again (200 when
+    every file matched an existing job).
+    """
+    uploads = [f for f in request.files.getlist('files') if f.filename]
+    if not uploads:
+        return jsonify({'error': 'No files uploaded'}), 400
+
+    mode = request.args.get('mode')
+    if mode and mode not in EXTRACTION_MODES:
+        return jsonify({'error': f"Invalid mode. Use one of: {', '.join(EXTRACTION_MODES)}"}), 400
+    try:
+        dedupe = bool_arg('dedupe')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    extracted = []
+    with ExitStack() as stack:
+        files, failed = buffer_uploads(uploads, stack)
+        for outcome in extract_batch_cached(files, mode):
+            if 'error' in outcome:
+                failed.append(outcome)
+            else:
+                extracted.append(outcome)
+    extracted.sort(key=lambda o: o['index'])
+    failed.sort(key=lambda o: o['index'])
+
+    next_item_id = int(time.time() * 1000)
+    jobs_data, new_outcomes, existing = [], [], []
+    importing = {}  # (kind, vehicle key) -> position in jobs_data of the job created for it
+    repeats = []  # (existing entry, position in jobs_data of its job)
+    for outcome in extracted:
+        payload = job_payload_from_extraction(outcome['result'], next_item_id)
+        job_data = job_data_from_payload(payload)
+        if dedupe:
+            keys = [(kind, vehicle_key(job_data.get(field))) for kind, (field, _) in VEHICLE_KEY_FIELDS.items()]
+            keys = [key for key in keys if key[1]]
+            earlier = next((importing[key] for key in keys if key in importing), None)
+            match = find_open_job_for_vehicle(job_data) if earlier is None else None
+            if earlier is not None or match:
+                entry = {'index': outcome['index'], 'filename': outcome['filename'], 'job': match}
+                existing.append(entry)
+                if earlier is not None:
+                    repeats.append((entry, earlier))
+                continue
+            for key in keys:
+                importing.setdefault(key, len(jobs_data))
+        next_item_id += len(payload['items'])
+        jobs_data.append(job_data)
+        new_outcomes.append(outcome)
+
+    try:
+        jobs = create_jobs_batch(jobs_data)
+    except Exception as e:
+        print(f"Error creating imported jobs: {e}")
+        return jsonify({'error': f"Failed to save imported jobs: {e}"}), 500
+    for entry, position in repeats:
+        entry['job'] = jobs[position]
+
+    created = [
+        {'index': outcome['index'], 'filename': outcome['filename'], 'job': job}
+        for outcome, job in zip(new_outcomes, jobs)
+    ]
+    body = {'created': created, 'failed': failed, 'total': len(uploads)}
+    if dedupe:
+        body['existing'] = existing
+    return jsonify(body), 201 if created else 200 if existing else 422
+
+
+@app.route('/jobs/batch', methods=['POST'])
+@require_auth
+def batch_jobs():
+    """
+    Apply many job operations in one request. Protected by OAuth.
+    Body: {'operations': [
+        {'op': 'create', 'data': {...same payload as POST /jobs...}},
+        {'op': 'update', 'id': ..., 'data': {...}, 'if_match': optional ETag},
+        {'op': 'delete', 'id': ..., 'if_match': optional ETag}
+    ]}
+    Returns {'results': [...]} with one {'index', 'op', 'id', 'status', 'job'/'error'}
+    per operation. Operations are committed together, up to 500 writes per commit.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > JOBS_BATCH_MAX_OPERATIONS:
+        return jsonify({'error': f"At most {JOBS_BATCH_MAX_OPERATIONS} operations per request"}), 413
+
+    prepared, rejected = [], {}
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            rejected[index] = {'index': index, 'status': 400, 'error': 'Operation must be an object'}
+            prepared.append({'op': None})
+            continue
+        operation = dict(operation)
+        if operation.get('op') == 'create':
+            operation['data'] = job_data_from_payload(operation.get('data') or {})
+        if operation.get('if_match'):
+            if not isinstance(operation['if_match'], str):
+                rejected[index] = {'index': index, 'op': operation.get('op'), 'id': operation.get('id'),
+                                   'status': 400, 'error': 'if_match must be an ETag string'}
+                prepared.append({'op': None})
+                continue
+            try:
+                operation['if_match'] = parse_etag(operation['if_match'])
+            except ValueError:
+                rejected[index] = {'index': index, 'op': operation.get('op'), 'id': operation.get('id'),
+                                   'status': 412, 'error': 'if_match does not name a version of this job'}
+                operation = {'op': None}
+        prepared.append(operation)
+
+    results = apply_job_operations(prepared)
+    for index, result in rejected.items():
+        results[index] = result
+    return jsonify({'results': results})
+
+
+@app.route('/jobs/changes', methods=['GET'])
+@require_auth
+def list_job_changes():
+    """
+    Delta sync for the jobs list. Protected by OAuth.
+    Returns {'jobs', 'deleted', 'token', 'full'}: jobs changed and ids removed
+    since ?since=<token>, or every job ('full': true) when no token is given or
+    it is older than TOMBSTONE_RETENTION_DAYS. Pass the returned token on the
+    next call. Changes may repeat across calls; merge by id.
+    """
+    try:
+        return jsonify(get_job_changes(request.args.get('since')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+_job_streams = BoundedSemaphore(JOBS_STREAM_MAX_CLIENTS)
+
+
+def sse_message(event, data, event_id=None):
+    """One Server-Sent Events message."""
+    message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id else message
+
+
+@app.route('/jobs/stream/ticket', methods=['POST'])
+@require_auth
+def create_stream_ticket():
+    """
+    Short-lived ticket for opening GET /jobs/stream with EventSource, so the
+    OAuth token never goes in a URL. Protected by OAuth.
+    Returns {'ticket', 'expires_in': seconds}; get a new one for each connection.
+    """
+    return jsonify({'ticket': issue_stream_ticket(get_current_user()), 'expires_in': STREAM_TICKET_TTL_SECONDS})
+
+
+@app.route('/jobs/stream', methods=['GET'])
+@require_stream_auth
+def stream_jobs():
+    """
+    Server-sent events with live job changes, fanned out from the shared
+    Firestore listener. Protected by OAuth (Authorization header, or a
+    ?ticket= from POST /jobs/stream/ticket for EventSource).
+    Emits 'add' and 'modify' (data: the job), 'remove' (data: {'id'}) and
+    'resync' (reload through /jobs/changes) events. Event ids are
+    /jobs/changes sync tokens, so a reconnect with Last-Event-ID (or ?since=)
+    first replays what changed while the client was away. Streams close after
+    JOBS_STREAM_MAX_SECONDS and EventSource reconnects by itself.
+    """
+    feed = get_job_events()
+    if feed is None:
+        return jsonify({'error': 'Live updates are unavailable'}), 503
+    if not _job_streams.acquire(blocking=False):
+        get_metrics().increment('jobs_stream.rejected')
+        return jsonify({'error': 'Too many live update connections'}), 503
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    get_metrics().increment('jobs_stream.connections')
+
+    def generate():
+        # Note the log position before replaying so nothing falls in between
+        seen = feed.last_event()
+        if since:
+            try:
+                missed = get_job_changes(since)
+            except ValueError:
+                yield sse_message('resync', {}, new_sync_token())
+            else:
+                for job in missed['jobs']:
+                    yield sse_message('modify', job)
+                for job_id in missed['deleted']:
+                    yield sse_message('remove', {'id': job_id})
+                yield ": replayed\n"
+                yield f"id: {missed['token']}\n\n"
+
+        deadline = time.monotonic() + JOBS_STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            events = feed.wait_for_events(seen, timeout=min(15, max(0, deadline - time.monotonic())))
+            if events is None:
+                # Fell behind the event backlog
+                seen = feed.last_event()
+                yield sse_message('resync', {}, new_sync_token())
+                continue
+            if not events:
+                get_job_events()  # restarts a stopped listener
+                yield ": keep-alive\n\n"
+                continue
+            token = new_sync_token()
+            for sequence, event, payload in events:
+                yield sse_message(event, payload or {}, token)
+            seen = events[-1][0]
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(_job_streams.release)
+    return response
+
+
+@app.route('/jobs/by-vin/<vin>', methods=['GET'])
+@require_auth
+def jobs_by_vin(vin):
+    """
+    Jobs for a VIN, newest first. Protected by OAuth.
+    Case, spaces and dashes are ignored; ?include_archived=true adds archived jobs.
+    Returns {'jobs'}.
+    """
+    try:
+        include_archived = bool_arg('include_archived')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'jobs': get_jobs_by_vehicle('vin', vin, include_archived)})
+
+
+@app.route('/jobs/by-plate/<plate>', methods=['GET'])
+@require_auth
+def jobs_by_plate(plate):
+    """Jobs for a license plate, newest first; same matching and options as /jobs/by-vin. Protected by OAuth."""
+    try:
+        include_archived = bool_arg('include_archived')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'jobs': get_jobs_by_vehicle('plate', plate, include_archived)})
+
+
+@app.route('/jobs/search', methods=['GET'])
+@require_auth
+def search_job_list():
+    """
+    Full-text job search. Protected by OAuth.
+    ?q= matches customer name and phone, plate, VIN, make/model and item
+    descriptions and part numbers, including prefixes and fragments (e.g. the
+    last digits of a VIN). Every word must match. Optional limit (default 20)
+    and view=summary. Returns {'jobs'}, best match first, each with a search_score.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= JOBS_SEARCH_MAX_LIMIT:
+        return jsonify({'error': f"limit must be between 1 and {JOBS_SEARCH_MAX_LIMIT}"}), 400
+    view = request.args.get('view', 'full')
+    if view not in ('full', 'summary'):
+        return jsonify({'error': 'Invalid view. Use full or summary'}), 400
+
+    jobs = search_jobs(query, limit)
+    if view == 'summary':
+        jobs = [dict(summarize_job(job), search_score=job['search_score']) for job in jobs]
+    return jsonify({'jobs': jobs})
+
+
+@app.route('/jobs/stats', methods=['GET'])
+@require_auth
+def job_stats():
+    """
+    Job counts for dashboard counters. Protected by OAuth.
+    Returns {'total', 'stages': {stage: n}, 'flags': {flag: n}}, where flags
+    counts the jobs with that flag set.
+    """
+    return jsonify(get_job_stats())
+
+
+@app.route('/jobs/archive/sweep', methods=['POST'])
+@require_auth
+def sweep_archive():
+    """
+    Move jobs that have been done for a while to the archive and prune
+    tombstones older than TOMBSTONE_RETENTION_DAYS. Protected by OAuth;
+    meant for Cloud Scheduler (an OIDC token for an authorized service account).
+    ?days= overrides ARCHIVE_AFTER_DAYS. Each call moves at most one batch;
+    returns {'archived': [ids], 'skipped': [ids changed meanwhile], 'tombstones_pruned': n}.
+    """
+    days = request.args.get('days')
+    try:
+        days = float(days) if days is not None else None
+    except ValueError:
+        return jsonify({'error': 'days must be a number'}), 400
+    if days is not None and days < 0:
+        return jsonify({'error': 'days must not be negative'}), 400
+    result = archive_done_jobs(days)
+    result['tombstones_pruned'] = prune_tombstones()
+    return jsonify(result)
+
+
+@app.route('/jobs/archive', methods=['GET'])
+@require_auth
+def list_archived_jobs():
+    """
+    Page through archived jobs, most recently archived first. Protected by OAuth.
+    Query parameters: limit (default 50), cursor, and at most one of
+    vin / plate (ignoring case, spaces and punctuation) or customer (name prefix).
+    Returns {'jobs', 'next_cursor'}.
+    """
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= JOBS_PAGE_MAX_LIMIT:
+        return jsonify({'error': f"limit must be between 1 and {JOBS_PAGE_MAX_LIMIT}"}), 400
+    searches = {key: request.args[key].strip() for key in ('vin', 'plate', 'customer') if request.args.get(key, '').strip()}
+    if len(searches) > 1:
+        return jsonify({'error': 'Search by one of vin, plate or customer'}), 400
+
+    try:
+        jobs, next_cursor = search_archived_jobs(limit, request.args.get('cursor'), **searches)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'jobs': jobs, 'next_cursor': next_cursor})
+
+
+@app.route('/jobs/archive/<job_id>', methods=['GET'])
+@require_auth
+def get_single_archived_job(job_id):
+    """Get one archived job by ID. Protected by OAuth."""
+    job = get_archived_job(job_id)
+    if not job:
+        return jsonify({'error': 'Archived job not found'}), 404
+    return jsonify(job)
+
+
+@app.route('/jobs/archive/<job_id>/restore', methods=['POST'])
+@require_auth
+def restore_job(job_id):
+    """Move an archived job back into the jobs list. Protected by OAuth."""
+    try:
+        job = restore_archived_job(job_id)
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 409
+    if not job:
+        return jsonify({'error': 'Archived job not found'}), 404
+    return jsonify(job)
+
+
 @app.route('/jobs/<job_id>', methods=['GET'])
 @require_auth
 def get_single_job(job_id):
-    """Get a single job by ID. Protected by OAuth."""
-    job = get_job_by_id(job_id)
+    """Get a single job by ID. Protected by OAuth. Honors If-None-Match."""
+    job, update_time = get_job_with_update_time(job_id)
     if not job:
         return jsonify({'error': 'Job not found'}), 404
-    return jsonify(job)
+    etag = document_etag(update_time)
+    return not_modified(etag) or with_etag(jsonify(job), etag)
 
 
 @app.route('/jobs/<job_id>', methods=['PUT', 'PATCH'])
 @require_auth
 def update_existing_job(job_id):
-    """Update an existing job. Protected by OAuth."""
-    job = get_job_by_id(job_id)
-    if not job:
-        return jsonify({'error': 'Job not found'}), 404
-    
+    """
+    Update an existing job. Protected by OAuth. Honors If-Match (412 on conflict).
+    A 'timeline_append' list adds timeline entries in the same write.
+    Returns the updated job with its new ETag (see updated_job_response).
+    """
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    updated_job = update_job(job_id, data)
-    return jsonify(updated_job)
+    try:
+        updated_job, update_time, complete = update_job_with_update_time(job_id, data, if_match=if_match_update_time())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
+    if not updated_job:
+        return jsonify({'error': 'Job not found'}), 404
+    return updated_job_response(updated_job, update_time, complete)
+
+
+@app.route('/jobs/<job_id>/timeline', methods=['GET'])
+@require_auth
+def get_timeline(job_id):
+    """Full timeline of a job, oldest first. Protected by OAuth."""
+    timeline = get_job_timeline(job_id)
+    if timeline is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'timeline': timeline})
+
+
+@app.route('/jobs/<job_id>/timeline', methods=['POST'])
+@require_auth
+def append_timeline(job_id):
+    """
+    Append timeline entries to a job. Protected by OAuth. Honors If-Match.
+    Body: one entry, or {'entries': [...]}. Responds like PATCH /jobs/<id>.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    entries = data.get('entries', [data]) if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries or not all(isinstance(e, dict) for e in entries):
+        return jsonify({'error': 'Expected a timeline entry or {"entries": [...]}'}), 400
+
+    try:
+        updated_job, update_time, complete = append_job_timeline(job_id, entries, if_match=if_match_update_time())
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
+    if not updated_job:
+        return jsonify({'error': 'Job not found'}), 404
+    return updated_job_response(updated_job, update_time, complete, 201)
+
+
+@app.route('/jobs/<job_id>/items', methods=['POST'])
+@require_auth
+def add_item(job_id):
+    """
+    Add one item to a job without rewriting the others. Protected by OAuth.
+    Honors If-Match. Returns the item with its id.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    try:
+        item = add_job_item(job_id, data, if_match=if_match_update_time())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
+    if not item:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(item), 201
+
+
+@app.route('/jobs/<job_id>/items/<item_id>', methods=['PATCH'])
+@require_auth
+def update_item(job_id, item_id):
+    """
+    Update fields of one item (e.g. {'ordered': true}). Protected by OAuth.
+    Only the given fields are written, so concurrent edits to other items or
+    fields are kept. Honors If-Match. Returns the updated item.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    try:
+        item = update_job_item(job_id, item_id, data, if_match=if_match_update_time())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
+    if not item:
+        return jsonify({'error': 'Item not found'}), 404
+    return jsonify(item)
+
+
+@app.route('/jobs/<job_id>/items/<item_id>', methods=['DELETE'])
+@require_auth
+def delete_item(job_id, item_id):
+    """Remove one item from a job. Protected by OAuth. Honors If-Match."""
+    try:
+        deleted = delete_job_item(job_id, item_id, if_match=if_match_update_time())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
+    if not deleted:
+        return jsonify({'error': 'Item not found'}), 404
+    return jsonify({'success': True})
 
 
 @app.route('/jobs/<job_id>', methods=['DELETE'])
 @require_auth
 def delete_existing_job(job_id):
-    """Delete a job. Protected by OAuth."""
-    deleted = delete_job(job_id)
+    """Delete a job. Protected by OAuth. Honors If-Match (412 on conflict)."""
+    try:
+        deleted = delete_job(job_id, if_match=if_match_update_time())
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
     if not deleted:
         return jsonify({'error': 'Job not found'}), 404
     return jsonify({'success': True})
@@ -359,9 +1065,13 @@ def import_to_calendar_endpoint():
 @app.route('/insurance-cases', methods=['GET'])
 @require_auth
 def list_insurance_cases():
-    """List all insurance cases."""
+    """List all insurance cases. Honors If-None-Match."""
+    etag = list_etag(get_insurance_cases_version())
+    cached = not_modified(etag)
+    if cached:
+        return cached
     cases = get_all_insurance_cases()
-    return jsonify(cases)
+    return with_etag(jsonify(cases), etag)
 
 @app.route('/insurance-cases', methods=['POST'])
 @require_auth
@@ -377,21 +1087,25 @@ def create_new_insurance_case():
 @app.route('/insurance-cases/<case_id>', methods=['GET'])
 @require_auth
 def get_single_insurance_case(case_id):
-    """Get a single insurance case by ID."""
-    case = get_insurance_case_by_id(case_id)
+    """Get a single insurance case by ID. Honors If-None-Match."""
+    case, update_time = get_insurance_case_with_update_time(case_id)
     if not case:
         return jsonify({'error': 'Insurance case not found'}), 404
-    return jsonify(case)
+    etag = document_etag(update_time)
+    return not_modified(etag) or with_etag(jsonify(case), etag)
 
 @app.route('/insurance-cases/<case_id>', methods=['PATCH', 'PUT'])
 @require_auth
 def update_existing_insurance_case(case_id):
-    """Update an insurance case (e.g. adding photos)."""
+    """Update an insurance case (e.g. adding photos). Honors If-Match (412 on conflict)."""
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    case = update_insurance_case(case_id, data)
+    try:
+        case = update_insurance_case(case_id, data, if_match=if_match_update_time())
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
     return jsonify(case)
 
 
@@ -512,8 +1226,11 @@ def delete_insurance_photo(case_id, photo_name):
 @app.route('/insurance-cases/<case_id>', methods=['DELETE'])
 @require_auth
 def delete_existing_insurance_case(case_id):
-    """Delete an insurance case and its photos."""
-    success = delete_insurance_case(case_id)
+    """Delete an insurance case and its photos. Honors If-Match (412 on conflict)."""
+    try:
+        success = delete_insurance_case(case_id, if_match=if_match_update_time())
+    except WriteConflict as e:
+        return jsonify({'error': str(e)}), 412
     if not success:
         return jsonify({'error': 'Insurance case not found'}), 404
     return jsonify({'success': True})
@@ -4,6 +4,12 @@ Provides middleware and decorators for protecting API endpoints
 """
 
 import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
 from functools import wraps
 from flask import request, jsonify, g
 
@@ -18,6 +24,13 @@ AUTHORIZED_EMAILS = os.getenv('AUTHORIZED_EMAILS', '').split(';')
 # Clean up whitespace
 AUTHORIZED_EMAILS = [email.strip().lower() for email in AUTHORIZED_EMAILS if email.strip()]
 
+# Stream tickets stand in for the OAuth token in GET /jobs/stream URLs (EventSource
+# cannot send headers). They only open streams and expire quickly. Set the secret
+# when running more than one instance; otherwise each process makes its own.
+STREAM_TICKET_TTL_SECONDS = int(os.getenv('STREAM_TICKET_TTL_SECONDS', 60))
+STREAM_TICKET_SECRET = os.getenv('STREAM_TICKET_SECRET') or secrets.token_hex(32)
+STREAM_TICKET_PURPOSE = 'jobs-stream'
+
 
 def verify_google_token(token):
     """
@@ -51,6 +64,70 @@ def verify_google_token(token):
         return None
 
 
+def _authorize(token):
+    """
+    Check a bearer token and the AUTHORIZED_EMAILS list.
+
+    Returns:
+        tuple: (user, None) on success, or (None, error response) otherwise
+    """
+    if not token:
+        return None, (jsonify({'error': 'No token provided'}), 401)
+    
+    user = verify_google_token(token)
+    
+    if not user:
+        return None, (jsonify({'error': 'Invalid or expired token'}), 401)
+    
+    # Check against AUTHORIZED_EMAILS if the list is not empty
+    if AUTHORIZED_EMAILS and user.get('email', '').lower() not in AUTHORIZED_EMAILS:
+        print(f"Unauthorized access attempt from: {user.get('email')}")
+        return None, (jsonify({'error': 'Unauthorized: Your email is not on the authorized list.'}), 403)
+    
+    return user, None
+
+
+def _sign(payload):
+    return hmac.new(STREAM_TICKET_SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_stream_ticket(user):
+    """
+    Short-lived ticket that opens a live update stream for an authorized user.
+    
+    Returns:
+        str: the ticket, valid for STREAM_TICKET_TTL_SECONDS
+    """
+    claims = {
+        'purpose': STREAM_TICKET_PURPOSE,
+        'id': user.get('id'),
+        'email': user.get('email'),
+        'name': user.get('name'),
+        'exp': int(time.time()) + STREAM_TICKET_TTL_SECONDS,
+    }
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode()
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_stream_ticket(ticket):
+    """
+    Check a ticket from issue_stream_ticket.
+    
+    Returns:
+        dict: User info (id, email, name) or None if invalid or expired
+    """
+    payload, _, signature = ticket.partition('.')
+    if not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+        return None
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode()))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or claims.get('purpose') != STREAM_TICKET_PURPOSE or claims.get('exp', 0) < time.time():
+        return None
+    return {'id': claims.get('id'), 'email': claims.get('email'), 'name': claims.get('name')}
+
+
 def require_auth(f):
     """
     Decorator to require authentication on an endpoint.
@@ -65,22 +142,39 @@ def require_auth(f):
         if not auth_header.startswith('Bearer '):
             return jsonify({'error': 'Missing or invalid Authorization header'}), 401
         
-        token = auth_header.split(' ', 1)[1]
+        user, error = _authorize(auth_header.split(' ', 1)[1])
+        if error:
+            return error
         
-        if not token:
-            return jsonify({'error': 'No token provided'}), 401
-        
-        user = verify_google_token(token)
-        
-        if not user:
-            return jsonify({'error': 'Invalid or expired token'}), 401
+        # Store user in Flask's g object for access in the route
+        g.user = user
         
-        # Check against AUTHORIZED_EMAILS if the list is not empty
-        if AUTHORIZED_EMAILS and user.get('email', '').lower() not in AUTHORIZED_EMAILS:
-            print(f"Unauthorized access attempt from: {user.get('email')}")
-            return jsonify({'error': 'Unauthorized: Your email is not on the authorized list.'}), 403
+        return f(*args, **kwargs)
+    
+    return decorated_function
+
+
+def require_stream_auth(f):
+    """
+    Like require_auth, but also accepts a stream ticket (see issue_stream_ticket)
+    as a ?ticket= query parameter, because the browser EventSource API cannot
+    send headers. Only use it on Server-Sent Events endpoints.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            user, error = _authorize(auth_header.split(' ', 1)[1])
+            if error:
+                return error
+        else:
+            ticket = request.args.get('ticket', '')
+            if not ticket:
+                return jsonify({'error': 'No token provided'}), 401
+            user = verify_stream_ticket(ticket)
+            if not user:
+                return jsonify({'error': 'Invalid or expired stream ticket'}), 401
         
-        # Store user in Flask's g object for access in the route
         g.user = user
         
         return f(*args, **kwargs)
@@ -0,0 +1,406 @@
+"""
+API Load and Latency Benchmark
+Seeds the local Firestore emulator (and a fake Cloud Storage server, e.g.
+fake-gcs-server) with synthetic jobs and insurance cases, replaces Google
+token verification with a local verifier, and drives the Flask app over HTTP
+with concurrent clients. Reports throughput and p50/p95/p99 latency per
+endpoint at each dataset size, and saves or compares against a baseline file
+so regressions are caught before deploy.
+
+Usage:
+    firebase emulators:start --only firestore            # localhost:8080
+    docker run -p 4443:4443 fsouza/fake-gcs-server -scheme http
+    export FIRESTORE_EMULATOR_HOST=localhost:8080 STORAGE_EMULATOR_HOST=http://localhost:4443
+    python benchmark.py --sizes 1000 10000 50000 --save-baseline
+    python benchmark.py --sizes 1000 10000 50000 --compare   # exits 1 on a regression
+
+The emulator's data is cleared first; the benchmark refuses to run without
+FIRESTORE_EMULATOR_HOST so it can never write to a real project.
+"""
+
+import os
+import sys
+import math
+import json
+import time
+import random
+import string
+import argparse
+import platform
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+
+PROJECT_ID = 'wos3-benchmark'
+BUCKET_NAME = f"{PROJECT_ID}.appspot.com"
+BENCH_TOKEN = 'benchmark-token'
+BENCH_EMAIL = 'benchmark@example.com'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+FIRST_NAMES = ['Maria', 'James', 'Wei', 'Fatima', 'Carlos', 'Aiko', 'Olga', 'Samuel', 'Priya', 'Liam']
+LAST_NAMES = ['Lopez', 'Smith', 'Chen', 'Haddad', 'Garcia', 'Tanaka', 'Ivanova', 'Okafor', 'Patel', 'Murphy']
+VEHICLES = ['Honda Accord', 'Toyota Camry', 'Ford F-150', 'Tesla Model 3', 'BMW X5', 'Subaru Outback', 'Kia Soul']
+PARTS = [
+    ('Front Bumper Cover', '71101-TVA-A00'), ('Hood', '60100-TVA-A00'), ('Left Front Fender', '60261-TVA-A00'),
+    ('Right Headlamp Assembly', '33100-TVA-A01'), ('Grille Molding', '71122-TVA-A00'), ('Rocker Panel', ''),
+    ('Rear Bumper Reinforcement', '71530-TVA-A00'), ('Left Mirror Assembly', '76258-TVA-A01'),
+]
+VIN_CHARS = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+JOB_STAGES = ['confirmed', 'preparation', 'in_progress', 'ready', 'done']
+
+# --- Environment ---
+
+def connect_emulators():
+    """Point firebase_config at the emulators and stub token verification; call before importing database."""
+    import firebase_config
+    import auth
+    from google.auth.credentials import AnonymousCredentials
+    from google.cloud import firestore, storage
+
+    # The Firestore client talks to FIRESTORE_EMULATOR_HOST without credentials
+    firebase_config._db = firestore.Client(project=PROJECT_ID)
+    firebase_config._firebase_initialized = True
+
+    bucket = None
+    if os.getenv('STORAGE_EMULATOR_HOST'):
+        client = storage.Client(project=PROJECT_ID, credentials=AnonymousCredentials())
+        bucket = client.lookup_bucket(BUCKET_NAME) or client.create_bucket(BUCKET_NAME)
+        firebase_config.get_storage_bucket = lambda: bucket
+    else:
+        print("STORAGE_EMULATOR_HOST is not set; insurance photos are seeded as URLs only")
+
+    # require_auth calls auth.verify_google_token, so replacing it authenticates benchmark clients locally
+    def verify_local_token(token):
+        if token != BENCH_TOKEN:
+            return None
+        return {'id': 'benchmark', 'email': BENCH_EMAIL, 'name': 'Benchmark', 'email_verified': True}
+
+    auth.verify_google_token = verify_local_token
+    if auth.AUTHORIZED_EMAILS:
+        auth.AUTHORIZED_EMAILS.append(BENCH_EMAIL)
+    return bucket
+
+
+def clear_emulator():
+    """Delete every document in the emulator's database."""
+    import requests
+
+    host = os.environ['FIRESTORE_EMULATOR_HOST']
+    url = f"http://{host}/emulator/v1/projects/{PROJECT_ID}/databases/(default)/documents"
+    requests.delete(url, timeout=60).raise_for_status()
+
+
+def start_server(app):
+    """Serve the app on a free local port from a background thread; returns its base URL."""
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request access log
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+# --- Synthetic data ---
+
+def synthetic_job(rng, now):
+    """Flat job fields in the layout create_job expects."""
+    created = now - timedelta(days=rng.uniform(0, 365 * 3))
+    items = []
+    for _ in range(rng.randint(3, 25)):
+        desc, part_num = rng.choice(PARTS)
+        items.append({
+            'type': 'Replace' if part_num else 'Repair',
+            'desc': desc,
+            'partNum': part_num,
+            'qty': rng.randint(1, 2),
+        })
+    stage = rng.choice(JOB_STAGES)
+    return {
+        'stage': stage,
+        'car_here': rng.random() < 0.5,
+        'parts_ordered': rng.random() < 0.4,
+        'parts_arrived': rng.random() < 0.3,
+        'customer_name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'customer_phone': f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+        'vehicle_year': str(rng.randint(2005, 2025)),
+        'vehicle_make_model': rng.choice(VEHICLES),
+        'vehicle_plate': ''.join(rng.choices(string.ascii_uppercase + string.digits, k=7)),
+        'vehicle_vin': ''.join(rng.choices(VIN_CHARS, k=17)),
+        'items': items,
+        'notes': 'Customer prefers text updates.' if rng.random() < 0.3 else '',
+        'timeline': [
+            {'stage': s, 'timestamp': (created + timedelta(days=i)).isoformat(), 'label': f"Moved to {s}"}
+            for i, s in enumerate(JOB_STAGES[:JOB_STAGES.index(stage) + 1])
+        ],
+    }
+
+
+def seed_jobs(count, rng):
+    """Add `count` synthetic jobs through the same batched write path as /jobs/import; returns their ids."""
+    from database import create_jobs_batch
+
+    now = datetime.now()
+    ids = []
+    for start in range(0, count, 1000):
+        jobs = create_jobs_batch([synthetic_job(rng, now) for _ in range(min(1000, count - start))])
+        ids.extend(job['id'] for job in jobs)
+    return ids
+
+
+def synthetic_photo():
+    """A small JPEG like the ones /insurance-cases/<id>/photos stores."""
+    import io
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new('RGB', (640, 480), (90, 110, 130)).save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+
+def seed_insurance_cases(count, rng, bucket):
+    """Add `count` insurance cases with 0-6 photos each (uploaded to the fake storage server if there is one)."""
+    from database import MAX_BATCH_WRITES
+    from firebase_config import get_db, get_insurance_collection
+
+    db = get_db()
+    collection = get_insurance_collection()
+    now = datetime.now().isoformat()
+    photo = synthetic_photo()
+    ids = []
+    batch, pending = db.batch(), 0
+    for n in range(count):
+        doc_ref = collection.document()
+        photos = []
+        for index in range(1, rng.randint(0, 6) + 1):
+            name = f"case_{n}_{index}.jpg"
+            url = f"https://storage.googleapis.com/{BUCKET_NAME}/insurance_photos/{doc_ref.id}/{name}"
+            if bucket is not None:
+                blob = bucket.blob(f"insurance_photos/{doc_ref.id}/{name}")
+                blob.upload_from_string(photo, content_type='image/jpeg')
+                url = blob.public_url
+            photos.append({'id': f"{n}-{index}", 'name': name, 'url': url, 'uploaded_at': now})
+        batch.set(doc_ref, {'name': f"Claim {n:05d}", 'photos': photos, 'created_at': now, 'updated_at': now})
+        ids.append(doc_ref.id)
+        pending += 1
+        if pending == MAX_BATCH_WRITES:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return ids
+
+
+def synthetic_estimate(seed):
+    """A small Mitchell-style estimate PDF; a different seed gives a different file (so it misses the cache)."""
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    page = doc.new_page()
+    lines = [
+        'Mitchell Estimate', f"Customer: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'VIN', ''.join(rng.choices(VIN_CHARS, k=17)), 'License', ''.join(rng.choices(string.ascii_uppercase, k=7)),
+        f"{rng.randint(2005, 2025)} {rng.choice(VEHICLES)}", 'Line #', 'Operation', 'Description', 'Part Number', 'Qty',
+    ]
+    for n in range(rng.randint(8, 30)):
+        desc, part_num = rng.choice(PARTS)
+        lines += [str(n + 1), desc, 'Remove /', 'Replace', part_num, '1', '$245.00'] if part_num else \
+                 [str(n + 1), desc, 'Repair', '2.0']
+    lines += ['Estimate Totals', 'Labor', 'Total']
+    y = 40
+    for line in lines:
+        if y > 780:
+            page, y = doc.new_page(), 40
+        page.insert_text((40, y), line, fontsize=8)
+        y += 9
+    return doc.tobytes()
+
+
+# --- Load generation ---
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_endpoint(base_url, make_request, requests_total, concurrency, first=0):
+    """
+    Issue requests_total requests from `concurrency` clients; make_request(session, base_url, n)
+    performs request n (counting from `first`) and returns its response.
+    """
+    import requests
+
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(n):
+        nonlocal errors
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+            session.headers['Authorization'] = f"Bearer {BENCH_TOKEN}"
+        started = time.perf_counter()
+        try:
+            ok = make_request(session, base_url, n).status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed_ms)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(one, range(first, first + requests_total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests_total,
+        'errors': errors,
+        'throughput_rps': round(requests_total / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2),
+    }
+
+
+def endpoints(job_ids, case_ids, pdfs):
+    """(name, make_request) for every benchmarked endpoint."""
+    return [
+        ('GET /jobs', lambda s, url, n: s.get(f"{url}/jobs")),
+        ('GET /jobs?view=summary&limit=50', lambda s, url, n: s.get(f"{url}/jobs", params={'view': 'summary', 'limit': 50})),
+        ('GET /jobs/<id>', lambda s, url, n: s.get(f"{url}/jobs/{job_ids[n % len(job_ids)]}")),
+        ('GET /jobs/search', lambda s, url, n: s.get(f"{url}/jobs/search", params={'q': LAST_NAMES[n % len(LAST_NAMES)]})),
+        ('GET /jobs/stats', lambda s, url, n: s.get(f"{url}/jobs/stats")),
+        ('GET /insurance-cases', lambda s, url, n: s.get(f"{url}/insurance-cases")),
+        ('GET /insurance-cases/<id>', lambda s, url, n: s.get(f"{url}/insurance-cases/{case_ids[n % len(case_ids)]}")),
+        ('POST /analyze', lambda s, url, n: s.post(
+            f"{url}/analyze", files={'file': (f"estimate_{n}.pdf", pdfs[n % len(pdfs)], 'application/pdf')})),
+    ]
+
+
+def wait_for_jobs(expected, timeout=300):
+    """Wait until job reads (the jobs view, when enabled) see `expected` jobs."""
+    from database import get_job_stats
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if get_job_stats()['total'] >= expected:
+            return
+        time.sleep(0.5)
+    print(f"Warning: job reads did not reach {expected} jobs within {timeout}s")
+
+
+# --- Reports and baselines ---
+
+def print_report(size, cases, results):
+    print(f"\n--- {size} jobs, {cases} insurance cases ---")
+    print(f"{'endpoint':<34}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<34}{r['throughput_rps']:>9.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>8}")
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """Print changes against a baseline report; returns the regressions found."""
+    regressions = []
+    print(f"\n--- Compared with baseline from {baseline.get('recorded_at', '?')} (tolerance {tolerance:.0%}) ---")
+    for size, results in report['sizes'].items():
+        for name, current in results.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(name)
+            if previous is None:
+                print(f"{size:>6} {name:<34} new")
+                continue
+            worst = None
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+                if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                    worst = worst or metric
+            if current['errors'] > previous['errors']:
+                worst = worst or 'errors'
+            change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] if previous['p95_ms'] else 0.0
+            status = f"REGRESSION ({worst})" if worst else 'ok'
+            print(f"{size:>6} {name:<34} p95 {previous['p95_ms']:>8.1f} -> {current['p95_ms']:>8.1f} ms ({change:+.0%})  {status}")
+            if worst:
+                regressions.append((size, name, worst))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='job counts to benchmark at (ascending; jobs are added between runs)')
+    parser.add_argument('--cases-ratio', type=float, default=0.1, help='insurance cases seeded per job')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and size')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--skip', nargs='*', default=[], help='endpoint names to leave out, e.g. "POST /analyze"')
+    parser.add_argument('--no-view', action='store_true', help='benchmark with JOBS_VIEW_ENABLED=false')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline file to save or compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='write this run to the baseline file')
+    parser.add_argument('--compare', action='store_true', help='compare with the baseline; exit 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before a metric counts as a regression')
+    args = parser.parse_args()
+
+    if not os.getenv('FIRESTORE_EMULATOR_HOST'):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; start the Firestore emulator first (see the module docstring)")
+    if args.no_view:
+        os.environ['JOBS_VIEW_ENABLED'] = 'false'
+
+    bucket = connect_emulators()
+    clear_emulator()
+    from app import app  # imports database, which now uses the emulator
+
+    rng = random.Random(args.seed)
+    base_url = start_server(app)
+    warmup = min(5, args.requests)
+    report = {
+        'recorded_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'jobs_view': not args.no_view,
+        'sizes': {},
+    }
+
+    job_ids, case_ids = [], []
+    for size in sorted(args.sizes):
+        print(f"Seeding up to {size} jobs...")
+        job_ids += seed_jobs(size - len(job_ids), rng)
+        cases = max(1, int(size * args.cases_ratio))
+        case_ids += seed_insurance_cases(cases - len(case_ids), rng, bucket)
+        wait_for_jobs(size)
+
+        # Fresh PDFs for every size, so /analyze never hits the extraction cache
+        pdfs = [synthetic_estimate(f"{args.seed}-{size}-{n}") for n in range(args.requests + warmup)]
+        results = {}
+        for name, make_request in endpoints(job_ids, case_ids, pdfs):
+            if name in args.skip:
+                continue
+            run_endpoint(base_url, make_request, warmup, 1, first=args.requests)  # warm up on other PDFs
+            results[name] = run_endpoint(base_url, make_request, args.requests, args.concurrency)
+        report['sizes'][str(size)] = results
+        print_report(size, cases, results)
+
+    regressions = []
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline at {args.baseline}; run with --save-baseline first")
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    if regressions:
+        sys.exit(f"\n{len(regressions)} regression(s) against the baseline")
+
+
+if __name__ == "__main__":
+    main()
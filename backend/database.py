@@ -3,10 +3,107 @@ Google Cloud Firestore Database Module for Jobs Management.
 Migrated from SQLite for production deployment on Google Cloud.
 """
 
+import base64
 import json
 import os
-from datetime import datetime
-from firebase_config import get_jobs_collection, get_insurance_collection, get_storage_bucket, init_firebase
+import re
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Condition, Lock
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from firebase_config import (
+    get_jobs_collection, get_insurance_collection, get_tombstones_collection, get_archive_collection,
+    get_storage_bucket, get_db, init_firebase
+)
+
+from metrics import get_metrics
+from job_search import JobSearchIndex
+
+# Firestore rejects a WriteBatch with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+# In-process jobs view (see JobsView); disable to always read Firestore directly
+JOBS_VIEW_ENABLED = os.getenv('JOBS_VIEW_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+JOBS_VIEW_RETRY_SECONDS = float(os.getenv('JOBS_VIEW_RETRY_SECONDS', 30))
+
+# Sync tokens from GET /jobs/changes lag the clock by this much, so writes that
+# were in flight while changes were read are returned again on the next call
+JOBS_CHANGES_OVERLAP_SECONDS = float(os.getenv('JOBS_CHANGES_OVERLAP_SECONDS', 5))
+
+# Jobs that have been done (and untouched) this many days are moved to the
+# archive collection by archive_done_jobs, keeping the working set small
+ARCHIVE_AFTER_DAYS = float(os.getenv('ARCHIVE_AFTER_DAYS', 90))
+
+# Tombstones of removed jobs are pruned after this many days; older
+# GET /jobs/changes sync tokens get a full resync instead of a delta
+TOMBSTONE_RETENTION_DAYS = float(os.getenv('TOMBSTONE_RETENTION_DAYS', 30))
+
+# Change events the jobs view keeps for GET /jobs/stream clients that fall behind
+JOBS_STREAM_BACKLOG = int(os.getenv('JOBS_STREAM_BACKLOG', 1000))
+
+# Stored job fields, and the ones kept in the summary view used by list screens
+JOB_FIELDS = [
+    'stage', 'car_here', 'parts_ordered', 'parts_arrived',
+    'customer_notified', 'rental_requested', 'customer_name',
+    'customer_phone', 'vehicle_year', 'vehicle_make_model',
+    'vehicle_plate', 'vehicle_vin', 'notes', 'start_date',
+    'end_date', 'rental_company', 'rental_vehicle',
+    'rental_confirmation', 'rental_notes', 'rental_start_date',
+    'items', 'timeline_latest', 'timeline_count', 'created_at', 'updated_at'
+]
+JOB_SUMMARY_FIELDS = [f for f in JOB_FIELDS if f not in ('items', 'notes', 'rental_notes')]
+
+# Timeline history is an append-only subcollection, jobs/<id>/timeline. The job
+# document itself only keeps the newest entry and the number of entries.
+TIMELINE_SUBCOLLECTION = 'timeline'
+
+# Items are stored as item_map (item id -> item) plus item_order (ids in display
+# order), so single items can be updated by field path without rewriting the
+# others. Reads turn them back into the items list the API has always returned.
+# Item ids become part of field paths, so only plain ids are kept.
+ITEM_FIELD_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+ITEM_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Stored fields behind each API field, for select() projections
+STORED_FIELDS = {
+    'items': ['items', 'item_map', 'item_order'],
+    'timeline_latest': ['timeline_latest', 'timeline'],
+    'timeline_count': ['timeline_count', 'timeline'],
+}
+
+# Workflow stages and boolean status flags; GET /jobs filters and /jobs/stats
+# counts use these. Filtered queries rely on the composite indexes in
+# firestore.indexes.json (deploy with `firebase deploy --only firestore:indexes`).
+JOB_STAGES = ['confirmed', 'preparation', 'in_progress', 'ready', 'done']
+JOB_FLAGS = ['car_here', 'parts_ordered', 'parts_arrived', 'customer_notified', 'rental_requested']
+
+# Stored lookup keys for exact vehicle matches: normalized VIN and plate
+VEHICLE_KEY_FIELDS = {'vin': ('vehicle_vin', 'vin_key'), 'plate': ('vehicle_plate', 'plate_key')}
+
+class WriteConflict(Exception):
+    """Raised when a document changed since the version the client sent in If-Match."""
+    pass
+
+
+def _write_option(last_update_time):
+    """Firestore precondition for a write, or None when there is no expected version."""
+    return get_db().write_option(last_update_time=last_update_time) if last_update_time else None
+
+def _check_update_time(update_time, expected):
+    """Raise WriteConflict if a document's update_time isn't the expected one."""
+    if expected is not None and (update_time is None or update_time.rfc3339() != expected.rfc3339()):
+        raise WriteConflict('Document was modified since it was read')
+
+def _collection_version(collection_ref):
+    """(latest updated_at, document count) for a collection, from two small queries."""
+    latest = collection_ref.order_by('updated_at', direction='DESCENDING').select(['updated_at']).limit(1)
+    updated_at = [doc.get('updated_at') for doc in latest.stream()]
+    count = collection_ref.count().get()[0][0].value
+    return (updated_at[0] if updated_at else '', count)
 
 # Insurance Case Operations
 
@@ -34,6 +131,15 @@ def get_insurance_case_by_id(case_id):
     doc = insurance_ref.document(str(case_id)).get()
     return insurance_doc_to_dict(doc)
 
+def get_insurance_case_with_update_time(case_id):
+    """Retrieve an insurance case and its document update_time, or (None, None)."""
+    doc = get_insurance_collection().document(str(case_id)).get()
+    return insurance_doc_to_dict(doc), doc.update_time
+
+def get_insurance_cases_version():
+    """(latest updated_at, count) of the insurance cases, for list ETags."""
+    return _collection_version(get_insurance_collection())
+
 def create_insurance_case(data):
     """Create a new insurance case in Firestore."""
     insurance_ref = get_insurance_collection()
@@ -50,8 +156,11 @@ def create_insurance_case(data):
     update_time, doc_ref = insurance_ref.add(case_data)
     return get_insurance_case_by_id(doc_ref.id)
 
-def update_insurance_case(case_id, data):
-    """Update an insurance case."""
+def update_insurance_case(case_id, data, if_match=None):
+    """
+    Update an insurance case.
+    if_match: expected document update_time; raises WriteConflict if it changed.
+    """
     insurance_ref = get_insurance_collection()
     doc_ref = insurance_ref.document(str(case_id))
     
@@ -63,16 +172,38 @@ def update_insurance_case(case_id, data):
         
     if updates:
         updates['updated_at'] = datetime.now().isoformat()
-        doc_ref.update(updates)
+        try:
+            doc_ref.update(updates, option=_write_option(if_match))
+        except FailedPrecondition:
+            raise WriteConflict('Insurance case was modified since it was read')
+    elif if_match is not None:
+        _check_update_time(doc_ref.get().update_time, if_match)
         
     return get_insurance_case_by_id(case_id)
 
-def delete_insurance_case(case_id):
-    """Delete an insurance case and its associated photos from storage."""
-    case = get_insurance_case_by_id(case_id)
-    if not case:
-        return False
-        
+def delete_insurance_case(case_id, if_match=None):
+    """
+    Delete an insurance case and its associated photos from storage.
+    if_match: expected document update_time; raises WriteConflict if it changed.
+    The document is deleted first, so a failed delete never leaves a case
+    pointing at photos that are gone.
+    """
+    insurance_ref = get_insurance_collection()
+    while True:
+        case, update_time = get_insurance_case_with_update_time(case_id)
+        if not case:
+            return False
+        _check_update_time(update_time, if_match)
+
+        # Delete Firestore document, only as read so the photo list below is complete
+        try:
+            insurance_ref.document(str(case_id)).delete(option=_write_option(update_time))
+            break
+        except FailedPrecondition:
+            if if_match is not None:
+                raise WriteConflict('Insurance case was modified since it was read')
+            # Changed (e.g. a photo was added) since it was read; read it again
+
     # Delete photos from storage
     try:
         bucket = get_storage_bucket()
@@ -89,10 +220,6 @@ def delete_insurance_case(case_id):
                 print(f"Failed to delete photo {photo.get('name')}: {e}")
     except Exception as e:
         print(f"Storage error during case deletion: {e}")
-        
-    # Delete Firestore document
-    insurance_ref = get_insurance_collection()
-    insurance_ref.document(str(case_id)).delete()
     return True
 
 # Initialize Firebase
@@ -106,19 +233,39 @@ def doc_to_dict(doc):
     """Convert a Firestore DocumentSnapshot to a dictionary with ID."""
     if not doc.exists:
         return None
-    data = doc.to_dict()
+    return _job_from_data(doc.to_dict(), doc.id)
+
+def _job_from_data(data, job_id):
+    """Turn stored job fields into the job dictionary the API returns."""
     # Ensure ID is a string for consistency
-    data['id'] = str(doc.id)
+    data['id'] = str(job_id)
     
-    # Ensure items and timeline are lists
-    if 'items' not in data or data['items'] is None:
-        data['items'] = []
-    if 'timeline' not in data or data['timeline'] is None:
-        data['timeline'] = []
+    # Build the items list; map entries missing from item_order were removed.
+    # Jobs not written since items got ids still store a plain array, which
+    # comes first if item-level writes have added mapped items since.
+    item_map = data.pop('item_map', None)
+    item_order = data.pop('item_order', None)
+    legacy_items = data.get('items') or []
+    if item_map is not None:
+        data['items'] = list(legacy_items) + [
+            dict(item_map[item_id], id=item_id) for item_id in item_order or [] if item_id in item_map
+        ]
+    else:
+        data['items'] = legacy_items
+
+    # Timeline history is loaded separately (get_job_timeline); jobs written
+    # before the timeline subcollection may still carry an array of older entries
+    legacy_timeline = data.pop('timeline', None) or []
+    data['timeline_count'] = len(legacy_timeline) + (data.get('timeline_count') or 0)
+    if not data.get('timeline_latest'):
+        data['timeline_latest'] = legacy_timeline[-1] if legacy_timeline else None
         
+    # Lookup keys are only used for queries
+    for _, key_field in VEHICLE_KEY_FIELDS.values():
+        data.pop(key_field, None)
+
     # Convert boolean fields if they are stored as ints/strings
-    bool_fields = ['car_here', 'parts_ordered', 'parts_arrived', 'customer_notified', 'rental_requested']
-    for field in bool_fields:
+    for field in JOB_FLAGS:
         if field in data:
             data[field] = bool(data[field])
         else:
@@ -126,24 +273,533 @@ def doc_to_dict(doc):
             
     return data
 
+class JobsView:
+    """
+    In-memory copy of the jobs collection, kept current by a Firestore
+    on_snapshot listener so job reads don't go over the network.
+    Writes made through this module are applied to the view immediately.
+    Changes delivered by the listener are also kept as a short, numbered
+    event log that /jobs/stream clients follow with wait_for_events().
+    """
+
+    def __init__(self, retry_seconds, backlog=JOBS_STREAM_BACKLOG):
+        self.retry_seconds = retry_seconds
+        self._lock = Lock()
+        self._changed = Condition(self._lock)
+        self._events = deque(maxlen=backlog)  # (sequence, type, payload), oldest first
+        self._sequence = 0
+        self._loaded_once = False
+        self._watch = None
+        self._started_at = 0.0
+        self._ready = False
+        self._jobs = {}  # job id -> (update_time, job dict)
+        self._deleted = set()  # ids deleted here whose REMOVED event hasn't arrived yet
+        self._ordered = None  # jobs newest first; rebuilt after changes
+        self.search_index = JobSearchIndex()
+        self._by_vehicle = {}  # ('vin' or 'plate', key) -> job ids
+
+    def healthy(self):
+        """
+        True when the listener is running and has delivered its first snapshot.
+        Starts the listener on first use and restarts it (at most every
+        retry_seconds) after it fails.
+        """
+        with self._lock:
+            if self._watch is not None and self._watch.is_active:
+                return self._ready
+            if time.time() - self._started_at < self.retry_seconds:
+                return False
+
+            if self._watch is not None:
+                print("Jobs view listener stopped, restarting it")
+                get_metrics().increment('jobs_view.restarts')
+                try:
+                    self._watch.unsubscribe()
+                except Exception:
+                    pass
+            self._ready = False
+            self._started_at = time.time()
+            try:
+                query = get_jobs_collection().order_by('created_at', direction='DESCENDING')
+                self._watch = query.on_snapshot(self._on_snapshot)
+            except Exception as e:
+                print(f"Failed to start jobs view listener: {e}")
+                self._watch = None
+            return False
+
+    def all(self):
+        """All jobs, newest first (shallow copies)."""
+        with self._lock:
+            return [dict(job) for job in self._newest_first()]
+
+    def page(self, after, count, filters=None):
+        """
+        Up to `count` jobs (shallow copies; all of them if count is None)
+        following the (created_at, id) position `after` in newest-first
+        order, or from the start. filters as for get_jobs_page.
+        """
+        with self._lock:
+            ordered = self._newest_first()
+            if filters:
+                ordered = [job for job in ordered if _matches_filters(job, filters)]
+            start = 0
+            if after is not None:
+                # Binary search in the descending list for the first key below `after`
+                low, high = 0, len(ordered)
+                while low < high:
+                    mid = (low + high) // 2
+                    if (ordered[mid].get('created_at', ''), ordered[mid]['id']) < after:
+                        high = mid
+                    else:
+                        low = mid + 1
+                start = low
+            end = None if count is None else start + count
+            return [dict(job) for job in ordered[start:end]]
+
+    def counts(self):
+        """Number of jobs in total, per stage and per true flag."""
+        with self._lock:
+            jobs = [job for _, job in self._jobs.values()]
+        stages = {stage: 0 for stage in JOB_STAGES}
+        flags = {flag: 0 for flag in JOB_FLAGS}
+        for job in jobs:
+            if job.get('stage') in stages:
+                stages[job['stage']] += 1
+            for flag in JOB_FLAGS:
+                if job.get(flag):
+                    flags[flag] += 1
+        return {'total': len(jobs), 'stages': stages, 'flags': flags}
+
+    def by_vehicle(self, kind, key):
+        """Copies of the jobs whose normalized VIN or plate (kind 'vin' or 'plate') is key, newest first."""
+        with self._lock:
+            jobs = [self._jobs[job_id][1] for job_id in self._by_vehicle.get((kind, key), ())]
+        jobs.sort(key=lambda j: (j.get('created_at', ''), j['id']), reverse=True)
+        return [dict(job) for job in jobs]
+
+    def changed_since(self, since):
+        """Copies of jobs whose updated_at is after the `since` timestamp."""
+        with self._lock:
+            return [dict(job) for _, job in self._jobs.values() if job.get('updated_at', '') > since]
+
+    def get(self, job_id):
+        """A copy of one job, or None if the view doesn't have it."""
+        return self.get_with_update_time(job_id)[0]
+
+    def get_with_update_time(self, job_id):
+        """(copy of the job, its update_time), or (None, None) if the view doesn't have it."""
+        with self._lock:
+            entry = self._jobs.get(str(job_id))
+            return (dict(entry[1]), entry[0]) if entry else (None, None)
+
+    def version(self):
+        """(latest updated_at, number of jobs), matching _collection_version."""
+        with self._lock:
+            latest = max((job.get('updated_at', '') for _, job in self._jobs.values()), default='')
+            return latest, len(self._jobs)
+
+    def last_event(self):
+        """Sequence number of the newest change event (0 before any)."""
+        with self._lock:
+            return self._sequence
+
+    def wait_for_events(self, seen, timeout):
+        """
+        Block until there are events after sequence `seen` or `timeout` passes.
+        Returns the (sequence, type, payload) events after `seen`, or None if
+        some of them already fell out of the backlog and the client must resync.
+        Types are 'add' and 'modify' (payload: the job), 'remove' (payload:
+        {'id'}) and 'resync' (the listener restarted and changes may be missing).
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._sequence > seen, timeout=timeout)
+            if self._sequence > seen and (not self._events or self._events[0][0] > seen + 1):
+                return None
+            return [event for event in self._events if event[0] > seen]
+
+    def put(self, job_id, update_time, job):
+        """Apply a job written or read by this process."""
+        with self._lock:
+            if self._live() and job_id not in self._deleted:
+                self._store(job_id, update_time, job)
+
+    def patch(self, job_id, update_time, updates):
+        """
+        Apply an update written by this process to the stored job and return
+        a copy of the result, or None if the view doesn't have the job or
+        isn't current (the listener's next full snapshot replaces it anyway).
+        Increment transforms are added to the stored values.
+        """
+        with self._lock:
+            current = self._jobs.get(job_id) if self._live() else None
+            if current is None:
+                return None
+            job = dict(current[1])
+            for field, value in updates.items():
+                if isinstance(value, firestore.Increment):
+                    job[field] = (job.get(field) or 0) + value.value
+                else:
+                    job[field] = value
+            self._store(job_id, update_time, job)
+            return dict(job)
+
+    def patch_item(self, job_id, update_time, item_id, fields, updated_at):
+        """
+        Apply an item change written by this process: merge `fields` into the
+        item (adding it if new), or remove the item when fields is None.
+        Returns a copy of the item, or None if the view doesn't have the job
+        or isn't current.
+        """
+        with self._lock:
+            current = self._jobs.get(job_id) if self._live() else None
+            if current is None:
+                return None
+            job = dict(current[1], updated_at=updated_at)
+            items = [item for item in job.get('items', []) if fields is not None or item.get('id') != item_id]
+            item = None
+            if fields is not None:
+                index = next((i for i, it in enumerate(items) if it.get('id') == item_id), None)
+                item = dict(items[index] if index is not None else {}, **fields, id=item_id)
+                if index is None:
+                    items.append(item)
+                else:
+                    items[index] = item
+            job['items'] = items
+            self._store(job_id, update_time, job)
+            return dict(item) if item is not None else None
+
+    def discard(self, job_id):
+        """Remove a job deleted by this process."""
+        with self._lock:
+            self._unstore(job_id)
+            self._deleted.add(job_id)
+            self._ordered = None
+
+    def restore(self, job_id, update_time, job):
+        """Apply a job re-created by this process after discard() (e.g. restored from the archive)."""
+        with self._lock:
+            self._deleted.discard(job_id)
+            if self._live():
+                self._store(job_id, update_time, job)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        """Listener callback (runs on the listener's thread)."""
+        with self._lock:
+            if not self._ready:
+                # First snapshot after (re)start: replace everything
+                self._deleted &= {doc.id for doc in docs}
+                self._jobs = {
+                    doc.id: (doc.update_time, doc_to_dict(doc))
+                    for doc in docs if doc.id not in self._deleted
+                }
+                self.search_index.rebuild(job for _, job in self._jobs.values())
+                self._by_vehicle = {}
+                for _, job in self._jobs.values():
+                    self._index_vehicle(job['id'], None, job)
+                self._ready = True
+                if self._loaded_once:
+                    self._emit('resync', None)
+                self._loaded_once = True
+            else:
+                for change in changes:
+                    doc = change.document
+                    if change.type.name == 'REMOVED':
+                        self._unstore(doc.id)
+                        self._deleted.discard(doc.id)
+                        self._emit('remove', {'id': doc.id})
+                    elif doc.id not in self._deleted:
+                        self._store(doc.id, doc.update_time, doc_to_dict(doc))
+                        event = 'add' if change.type.name == 'ADDED' else 'modify'
+                        self._emit(event, dict(self._jobs[doc.id][1]))
+            self._ordered = None
+            self._changed.notify_all()
+
+    def _live(self):
+        """True while the listener is running and has loaded its first snapshot (caller holds the lock)."""
+        return self._ready and self._watch is not None and self._watch.is_active
+
+    def _emit(self, event_type, payload):
+        """Append a change event to the log (caller holds the lock)."""
+        self._sequence += 1
+        self._events.append((self._sequence, event_type, payload))
+
+    def _newest_first(self):
+        """Jobs sorted like the Firestore query: created_at, then id, descending (caller holds the lock)."""
+        if self._ordered is None:
+            jobs = [job for _, job in self._jobs.values()]
+            jobs.sort(key=lambda j: (j.get('created_at', ''), j['id']), reverse=True)
+            self._ordered = jobs
+        return self._ordered
+
+    def _store(self, job_id, update_time, job):
+        """Keep the newer of the stored and the given version (caller holds the lock)."""
+        current = self._jobs.get(job_id)
+        if current is None or current[0] is None or update_time is None or update_time >= current[0]:
+            self._jobs[job_id] = (update_time, job)
+            self.search_index.put(job)
+            self._index_vehicle(job_id, current[1] if current else None, job)
+            self._ordered = None
+
+    def _unstore(self, job_id):
+        """Forget a job (caller holds the lock)."""
+        current = self._jobs.pop(job_id, None)
+        self.search_index.remove(job_id)
+        if current is not None:
+            self._index_vehicle(job_id, current[1], None)
+
+    def _index_vehicle(self, job_id, old_job, new_job):
+        """Move a job between _by_vehicle entries when its VIN or plate changes (caller holds the lock)."""
+        for kind, (field, _) in VEHICLE_KEY_FIELDS.items():
+            old_key = vehicle_key(old_job.get(field)) if old_job else ''
+            new_key = vehicle_key(new_job.get(field)) if new_job else ''
+            if old_key == new_key:
+                continue
+            if old_key:
+                ids = self._by_vehicle.get((kind, old_key))
+                if ids is not None:
+                    ids.discard(job_id)
+                    if not ids:
+                        del self._by_vehicle[(kind, old_key)]
+            if new_key:
+                self._by_vehicle.setdefault((kind, new_key), set()).add(job_id)
+
+
+_jobs_view = JobsView(JOBS_VIEW_RETRY_SECONDS) if JOBS_VIEW_ENABLED else None
+
+
+def _serving_view():
+    """The jobs view if it is enabled and current, otherwise None."""
+    if _jobs_view is not None and _jobs_view.healthy():
+        return _jobs_view
+    return None
+
+def _read_job(job_id):
+    """Read a job straight from Firestore and refresh the view with it."""
+    return _read_job_with_update_time(job_id)[0]
+
+def _read_job_with_update_time(job_id):
+    """Like _read_job, also returning the document update_time."""
+    jobs_ref = get_jobs_collection()
+    doc = jobs_ref.document(str(job_id)).get()
+    job = doc_to_dict(doc)
+    if job is not None and _jobs_view is not None:
+        _jobs_view.put(doc.id, doc.update_time, job)
+    return job, doc.update_time if job is not None else None
+
 def get_all_jobs():
-    """Retrieve all jobs from Firestore."""
+    """Retrieve all jobs, from the in-process view when it is current."""
+    view = _serving_view()
+    if view is not None:
+        get_metrics().increment('jobs_view.reads')
+        return view.all()
+
+    get_metrics().increment('jobs_view.fallback_reads')
     jobs_ref = get_jobs_collection()
     # Order by created_at descending
     docs = jobs_ref.order_by('created_at', direction='DESCENDING').stream()
     return [doc_to_dict(doc) for doc in docs]
 
-def get_job_by_id(job_id):
-    """Retrieve a single job by ID from Firestore."""
-    # job_id is usually a string in Firestore (auto-generated ID)
-    jobs_ref = get_jobs_collection()
-    doc = jobs_ref.document(str(job_id)).get()
-    return doc_to_dict(doc)
+def encode_jobs_cursor(job, order_field='created_at'):
+    """Opaque page cursor pointing just after `job` in newest-first order of order_field."""
+    position = json.dumps([job.get(order_field, ''), job['id']])
+    return base64.urlsafe_b64encode(position.encode()).decode()
 
-def create_job(data):
-    """Create a new job in Firestore."""
+def decode_jobs_cursor(cursor):
+    """Inverse of encode_jobs_cursor: (order value, job id); raises ValueError for malformed cursors."""
+    try:
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(job_id, str):
+        raise ValueError('Invalid cursor')
+    return created_at, job_id
+
+def _matches_filters(job, filters):
+    """True if a job satisfies get_jobs_page filters."""
+    for field, expected in filters.items():
+        if field == 'stage':
+            if job.get('stage') not in expected:
+                return False
+        elif bool(job.get(field)) != expected:
+            return False
+    return True
+
+def _query_jobs_page(after, limit, select, filters):
+    """
+    Up to limit + 1 jobs after the cursor position, read from Firestore.
+    Only the stage filter (or, without one, the first flag) goes into the query,
+    since firestore.indexes.json has no index for two flags at once; further
+    flags are checked here, reading on until the page is full.
+    """
+    query = get_jobs_collection().order_by('created_at', direction='DESCENDING') \
+        .order_by('__name__', direction='DESCENDING')
+    queried = 'stage' if 'stage' in filters else next(iter(filters), None)
+    if queried == 'stage':
+        query = query.where(filter=firestore.FieldFilter('stage', 'in', list(filters['stage'])))
+    elif queried is not None:
+        query = query.where(filter=firestore.FieldFilter(queried, '==', filters[queried]))
+    remaining = {field: expected for field, expected in filters.items() if field != queried}
+    if select:
+        stored = {name for field in select for name in STORED_FIELDS.get(field, [field])}
+        query = query.select(sorted(stored | set(remaining) | {'created_at'}))
+
+    jobs = []
+    while True:
+        page = query
+        if after is not None:
+            page = page.start_after({'created_at': after[0], '__name__': after[1]})
+        if limit is not None:
+            page = page.limit(limit + 1)
+        read = [doc_to_dict(doc) for doc in page.stream()]
+        jobs.extend(job for job in read if _matches_filters(job, remaining))
+        if not remaining or limit is None or len(jobs) > limit or len(read) <= limit:
+            return jobs
+        after = (read[-1].get('created_at', ''), read[-1]['id'])
+
+def get_jobs_page(limit, cursor=None, select=None, filters=None):
+    """
+    Retrieve one page of jobs, newest first.
+
+    Args:
+        limit: maximum number of jobs to return, or None for all of them
+        cursor: next_cursor from the previous page, or None for the first page
+        select: optional list of fields to fetch when reading Firestore directly
+        filters: optional {'stage': [stages], <flag>: bool} to narrow the jobs
+
+    Returns:
+        (jobs, next_cursor); next_cursor is None on the last page
+    """
+    after = decode_jobs_cursor(cursor) if cursor else None
+
+    view = _serving_view()
+    if view is not None:
+        get_metrics().increment('jobs_view.reads')
+        jobs = view.page(after, None if limit is None else limit + 1, filters)
+    else:
+        get_metrics().increment('jobs_view.fallback_reads')
+        jobs = _query_jobs_page(after, limit, select, filters or {})
+
+    if limit is None or len(jobs) <= limit:
+        return jobs, None
+    return jobs[:limit], encode_jobs_cursor(jobs[limit - 1])
+
+def get_job_stats():
+    """
+    Job totals: {'total', 'stages': {stage: n}, 'flags': {flag: n true}}.
+    Counted in memory from the jobs view when it is current, otherwise with
+    Firestore count() aggregations (one per stage and flag, run in parallel).
+    """
+    view = _serving_view()
+    if view is not None:
+        get_metrics().increment('jobs_view.reads')
+        return view.counts()
+
+    get_metrics().increment('jobs_view.fallback_reads')
     jobs_ref = get_jobs_collection()
-    
+    queries = {('total', None): jobs_ref}
+    for stage in JOB_STAGES:
+        queries[('stages', stage)] = jobs_ref.where(filter=firestore.FieldFilter('stage', '==', stage))
+    for flag in JOB_FLAGS:
+        queries[('flags', flag)] = jobs_ref.where(filter=firestore.FieldFilter(flag, '==', True))
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = {key: executor.submit(lambda q: q.count().get()[0][0].value, query)
+                   for key, query in queries.items()}
+    stats = {'total': 0, 'stages': {}, 'flags': {}}
+    for (group, name), future in futures.items():
+        if name is None:
+            stats[group] = future.result()
+        else:
+            stats[group][name] = future.result()
+    return stats
+
+def summarize_job(job):
+    """Compact form of a job for list and kanban screens: no items, timeline or notes."""
+    summary = {field: job[field] for field in JOB_SUMMARY_FIELDS if field in job}
+    summary['id'] = job['id']
+    items = job.get('items') or []
+    summary['item_count'] = len(items)
+    summary['items_preview'] = [item.get('desc') or item.get('type', '') for item in items[:3] if isinstance(item, dict)]
+    summary['has_replace_items'] = any(
+        isinstance(item, dict) and (item.get('type') or '').lower() == 'replace' for item in items
+    )
+    return summary
+
+def project_job(job, fields):
+    """Only the requested fields of a job, plus its id."""
+    projected = {field: job[field] for field in fields if field in job}
+    projected['id'] = job['id']
+    return projected
+
+def get_job_by_id(job_id):
+    """Retrieve a single job by ID, from the in-process view when it is current."""
+    return get_job_with_update_time(job_id)[0]
+
+def get_job_with_update_time(job_id):
+    """Retrieve a job and its document update_time, or (None, None)."""
+    view = _serving_view()
+    if view is not None:
+        job, update_time = view.get_with_update_time(job_id)
+        if job is not None:
+            get_metrics().increment('jobs_view.reads')
+            return job, update_time
+    # Not in the view yet (e.g. just created on another instance) or view unavailable
+    get_metrics().increment('jobs_view.fallback_reads')
+    return _read_job_with_update_time(job_id)
+
+def get_jobs_version():
+    """(latest updated_at, count) of the jobs collection, for list ETags."""
+    view = _serving_view()
+    if view is not None:
+        return view.version()
+    return _collection_version(get_jobs_collection())
+
+def vehicle_key(value):
+    """Normalized VIN or plate for exact lookups: upper case letters and digits only."""
+    return re.sub(r'[^A-Z0-9]', '', str(value or '').upper())
+
+def get_jobs_by_vehicle(kind, value, include_archived=False):
+    """
+    Jobs for one vehicle, newest first, by exact VIN or plate (kind 'vin' or 'plate').
+    Matching ignores case, spaces and punctuation. Served from the jobs view's
+    lookup map when it is current, otherwise from an equality query on the stored key.
+    include_archived adds archived jobs (after the active ones).
+    """
+    key = vehicle_key(value)
+    if not key:
+        return []
+    _, key_field = VEHICLE_KEY_FIELDS[kind]
+    view = _serving_view()
+    if view is not None:
+        get_metrics().increment('jobs_view.reads')
+        jobs = view.by_vehicle(kind, key)
+    else:
+        get_metrics().increment('jobs_view.fallback_reads')
+        query = get_jobs_collection().where(filter=firestore.FieldFilter(key_field, '==', key))
+        jobs = sorted((doc_to_dict(doc) for doc in query.stream()),
+                      key=lambda j: (j.get('created_at', ''), j['id']), reverse=True)
+    if include_archived:
+        query = get_archive_collection().where(filter=firestore.FieldFilter(key_field, '==', key))
+        jobs += sorted((doc_to_dict(doc) for doc in query.stream()),
+                       key=lambda j: (j.get('created_at', ''), j['id']), reverse=True)
+    return jobs
+
+def find_open_job_for_vehicle(data):
+    """
+    The newest job that isn't done for the VIN in data, or else for its plate;
+    None if there is none (or data has neither).
+    """
+    for kind, (field, _) in VEHICLE_KEY_FIELDS.items():
+        for job in get_jobs_by_vehicle(kind, data.get(field)):
+            if job.get('stage') != 'done':
+                return job
+    return None
+
+def _new_job_document(data):
+    """
+    Build the Firestore document for a new job from flat job fields.
+    Returns (job document, its initial timeline entries).
+    """
     # All new jobs start at 'confirmed' stage
     initial_stage = data.get('stage', 'confirmed')
     
@@ -170,7 +826,9 @@ def create_job(data):
         'vehicle_make_model': data.get('vehicle_make_model', ''),
         'vehicle_plate': data.get('vehicle_plate', ''),
         'vehicle_vin': data.get('vehicle_vin', ''),
-        'items': data.get('items', []),
+        'vin_key': vehicle_key(data.get('vehicle_vin')),
+        'plate_key': vehicle_key(data.get('vehicle_plate')),
+        **_stored_items(data.get('items', [])),
         'notes': data.get('notes', ''),
         'start_date': data.get('start_date', ''),
         'end_date': data.get('end_date', ''),
@@ -179,21 +837,112 @@ def create_job(data):
         'rental_confirmation': data.get('rental_confirmation', ''),
         'rental_notes': data.get('rental_notes', ''),
         'rental_start_date': data.get('rental_start_date', ''),
-        'timeline': timeline,
+        'timeline_latest': timeline[-1] if timeline else None,
+        'timeline_count': len(timeline),
         'created_at': now,
         'updated_at': now
     }
+    return job_data, timeline
+
+def _stored_items(items):
+    """item_map and item_order fields for a list of items; items without a valid id get one."""
+    item_map, item_order = {}, []
+    for item in items or []:
+        item = dict(item)
+        item_id = str(item.pop('id', '') or '')
+        if item_id in item_map or not ITEM_ID_RE.match(item_id):
+            item_id = uuid.uuid4().hex
+        item_map[item_id] = item
+        item_order.append(item_id)
+    return {'item_map': item_map, 'item_order': item_order}
+
+def _timeline_writes(doc_ref, entries):
+    """Create writes for new timeline entries of a job (the subcollection is append-only)."""
+    now = datetime.now().isoformat()
+    timeline_ref = doc_ref.collection(TIMELINE_SUBCOLLECTION)
+    return [
+        ('create', timeline_ref.document(), dict(entry, recorded_at=now, sequence=index), None)
+        for index, entry in enumerate(entries)
+    ]
+
+def _add_writes(batch, writes):
+    """Add planned (kind, ref, payload, option) writes to a WriteBatch."""
+    for kind, ref, payload, option in writes:
+        if kind == 'create':
+            batch.create(ref, payload)
+        elif kind == 'update':
+            batch.update(ref, payload, option=option)
+        elif kind == 'delete':
+            batch.delete(ref, option=option)
+        else:
+            batch.set(ref, payload)
+
+def _without_transforms(updates):
+    """Written fields minus server-side transforms (e.g. Increment), for responses."""
+    return {field: value for field, value in updates.items() if not isinstance(value, firestore.Increment)}
+
+def create_job(data):
+    """Create a new job and its first timeline entries in one commit; the result is built from the written data."""
+    jobs_ref = get_jobs_collection()
+    job_data, timeline = _new_job_document(data)
     
     # Add to Firestore
-    update_time, doc_ref = jobs_ref.add(job_data)
+    doc_ref = jobs_ref.document()
+    batch = get_db().batch()
+    _add_writes(batch, [('create', doc_ref, job_data, None)] + _timeline_writes(doc_ref, timeline))
+    write_results = batch.commit()
     
-    return get_job_by_id(doc_ref.id)
+    job = _job_from_data(dict(job_data), doc_ref.id)
+    if _jobs_view is not None:
+        _jobs_view.put(doc_ref.id, write_results[0].update_time, dict(job))
+    return job
 
-def update_job(job_id, data):
-    """Update an existing job in Firestore."""
+def create_jobs_batch(jobs_data):
+    """
+    Create many jobs with batched writes (up to MAX_BATCH_WRITES writes, job
+    documents plus their timeline entries, per commit).
+    Returns the created jobs, built from the written data instead of re-reading them.
+    """
     jobs_ref = get_jobs_collection()
-    doc_ref = jobs_ref.document(str(job_id))
-    
+    planned = []  # (job, writes)
+    for data in jobs_data:
+        doc_ref = jobs_ref.document()
+        job_data, timeline = _new_job_document(data)
+        writes = [('create', doc_ref, job_data, None)] + _timeline_writes(doc_ref, timeline)
+        planned.append((_job_from_data(dict(job_data), doc_ref.id), writes))
+
+    created = []
+    for chunk in _chunk_writes(planned):
+        batch = get_db().batch()
+        for _, writes in chunk:
+            _add_writes(batch, writes)
+        write_results = batch.commit()
+        position = 0
+        for job, writes in chunk:
+            if _jobs_view is not None:
+                _jobs_view.put(job['id'], write_results[position].update_time, dict(job))
+            position += len(writes)
+            created.append(job)
+    return created
+
+def _chunk_writes(planned):
+    """Group planned entries (whose last element is their write list) into commits of at most MAX_BATCH_WRITES writes."""
+    chunks, chunk, chunk_writes = [], [], 0
+    for entry in planned:
+        if chunk and chunk_writes + len(entry[-1]) > MAX_BATCH_WRITES:
+            chunks.append(chunk)
+            chunk, chunk_writes = [], 0
+        chunk.append(entry)
+        chunk_writes += len(entry[-1])
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def _job_updates(data, timeline_entries=()):
+    """
+    The updatable job fields present in data, plus a fresh updated_at (or {} if none).
+    timeline_entries being appended update the job's latest entry and count.
+    """
     # Prepare updates
     updates = {}
     
@@ -204,28 +953,633 @@ def update_job(job_id, data):
         'vehicle_plate', 'vehicle_vin', 'notes', 'start_date', 
         'end_date', 'rental_company', 'rental_vehicle', 
         'rental_confirmation', 'rental_notes', 'rental_start_date',
-        'items', 'timeline'
+        'items'
     ]
     
     for field in field_mapping:
         if field in data:
             updates[field] = data[field]
-            
+    if 'items' in updates:
+        # Give every item an id now, so the response and the view carry them
+        stored = _stored_items(updates['items'])
+        updates['items'] = [dict(stored['item_map'][i], id=i) for i in stored['item_order']]
+    if timeline_entries:
+        updates['timeline_latest'] = timeline_entries[-1]
+        updates['timeline_count'] = firestore.Increment(len(timeline_entries))
     if updates:
         updates['updated_at'] = datetime.now().isoformat()
-        doc_ref.update(updates)
-        
-    return get_job_by_id(job_id)
+    return updates
+
+def _timeline_append(data):
+    """
+    Timeline entries an update appends (its timeline_append list). Raises
+    ValueError for the whole timeline array older clients sent, since telling
+    its new entries apart would take a read of the job.
+    """
+    if data.get('timeline'):
+        raise ValueError('Send new timeline entries as timeline_append')
+    return list(data.get('timeline_append') or [])
+
+def _job_update_writes(doc_ref, data, if_match=None):
+    """(updates, planned writes) for updating a job and appending to its timeline; raises ValueError."""
+    entries = _timeline_append(data)
+    updates = _job_updates(data, entries)
+    if not updates:
+        return updates, []
+    stored = dict(updates)
+    if 'items' in stored:
+        stored.update(_stored_items(stored['items']), items=firestore.DELETE_FIELD)
+    for field, key_field in VEHICLE_KEY_FIELDS.values():
+        if field in stored:
+            stored[key_field] = vehicle_key(stored[field])
+    writes = [('update', doc_ref, stored, _write_option(if_match))] + _timeline_writes(doc_ref, entries)
+    return updates, writes
 
-def delete_job(job_id):
-    """Delete a job from Firestore."""
+def update_job(job_id, data, if_match=None):
+    """
+    Update an existing job in Firestore with a single write.
+    if_match: expected document update_time; raises WriteConflict if it changed.
+
+    Returns the updated job, or None if it doesn't exist. Raises ValueError for invalid data.
+    """
+    return update_job_with_update_time(job_id, data, if_match)[0]
+
+def update_job_with_update_time(job_id, data, if_match=None):
+    """
+    update_job, also returning the job's update_time after the write and
+    whether the job is complete: (job, update_time, complete), or
+    (None, None, False) if it doesn't exist. Raises ValueError for invalid data.
+    The job is the jobs view's copy with the update applied; when the view
+    doesn't have it, only the id and the written fields are returned, without
+    server-side counters (e.g. timeline_count), and complete is False.
+    """
     jobs_ref = get_jobs_collection()
-    # Check if exists first
     doc_ref = jobs_ref.document(str(job_id))
-    if doc_ref.get().exists:
-        doc_ref.delete()
+    updates, writes = _job_update_writes(doc_ref, data, if_match)
+    
+    if not updates:
+        job, update_time = get_job_with_update_time(job_id)
+        if job is not None:
+            _check_update_time(update_time, if_match)
+        return job, update_time, job is not None
+
+    try:
+        # The update fails (and with it any timeline entries) if the document doesn't exist
+        batch = get_db().batch()
+        _add_writes(batch, writes)
+        write_results = batch.commit()
+    except NotFound:
+        return None, None, False
+    except FailedPrecondition:
+        raise WriteConflict('Job was modified since it was read')
+
+    update_time = write_results[0].update_time
+    job = _jobs_view.patch(doc_ref.id, update_time, updates) if _jobs_view is not None else None
+    if job is None:
+        return dict(_without_transforms(updates), id=doc_ref.id), update_time, False
+    return job, update_time, True
+
+def append_job_timeline(job_id, entries, if_match=None):
+    """
+    Append entries to a job's timeline. Same result and errors as update_job_with_update_time.
+    """
+    return update_job_with_update_time(job_id, {'timeline_append': entries}, if_match=if_match)
+
+def _check_item_id(item_id):
+    """Raise ValueError unless item_id is safe to use in a field path."""
+    if not isinstance(item_id, str) or not ITEM_ID_RE.match(item_id):
+        raise ValueError(f"Invalid item id: {item_id}")
+
+def _item_fields(fields):
+    """Validated item fields for a field-path update; raises ValueError."""
+    if not isinstance(fields, dict) or not fields:
+        raise ValueError('Expected an object of item fields')
+    for field in fields:
+        if field == 'id' or not ITEM_FIELD_RE.match(str(field)):
+            raise ValueError(f"Invalid item field: {field}")
+    return dict(fields)
+
+def _commit_item_update(job_id, updates, if_match):
+    """
+    Write an item-level update to a job in one request, with an exists (or
+    If-Match) precondition instead of a pre-read. Returns its update_time, or
+    None if the job doesn't exist. Raises WriteConflict if If-Match failed.
+    """
+    option = _write_option(if_match) or get_db().write_option(exists=True)
+    try:
+        write_result = get_jobs_collection().document(str(job_id)).update(updates, option=option)
+    except NotFound:
+        return None
+    except FailedPrecondition:
+        if if_match is None:
+            return None  # the exists precondition failed
+        raise WriteConflict('Job was modified since it was read')
+    return write_result.update_time
+
+def _viewed_job(job_id):
+    """The jobs view's copy of a job and its update_time when the view is current, else (None, None)."""
+    view = _serving_view()
+    return view.get_with_update_time(job_id) if view is not None else (None, None)
+
+def add_job_item(job_id, item, if_match=None):
+    """
+    Add an item to a job with a field-path write that leaves other items alone.
+    Returns the item with its new id, or None if the job doesn't exist.
+    Raises ValueError for invalid fields and WriteConflict if If-Match failed.
+    """
+    fields = _item_fields({k: v for k, v in (item or {}).items() if k != 'id'})
+    job, update_time = _viewed_job(job_id)
+    if job is not None and any(not existing.get('id') for existing in job['items']):
+        # Items still stored as a plain array: rewrite them once with ids
+        updated = update_job(job_id, {'items': job['items'] + [fields]}, if_match=if_match or update_time)
+        return dict(updated['items'][-1]) if updated else None
+
+    item_id = uuid.uuid4().hex
+    now = datetime.now().isoformat()
+    update_time = _commit_item_update(job_id, {
+        f'item_map.{item_id}': fields,
+        'item_order': firestore.ArrayUnion([item_id]),
+        'updated_at': now,
+    }, if_match)
+    if update_time is None:
+        return None
+    if _jobs_view is not None:
+        _jobs_view.patch_item(str(job_id), update_time, item_id, fields, now)
+    return dict(fields, id=item_id)
+
+def update_job_item(job_id, item_id, fields, if_match=None):
+    """
+    Set fields of one item by field path, so concurrent changes to other
+    items (or other fields of this one) are not overwritten.
+    Returns the updated item (only the written fields when the jobs view isn't
+    current), or None if the job or item doesn't exist.
+    Raises ValueError for invalid ids or fields and WriteConflict if If-Match failed.
+    """
+    _check_item_id(item_id)
+    fields = _item_fields(fields)
+    if _serving_view() is not None:
+        job = _jobs_view.get(job_id)
+        if not any(it.get('id') == item_id for it in (job or {}).get('items', [])):
+            return None
+
+    now = datetime.now().isoformat()
+    updates = {f'item_map.{item_id}.{field}': value for field, value in fields.items()}
+    updates['updated_at'] = now
+    update_time = _commit_item_update(job_id, updates, if_match)
+    if update_time is None:
+        return None
+    patched = _jobs_view.patch_item(str(job_id), update_time, item_id, fields, now) if _jobs_view is not None else None
+    return patched if patched is not None else dict(fields, id=item_id)
+
+def delete_job_item(job_id, item_id, if_match=None):
+    """
+    Remove one item from a job. Returns False if the job (or, when the jobs
+    view is current, the item) doesn't exist.
+    Raises ValueError for an invalid id and WriteConflict if If-Match failed.
+    """
+    _check_item_id(item_id)
+    if _serving_view() is not None:
+        job = _jobs_view.get(job_id)
+        if not any(it.get('id') == item_id for it in (job or {}).get('items', [])):
+            return False
+
+    now = datetime.now().isoformat()
+    update_time = _commit_item_update(job_id, {
+        f'item_map.{item_id}': firestore.DELETE_FIELD,
+        'item_order': firestore.ArrayRemove([item_id]),
+        'updated_at': now,
+    }, if_match)
+    if update_time is None:
+        return False
+    if _jobs_view is not None:
+        _jobs_view.patch_item(str(job_id), update_time, item_id, None, now)
+    return True
+
+def get_job_timeline(job_id):
+    """
+    A job's (or archived job's) full timeline, oldest first, or None if it doesn't exist.
+    Reads the timeline subcollection, after any entries still stored on the
+    job document by older versions.
+    """
+    doc_ref = get_jobs_collection().document(str(job_id))
+    doc = doc_ref.get(field_paths=['timeline'])
+    if not doc.exists:
+        # Archived jobs keep their entries under jobs/<id>/timeline
+        doc = get_archive_collection().document(str(job_id)).get(field_paths=['timeline'])
+        if not doc.exists:
+            return None
+    legacy = (doc.to_dict() or {}).get('timeline') or []
+    entries = [entry.to_dict() for entry in doc_ref.collection(TIMELINE_SUBCOLLECTION).stream()]
+    entries.sort(key=lambda e: (e.get('recorded_at', ''), e.get('sequence', 0)))
+    for entry in entries:
+        entry.pop('recorded_at', None)
+        entry.pop('sequence', None)
+    return list(legacy) + entries
+
+def _delete_timeline(doc_ref):
+    """Remove a deleted job's timeline subcollection; returns False if that failed."""
+    try:
+        get_db().recursive_delete(doc_ref.collection(TIMELINE_SUBCOLLECTION))
         return True
-    return False
+    except Exception as e:
+        print(f"Failed to delete timeline of job {doc_ref.id}: {e}")
+        return False
+
+def _tombstone(job_id, reason):
+    """Tombstone document telling delta-sync clients that a job went away."""
+    return get_tombstones_collection().document(str(job_id)), {
+        'job_id': str(job_id),
+        'reason': reason,
+        'deleted_at': datetime.now().isoformat(),
+    }
+
+def delete_job(job_id, if_match=None):
+    """
+    Delete a job from Firestore, leaving a tombstone for delta sync.
+    One commit: the delete carries an exists (or If-Match) precondition instead of a pre-read.
+    The timeline subcollection is removed later, with the tombstone (prune_tombstones).
+    if_match: expected document update_time; raises WriteConflict if it changed.
+    """
+    jobs_ref = get_jobs_collection()
+    doc_ref = jobs_ref.document(str(job_id))
+    batch = get_db().batch()
+    option = _write_option(if_match) or get_db().write_option(exists=True)
+    batch.delete(doc_ref, option=option)
+    batch.set(*_tombstone(job_id, 'deleted'))
+    try:
+        batch.commit()
+    except NotFound:
+        return False
+    except FailedPrecondition:
+        if if_match is None:
+            return False  # the exists precondition failed
+        raise WriteConflict('Job was modified since it was read')
+    if _jobs_view is not None:
+        _jobs_view.discard(doc_ref.id)
+    return True
+
+def apply_job_operations(operations):
+    """
+    Apply many job creates, updates and deletes with batched writes.
+
+    Args:
+        operations: list of dicts, each one of
+            {'op': 'create', 'data': flat job fields (as for create_job)}
+            {'op': 'update', 'id': job id, 'data': fields, 'if_match': optional update_time}
+            {'op': 'delete', 'id': job id, 'if_match': optional update_time}
+
+    Returns:
+        list of per-operation results in input order:
+        {'index', 'op', 'id', 'status': HTTP-style code, 'job' or 'error'}
+
+    Operations are committed MAX_BATCH_WRITES writes at a time. If a commit is
+    rejected (e.g. one job is missing or changed), that chunk is applied again
+    operation by operation so every result reports its own outcome. If a commit
+    fails for another reason, that chunk's operations report 500 and later
+    chunks are still tried.
+    """
+    db = get_db()
+    jobs_ref = get_jobs_collection()
+    results = [None] * len(operations)
+
+    # Plan the writes for each valid operation
+    planned = []  # (index, op, doc_ref, payload, writes)
+    for index, operation in enumerate(operations):
+        op = operation.get('op')
+        job_id = operation.get('id')
+        if op == 'create':
+            doc_ref = jobs_ref.document()
+            job_data, timeline = _new_job_document(operation.get('data') or {})
+            writes = [('create', doc_ref, job_data, None)] + _timeline_writes(doc_ref, timeline)
+            planned.append((index, op, doc_ref, job_data, writes))
+        elif op in ('update', 'delete') and job_id:
+            doc_ref = jobs_ref.document(str(job_id))
+            if_match = operation.get('if_match')
+            if if_match is not None and not isinstance(if_match, datetime):
+                results[index] = {'index': index, 'op': op, 'id': str(job_id), 'status': 400,
+                                  'error': 'if_match must be an update_time'}
+                continue
+            if op == 'update':
+                try:
+                    updates, writes = _job_update_writes(doc_ref, operation.get('data') or {}, if_match)
+                except ValueError as e:
+                    results[index] = {'index': index, 'op': op, 'id': str(job_id), 'status': 400, 'error': str(e)}
+                    continue
+                if not updates:
+                    results[index] = {'index': index, 'op': op, 'id': str(job_id), 'status': 400,
+                                      'error': 'No updatable fields'}
+                    continue
+                planned.append((index, op, doc_ref, updates, writes))
+            else:
+                option = _write_option(if_match) or db.write_option(exists=True)
+                tombstone_ref, tombstone = _tombstone(job_id, 'deleted')
+                planned.append((index, op, doc_ref, None, [
+                    ('delete', doc_ref, None, option),
+                    ('set', tombstone_ref, tombstone, None),
+                ]))
+        else:
+            results[index] = {'index': index, 'op': op, 'id': job_id, 'status': 400,
+                              'error': "Each operation needs op 'create', or 'update'/'delete' with an id"}
+
+    # Group operations into commits of at most MAX_BATCH_WRITES writes
+    for chunk in _chunk_writes(planned):
+        batch = db.batch()
+        for _, _, _, _, writes in chunk:
+            _add_writes(batch, writes)
+        try:
+            write_results = batch.commit()
+        except (NotFound, FailedPrecondition) as e:
+            print(f"Job batch commit rejected ({e}); applying {len(chunk)} operations one by one")
+            for index, op, doc_ref, payload, writes in chunk:
+                results[index] = _apply_job_operation(index, op, doc_ref, payload, writes,
+                                                      operations[index].get('if_match'))
+            continue
+        except Exception as e:
+            print(f"Job batch commit failed: {e}")
+            for index, op, doc_ref, _, _ in chunk:
+                results[index] = {'index': index, 'op': op, 'id': doc_ref.id, 'status': 500, 'error': str(e)}
+            continue
+
+        position = 0
+        for index, op, doc_ref, payload, writes in chunk:
+            update_time = write_results[position].update_time
+            position += len(writes)
+            results[index] = _job_operation_result(index, op, doc_ref.id, update_time, payload)
+
+    return results
+
+def _job_operation_result(index, op, job_id, update_time, payload):
+    """Result entry for a committed batch operation; keeps the jobs view current."""
+    result = {'index': index, 'op': op, 'id': job_id, 'status': 200}
+    if op == 'create':
+        job = _job_from_data(dict(payload), job_id)
+        if _jobs_view is not None:
+            _jobs_view.put(job_id, update_time, dict(job))
+        result.update(status=201, job=job)
+    elif op == 'update':
+        job = _jobs_view.patch(job_id, update_time, payload) if _jobs_view is not None else None
+        result['job'] = job if job is not None else dict(_without_transforms(payload), id=job_id)
+    else:
+        if _jobs_view is not None:
+            _jobs_view.discard(job_id)
+    return result
+
+def _apply_job_operation(index, op, doc_ref, payload, writes, if_match):
+    """Commit one operation's writes on their own, after its batch was rejected."""
+    result = {'index': index, 'op': op, 'id': doc_ref.id}
+    batch = get_db().batch()
+    _add_writes(batch, writes)
+    try:
+        write_results = batch.commit()
+    except NotFound:
+        return dict(result, status=404, error='Job not found')
+    except FailedPrecondition:
+        if op == 'delete' and if_match is None:
+            return dict(result, status=404, error='Job not found')  # the exists precondition failed
+        return dict(result, status=412, error='Job was modified since it was read')
+    except Exception as e:
+        print(f"Job batch operation {index} failed: {e}")
+        return dict(result, status=500, error=str(e))
+    return _job_operation_result(index, op, doc_ref.id, write_results[0].update_time, payload)
+
+def archive_done_jobs(older_than_days=None, limit=MAX_BATCH_WRITES):
+    """
+    Move up to `limit` jobs that are done and have not changed for
+    older_than_days (default ARCHIVE_AFTER_DAYS) to the archive collection.
+    Each move copies the document, deletes it from jobs (only if unchanged
+    since it was read) and leaves an 'archived' tombstone for delta sync.
+    Timeline entries stay under jobs/<id>/timeline and are found again on restore.
+
+    Returns:
+        dict: {'archived': [job ids], 'skipped': [ids that changed meanwhile]}
+    """
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    db = get_db()
+    archive_ref = get_archive_collection()
+    query = get_jobs_collection() \
+        .where(filter=firestore.FieldFilter('stage', '==', 'done')) \
+        .where(filter=firestore.FieldFilter('updated_at', '<', cutoff)) \
+        .limit(limit)
+
+    archived_at = datetime.now().isoformat()
+    planned = []  # (job id, writes)
+    for doc in query.stream():
+        planned.append((doc.id, [
+            ('set', archive_ref.document(doc.id), dict(doc.to_dict(), archived_at=archived_at), None),
+            ('delete', doc.reference, None, db.write_option(last_update_time=doc.update_time)),
+            ('set', *_tombstone(doc.id, 'archived'), None),
+        ]))
+
+    result = {'archived': [], 'skipped': []}
+    for chunk in _chunk_writes(planned):
+        batch = db.batch()
+        for _, writes in chunk:
+            _add_writes(batch, writes)
+        try:
+            batch.commit()
+            moved = [job_id for job_id, _ in chunk]
+        except (NotFound, FailedPrecondition):
+            # Someone edited one of these jobs since it was read; move the rest one by one
+            moved = []
+            for job_id, writes in chunk:
+                batch = db.batch()
+                _add_writes(batch, writes)
+                try:
+                    batch.commit()
+                    moved.append(job_id)
+                except (NotFound, FailedPrecondition):
+                    result['skipped'].append(job_id)
+        for job_id in moved:
+            if _jobs_view is not None:
+                _jobs_view.discard(job_id)
+        result['archived'].extend(moved)
+
+    get_metrics().increment('jobs.archived', len(result['archived']))
+    return result
+
+def prune_tombstones(older_than_days=None):
+    """
+    Delete tombstones older than older_than_days (default TOMBSTONE_RETENTION_DAYS),
+    along with the timeline subcollections of the deleted (not archived) jobs.
+    Clients syncing from before then get a full list from get_job_changes instead.
+    A tombstone whose timeline could not be removed is kept for the next run.
+    Returns the number of tombstones deleted.
+    """
+    days = TOMBSTONE_RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    db = get_db()
+    jobs_ref = get_jobs_collection()
+    query = get_tombstones_collection() \
+        .where(filter=firestore.FieldFilter('deleted_at', '<', cutoff))
+    planned = []  # (tombstone id, writes)
+    for doc in query.stream():
+        if (doc.to_dict() or {}).get('reason') == 'deleted' and not _delete_timeline(jobs_ref.document(doc.id)):
+            continue
+        planned.append((doc.id, [('delete', doc.reference, None, None)]))
+    for chunk in _chunk_writes(planned):
+        batch = db.batch()
+        for _, writes in chunk:
+            _add_writes(batch, writes)
+        batch.commit()
+    return len(planned)
+
+def search_archived_jobs(limit, cursor=None, vin=None, plate=None, customer=None):
+    """
+    Page through archived jobs, most recently archived first.
+
+    Args:
+        limit: maximum number of jobs to return
+        cursor: next_cursor from the previous page
+        vin / plate: vehicle VIN or plate to match (ignoring case, spaces and punctuation)
+        customer: customer name prefix (results are then ordered by name)
+
+    Returns:
+        (jobs, next_cursor); next_cursor is None on the last page
+    """
+    after = decode_jobs_cursor(cursor) if cursor else None
+    query = get_archive_collection()
+    if customer:
+        order_field, direction = 'customer_name', 'ASCENDING'
+        query = query.where(filter=firestore.FieldFilter('customer_name', '>=', customer)) \
+            .where(filter=firestore.FieldFilter('customer_name', '<', customer + '\uf8ff'))
+    else:
+        order_field, direction = 'archived_at', 'DESCENDING'
+        for kind, value in (('vin', vin), ('plate', plate)):
+            if not value:
+                continue
+            key = vehicle_key(value)
+            if not key:
+                return [], None
+            query = query.where(filter=firestore.FieldFilter(VEHICLE_KEY_FIELDS[kind][1], '==', key))
+    query = query.order_by(order_field, direction=direction).order_by('__name__', direction=direction)
+    if after is not None:
+        query = query.start_after({order_field: after[0], '__name__': after[1]})
+    jobs = [doc_to_dict(doc) for doc in query.limit(limit + 1).stream()]
+
+    if len(jobs) <= limit:
+        return jobs, None
+    return jobs[:limit], encode_jobs_cursor(jobs[limit - 1], order_field)
+
+def get_archived_job(job_id):
+    """Retrieve one archived job, or None."""
+    return doc_to_dict(get_archive_collection().document(str(job_id)).get())
+
+def restore_archived_job(job_id):
+    """
+    Move an archived job back into the jobs collection.
+    Returns the restored job, or None if it isn't archived.
+    Raises WriteConflict if a job with this id already exists.
+    """
+    db = get_db()
+    archived_ref = get_archive_collection().document(str(job_id))
+    doc = archived_ref.get()
+    if not doc.exists:
+        return None
+
+    data = doc.to_dict()
+    data.pop('archived_at', None)
+    data['updated_at'] = datetime.now().isoformat()
+    job_ref = get_jobs_collection().document(doc.id)
+    tombstone_ref, _ = _tombstone(doc.id, 'archived')
+    batch = db.batch()
+    batch.create(job_ref, data)
+    batch.delete(archived_ref, option=db.write_option(last_update_time=doc.update_time))
+    batch.delete(tombstone_ref)
+    try:
+        write_results = batch.commit()
+    except AlreadyExists:
+        raise WriteConflict('A job with this id already exists')
+    except (NotFound, FailedPrecondition):
+        return None  # restored or changed concurrently
+
+    job = _job_from_data(data, doc.id)
+    if _jobs_view is not None:
+        _jobs_view.restore(doc.id, write_results[0].update_time, dict(job))
+    return job
+
+def search_jobs(query, limit=20):
+    """
+    Jobs matching a free-text query over customer, vehicle and item fields, best match first.
+    Served from the jobs view's search index; without a serving view an index
+    is built from a full read for this call.
+    """
+    view = _serving_view()
+    if view is not None:
+        get_metrics().increment('jobs_view.reads')
+        index = view.search_index
+        jobs = view.get
+    else:
+        get_metrics().increment('jobs_view.fallback_reads')
+        by_id = {job['id']: job for job in get_all_jobs()}
+        index = JobSearchIndex()
+        index.rebuild(by_id.values())
+        jobs = by_id.get
+
+    started = time.perf_counter()
+    matches = index.search(query, limit)
+    get_metrics().observe('jobs.search_ms', (time.perf_counter() - started) * 1000)
+    results = []
+    for job_id, score in matches:
+        job = jobs(job_id)
+        if job is not None:
+            results.append(dict(job, search_score=round(score, 4)))
+    return results
+
+def get_job_events():
+    """
+    The jobs view, for following live change events, if it is enabled and
+    current; otherwise None (the caller should fall back to /jobs/changes).
+    """
+    return _serving_view()
+
+def new_sync_token():
+    """A GET /jobs/changes sync token for the current time."""
+    return (datetime.now() - timedelta(seconds=JOBS_CHANGES_OVERLAP_SECONDS)).isoformat()
+
+def get_job_changes(since=None):
+    """
+    Jobs changed and removed since a sync token returned by an earlier call.
+    Without a token, or with one older than TOMBSTONE_RETENTION_DAYS (whose
+    removals may already be pruned), every job is returned.
+
+    Returns:
+        dict: {'jobs': changed jobs, 'deleted': removed job ids,
+               'token': token for the next call, 'full': True if jobs is the full list}
+
+    Raises:
+        ValueError: if since is not a token from this endpoint
+    """
+    token = new_sync_token()
+    if not since:
+        return {'jobs': get_all_jobs(), 'deleted': [], 'token': token, 'full': True}
+    try:
+        since_time = datetime.fromisoformat(since)
+    except ValueError:
+        raise ValueError('Invalid sync token')
+    if since_time.tzinfo is not None:
+        raise ValueError('Invalid sync token')
+    if since_time < datetime.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        return {'jobs': get_all_jobs(), 'deleted': [], 'token': token, 'full': True}
+
+    view = _serving_view()
+    if view is not None:
+        get_metrics().increment('jobs_view.reads')
+        jobs = view.changed_since(since)
+    else:
+        get_metrics().increment('jobs_view.fallback_reads')
+        query = get_jobs_collection().where(filter=firestore.FieldFilter('updated_at', '>', since))
+        jobs = [doc_to_dict(doc) for doc in query.stream()]
+
+    tombstones = get_tombstones_collection().where(filter=firestore.FieldFilter('deleted_at', '>', since))
+    deleted = [doc.id for doc in tombstones.stream()]
+    changed = {job['id'] for job in jobs}
+    return {
+        'jobs': jobs,
+        'deleted': [job_id for job_id in deleted if job_id not in changed],
+        'token': token,
+        'full': False,
+    }
 
 # init_db is not needed for Firestore as collections/documents are created on use,
 # but we keep it for backward compatibility with app.py imports
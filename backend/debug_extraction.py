@@ -7,14 +7,15 @@ import re
 # But for now I'll just copy the relevant logic to iterate faster or import raw text
 sys.path.append(os.getcwd())
 
-from app import extract_from_mitchell_estimate
+from extraction import extract_estimate, new_extraction_stats
 
 def analyze_pdf(pdf_path):
     print(f"--- Analyzing {pdf_path} ---")
     
     # Run the actual extraction logic
     try:
-        result = extract_from_mitchell_estimate(pdf_path)
+        stats = new_extraction_stats(None)
+        result = extract_estimate(pdf_path, stats=stats)
         print("\n--- EXTRACTED DATA ---")
         print(f"VIN: {result['vehicle']['vin']}")
         print(f"Plate: {result['vehicle']['plate']}")
@@ -23,6 +24,12 @@ def analyze_pdf(pdf_path):
         print(f"Items Found: {len(result['items'])}")
         for item in result['items']:
             print(f" - {item['type']}: {item['desc']} [{item['partNum']}]")
+
+        print("\n--- STAGE TIMINGS ---")
+        print(f"Format: {stats['format']}  Mode: {stats['mode']}  Pages: {stats['pages_read']}/{stats['pages_total']}  "
+              f"Lines: {stats['lines_scanned']}  Candidates: {stats['candidate_lines']}")
+        for stage, ms in stats['timings_ms'].items():
+            print(f" {stage:>9}: {ms:8.2f} ms")
             
     except Exception as e:
         print(f"Error during extraction: {e}")
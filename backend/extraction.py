@@ -0,0 +1,683 @@
+"""
+Estimate Extraction Module
+Parses Mitchell estimate PDFs. Runs inside extraction_pool worker processes.
+"""
+
+import io
+import os
+import re
+import hashlib
+import mmap
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+import fitz  # PyMuPDF
+
+import vin_decoder
+
+
+# Fingerprint of the parsing rules. Derived from the source of this file and
+# the VIN tables so that any change to either invalidates cached results.
+_version_digest = hashlib.sha256()
+for _path in (__file__, vin_decoder.__file__):
+    with open(_path, 'rb') as _source:
+        _version_digest.update(_source.read())
+EXTRACTOR_VERSION = _version_digest.hexdigest()[:16]
+
+# Extraction modes: 'text' reads the flattened page text; 'layout' reads the
+# line-item table by column from positioned words and stops at the totals.
+EXTRACTION_MODES = ('text', 'layout')
+DEFAULT_EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'text')
+
+
+def open_pdf(source):
+    """Open a PDF from a file path or an in-memory buffer (bytes/memoryview)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(source)
+
+
+@contextmanager
+def pdf_buffer(stream):
+    """
+    Expose an uploaded file's bytes as a memoryview without copying them.
+    In-memory uploads share the BytesIO buffer; uploads spilled to disk are mmapped.
+    """
+    if isinstance(stream, io.BytesIO):
+        view = stream.getbuffer()
+        try:
+            yield view
+        finally:
+            view.release()
+        return
+
+    stream.flush()
+    if os.fstat(stream.fileno()).st_size == 0:
+        yield memoryview(b'')
+        return
+    with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+# --- Line classification ---
+# Every line is classified exactly once into a bitmask of these flags; the item
+# state machine below only ever looks at flags of a bounded window of lines.
+EXCLUDED = 1 << 0          # mentions a vehicle option, never a repair line
+HAS_PART = 1 << 1          # mentions a body part
+SECTION_LABEL = 1 << 2     # bare section/group heading such as 'Front Bumper'
+OP_BLEND = 1 << 3
+OP_REMOVE_SLASH = 1 << 4
+OP_REPLACE = 1 << 5
+OP_REPAIR = 1 << 6
+REMOVE_TAIL = 1 << 7       # ends with 'Remove' ('Remove /' may continue on the next line)
+SLASH_HEAD = 1 << 8        # starts with '/'
+DESC_STOP = 1 << 9         # ends a multi-line description
+DESC_JOIN = 1 << 10        # can continue a multi-line description
+PART_NUMBER = 1 << 11      # looks like an OEM/aftermarket part number
+PART_SUFFIX = 1 << 12      # can be the wrapped second half of a part number
+TABLE_HEADER = 1 << 13     # 'Line #' column header
+DESCRIPTION_HEADER = 1 << 14
+OPERATION_HEADER = 1 << 15
+
+BODY_PARTS = [
+    'bumper', 'cover', 'grille', 'hood', 'fender', 'door', 'panel',
+    'rocker', 'quarter', 'trunk', 'tailgate', 'mirror', 'lamp',
+    'garnish', 'molding', 'bracket', 'support', 'assembly', 'guard',
+    'handle', 'mudguard', 'wheel opening', 'belt', 'sensor', 'pump',
+    'glass', 'absorber', 'condenser', 'radiator', 'frame', 'plate',
+    'shield', 'lock', 'latch', 'hinge', 'regulator', 'motor', 'pillar',
+    'air bag', 'seat belt', 'w/shield'
+]
+
+EXCLUDE_TERMS = [
+    'automatic headlights', 'power door locks', 'power remote', 'power steering',
+    'power windows', 'heated mirror', 'lumbar support', 'daytime running',
+    'tonneau cover', 'air conditioning', 'cruise control', 'steering wheel',
+    'bluetooth', 'keyless', '4wd', 'awd', 'cyl gas', 'door utility', 'audio control'
+]
+
+SECTION_LABELS = {
+    'Front Bumper', 'Front Fender', 'Front Door', 'Rear Bumper', 'Hood', 'Headlamps',
+    'Fog Lamps', 'Front Lamps', 'Grille', 'Seat Belts', 'Air Bags', 'Cooling',
+    'Radiator Support', 'Air Bag System', 'Garnish', 'Assembly', 'Support', 'Bracket'
+}
+
+DESC_END_KEYWORDS = [
+    'Remove', 'Replace', 'Blend', 'Refinish', 'Repair', 'Overhaul',
+    'Body', 'INC', 'Existing', 'Aftermarket', 'New', 'Yes', 'No'
+]
+
+PART_NUMBER_SKIP = {
+    'Body', 'Refinish', 'New', 'Aftermarket', 'Recycled', 'Existing', 'Remove /', 'Replace',
+    'Order', 'Labor', 'Total', 'Sublet', 'Notes'
+}
+PART_SUFFIX_SKIP = {'Yes', 'No', 'New', 'Body', 'Refinish', '1', '2', '3'}
+INVALID_DESCRIPTIONS = {'AUTO', 'Body', 'INC', 'Inc', 'Existing'}
+
+_BODY_PART_RE = re.compile('|'.join(re.escape(p) for p in BODY_PARTS))
+_EXCLUDE_RE = re.compile('|'.join(re.escape(t) for t in EXCLUDE_TERMS))
+_OPERATION_RE = re.compile(r'Blend|Remove /|Replace|Repair|Line #|Description|Operation')
+_DESC_END_RE = re.compile('|'.join(re.escape(k) for k in DESC_END_KEYWORDS))
+_PART_NUMBER_RE = re.compile(r'[A-Z0-9 -]+')
+_HAS_DIGIT_RE = re.compile(r'\d')
+
+# Vehicle description: "<year> <make> <model>" followed by a body/engine detail
+MAKES_PATTERN = r'(Honda|Toyota|Ford|Chevrolet|Nissan|Hyundai|Kia|BMW|Mercedes-Benz|Mercedes|Audi|Lexus|Mazda|Subaru|Volkswagen|Jeep|Dodge|GMC|Ram|Acura|Infiniti|Volvo|Porsche|Land\s*Rover|Range\s*Rover|Cadillac|Lincoln|Buick|Chrysler|Tesla|Rivian|Lucid)'
+_VEHICLE_TAIL = r'\s+([^\n]+?)(?:\s+\d+\s*Door|\s+Van|\s+\d+\.\d+L)'
+_VEHICLE_RE = re.compile(r'((?:19|20)\d{2})\s+' + MAKES_PATTERN + _VEHICLE_TAIL, re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _model_re_for_make(make):
+    """Model regex for a make decoded from the VIN; the year before the make is optional."""
+    return re.compile(
+        r'(?:((?:19|20)\d{2})\s+)?\b(' + vin_decoder.make_text_pattern(make) + ')' + _VEHICLE_TAIL,
+        re.IGNORECASE
+    )
+
+
+_OPERATION_FLAGS = {
+    'Blend': OP_BLEND, 'Remove /': OP_REMOVE_SLASH, 'Replace': OP_REPLACE, 'Repair': OP_REPAIR,
+    'Line #': TABLE_HEADER, 'Description': DESCRIPTION_HEADER, 'Operation': OPERATION_HEADER,
+}
+
+# How far past a description line the state machine may look
+OPERATION_WINDOW = 5
+DESC_CONTINUATION_WINDOW = 2
+PART_NUMBER_WINDOW = 15
+
+
+def iter_page_lines(doc, page_texts, stats):
+    """
+    Yield the stripped, non-empty lines of a document page by page.
+    Each page's raw text is appended to page_texts for the document-wide regexes;
+    page count and text extraction time are added to stats.
+    """
+    for page in doc:
+        started = time.perf_counter()
+        text = page.get_text()
+        stats['timings_ms']['text'] += (time.perf_counter() - started) * 1000
+        stats['pages_read'] += 1
+        page_texts.append(text)
+        for raw in text.split('\n'):
+            line = raw.strip()
+            if line:
+                yield line
+
+
+def classify_line(line):
+    """Classify a single estimate line into a bitmask of the flags above."""
+    flags = 0
+    line_lower = line.lower()
+    if _EXCLUDE_RE.search(line_lower):
+        flags |= EXCLUDED
+    if _BODY_PART_RE.search(line_lower):
+        flags |= HAS_PART
+    if line in SECTION_LABELS:
+        flags |= SECTION_LABEL
+    for match in _OPERATION_RE.finditer(line):
+        flags |= _OPERATION_FLAGS[match.group()]
+    if line.endswith('Remove'):
+        flags |= REMOVE_TAIL
+    if line.startswith('/'):
+        flags |= SLASH_HEAD
+
+    numeric = line.replace('.', '').replace('#', '').isdigit()
+    if numeric or _DESC_END_RE.match(line):
+        flags |= DESC_STOP
+    elif len(line) > 2 and line[0].isupper():
+        flags |= DESC_JOIN
+
+    is_code = _PART_NUMBER_RE.fullmatch(line) is not None
+    if (is_code and len(line) >= 3 and _HAS_DIGIT_RE.search(line)
+            and line not in PART_NUMBER_SKIP
+            and not line.replace('.', '').replace('#', '').replace('*', '').replace('$', '').isdigit()):
+        flags |= PART_NUMBER
+    if (is_code and len(line) < 15 and line not in PART_SUFFIX_SKIP
+            and not (len(line) <= 3 and line.isdigit())):
+        flags |= PART_SUFFIX
+    return flags
+
+
+def _operation_for(flags, start, end):
+    """Job type implied by the operation keywords in lines[start:end]."""
+    window = 0
+    remove_slash = False
+    for i in range(start, end):
+        window |= flags[i]
+        if flags[i] & REMOVE_TAIL and i + 1 < end and flags[i + 1] & SLASH_HEAD:
+            remove_slash = True
+    if window & OP_BLEND:
+        return 'Blend'
+    if (remove_slash or window & OP_REMOVE_SLASH) and window & OP_REPLACE:
+        return 'Replace'
+    if window & OP_REPAIR:
+        return 'Repair'
+    return None
+
+
+def _find_table_start(flags):
+    """Index of the line-item table header ('Line #', or 'Description' next to 'Operation')."""
+    for i, f in enumerate(flags):
+        if f & TABLE_HEADER:
+            return i
+        if f & DESCRIPTION_HEADER:
+            nearby = flags[max(0, i - 1):i + 2]
+            if any(n & OPERATION_HEADER for n in nearby):
+                return i
+    return 0
+
+
+def extract_line_items(lines, flags, stats=None):
+    """
+    Single forward pass over classified lines that emits unique repair items.
+    Look-ahead is bounded by the *_WINDOW constants, so the pass is linear in
+    the number of lines. Candidate line count is added to stats when given.
+    """
+    candidates = 0
+    items = []
+    seen = set()
+    n = len(lines)
+    i = _find_table_start(flags)
+    while i < n:
+        f = flags[i]
+        if f & EXCLUDED or not f & HAS_PART or f & SECTION_LABEL:
+            i += 1
+            continue
+        candidates += 1
+
+        job_type = _operation_for(flags, i, min(n, i + OPERATION_WINDOW))
+        if job_type is None:
+            i += 1
+            continue
+
+        desc = lines[i]
+        for kw in ['Remove /', 'Remove', 'Replace']:
+            if kw in desc:
+                desc = desc.split(kw)[0].strip()
+
+        lines_consumed = 0
+        for j in range(i + 1, min(n, i + 1 + DESC_CONTINUATION_WINDOW)):
+            if flags[j] & DESC_STOP:
+                break
+            if flags[j] & DESC_JOIN:
+                desc = f"{desc} {lines[j]}"
+                lines_consumed = 1
+                break
+
+        if desc and len(desc) > 3 and desc not in INVALID_DESCRIPTIONS:
+            part_num_val = ''
+            if job_type == 'Replace':
+                for k in range(i, min(n, i + PART_NUMBER_WINDOW)):
+                    if flags[k] & PART_NUMBER:
+                        part_num_val = lines[k]
+                        if k + 1 < n and flags[k + 1] & PART_SUFFIX:
+                            part_num_val = f"{part_num_val} {lines[k + 1]}"
+                        break
+
+            key = (job_type, desc.lower())
+            if key not in seen:
+                seen.add(key)
+                items.append({
+                    'type': job_type,
+                    'desc': desc,
+                    'partNum': part_num_val,
+                    'customTitle': ''
+                })
+
+        i += 1 + lines_consumed
+
+    if stats is not None:
+        stats['candidate_lines'] += candidates
+    return items
+
+
+# --- Layout mode ---
+# Words from page.get_text('words') are (x0, y0, x1, y1, text, block, line, word).
+ROW_TOLERANCE = 3.0        # points; words whose centers are this close share a row
+COLUMN_SLACK = 2.0         # points a cell may start left of its column header
+CELL_GAP = 1.0             # word heights of horizontal space that separate two cells of a row
+TOTALS_MARKERS = ('estimate totals',)
+
+
+def _page_rows(words):
+    """Group a page's words into visual rows (top to bottom, left to right)."""
+    rows = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        center = (word[1] + word[3]) / 2
+        if rows and center - rows[-1][0] <= ROW_TOLERANCE:
+            rows[-1][1].append(word)
+        else:
+            rows.append([center, [word]])
+    return [sorted(row, key=lambda w: w[0]) for _, row in rows]
+
+
+def _row_text(row):
+    """
+    Text of a visual row as text mode would see it: words of one cell joined
+    by spaces, separate cells (a wide gap apart) on separate lines, so the
+    document-wide regexes don't run from one column into the next.
+    """
+    parts = [row[0][4]]
+    for previous, word in zip(row, row[1:]):
+        gap = word[0] - previous[2]
+        parts.append('\n' if gap > CELL_GAP * (word[3] - word[1]) else ' ')
+        parts.append(word[4])
+    return ''.join(parts)
+
+
+def _table_columns(row):
+    """
+    Column boundaries from a line-item table header row, or None if the row
+    is not a header. Returns (operation_x, description_x, part_x, part_end_x);
+    part_x is None when the estimate has no part number column.
+    """
+    texts = [w[4] for w in row]
+    if 'Operation' not in texts or 'Description' not in texts:
+        return None
+    operation_x = row[texts.index('Operation')][0]
+    description_x = row[texts.index('Description')][0]
+    part_x = part_end_x = None
+    if 'Part' in texts:
+        part_index = texts.index('Part')
+        part_x = row[part_index][0]
+        following = [w[0] for w in row[part_index + 1:] if w[4] != 'Number']
+        part_end_x = following[0] if following else float('inf')
+    return operation_x, description_x, part_x, part_end_x
+
+
+def _row_cells(row, columns):
+    """Split a table row into its operation, description and part number text."""
+    operation_x, description_x, part_x, part_end_x = columns
+    operation, description, part = [], [], []
+    for word in row:
+        x = word[0] + COLUMN_SLACK
+        if x < operation_x:
+            continue  # line number column
+        if x < description_x:
+            operation.append(word[4])
+        elif part_x is None or x < part_x:
+            description.append(word[4])
+        elif x < part_end_x:
+            part.append(word[4])
+    return ' '.join(operation), ' '.join(description), ' '.join(part)
+
+
+def _job_type_for(operation):
+    if 'Blend' in operation:
+        return 'Blend'
+    if 'Replace' in operation:
+        return 'Replace'
+    if 'Repair' in operation:
+        return 'Repair'
+    return None
+
+
+def extract_layout_items(doc, page_texts, stats):
+    """
+    Read the line-item table column by column from positioned words.
+    Column boundaries are located once per page from the table header and
+    pages after the 'Estimate Totals' section are never read.
+
+    Returns the list of items, or None if no line-item table header was found
+    (the caller then falls back to text mode). Text of every page read is
+    appended to page_texts for the document-wide regexes; page, row and
+    timing counters are added to stats.
+    """
+    entries = []
+    columns = None
+    current = None
+    found_table = False
+
+    for page in doc:
+        started = time.perf_counter()
+        words = page.get_text('words')
+        stats['timings_ms']['text'] += (time.perf_counter() - started) * 1000
+        stats['pages_read'] += 1
+
+        rows = _page_rows(words)
+        stats['lines_scanned'] += len(rows)
+        page_texts.append(''.join(_row_text(row) + '\n' for row in rows))
+
+        reached_totals = False
+        for row in rows:
+            header = _table_columns(row)
+            if header:
+                columns = header
+                found_table = True
+                continue
+            if columns is None:
+                continue
+            if ' '.join(w[4] for w in row).lower().startswith(TOTALS_MARKERS):
+                reached_totals = True
+                break
+
+            operation, description, part = _row_cells(row, columns)
+            if operation:
+                stats['candidate_lines'] += 1
+            if operation and not (current and current['operation'].endswith('/')):
+                current = {'operation': operation, 'desc': description, 'partNum': part}
+                entries.append(current)
+            elif current:
+                # Wrapped cell text continues the previous line item
+                if operation:
+                    current['operation'] = f"{current['operation']} {operation}"
+                if description:
+                    current['desc'] = f"{current['desc']} {description}".strip()
+                if part:
+                    separator = '' if current['partNum'].endswith('-') else ' '
+                    current['partNum'] = f"{current['partNum']}{separator}{part}".strip()
+        if reached_totals:
+            break
+
+    if not found_table:
+        return None
+
+    items = []
+    seen = set()
+    for entry in entries:
+        job_type = _job_type_for(entry['operation'])
+        desc = entry['desc']
+        if job_type is None or len(desc) <= 3 or desc in INVALID_DESCRIPTIONS:
+            continue
+        key = (job_type, desc.lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        items.append({
+            'type': job_type,
+            'desc': desc,
+            'partNum': entry['partNum'] if job_type == 'Replace' else '',
+            'customTitle': ''
+        })
+    return items
+
+
+def new_extraction_stats(mode):
+    """Empty per-stage timers and counters filled in by extract_from_mitchell_estimate."""
+    return {
+        'mode': mode,
+        'format': None,
+        'timings_ms': {'open': 0.0, 'detect': 0.0, 'text': 0.0, 'classify': 0.0, 'fields': 0.0, 'items': 0.0, 'total': 0.0},
+        'pages_total': 0,
+        'pages_read': 0,
+        'lines_scanned': 0,
+        'candidate_lines': 0,
+        'items_emitted': 0,
+    }
+
+
+def parse_mitchell(doc, mode, stats):
+    """
+    Extract data from an open Mitchell Estimate document.
+    This uses direct text extraction (no OCR needed for digital PDFs).
+    """
+    timings = stats['timings_ms']
+    mark = time.perf_counter()
+
+    items = None
+    if mode == 'layout':
+        page_texts = []
+        items = extract_layout_items(doc, page_texts, stats)
+        now = time.perf_counter()
+        timings['items'] += (now - mark) * 1000 - timings['text']
+        mark = now
+    if items is None:
+        stats['mode'] = 'text'
+        text_before = timings['text']
+        page_texts = []
+        lines = []
+        flags = []
+        for line in iter_page_lines(doc, page_texts, stats):
+            lines.append(line)
+            flags.append(classify_line(line))
+        stats['lines_scanned'] += len(lines)
+        now = time.perf_counter()
+        timings['classify'] += (now - mark) * 1000 - (timings['text'] - text_before)
+        mark = now
+    full_text = ''.join(page_texts)
+
+    result = {
+        'customer': {'name': '', 'phone': ''},
+        'vehicle': {'year': '', 'makeModel': '', 'plate': '', 'vin': ''},
+        'items': [],
+        'notes': ''
+    }
+
+    # Extract VIN (17 character alphanumeric)
+    vin_match = re.search(r'VIN\s*\n?\s*([A-HJ-NPR-Z0-9]{17})', full_text)
+    if vin_match:
+        result['vehicle']['vin'] = vin_match.group(1)
+    
+    # Extract License Plate (format: XX-XXXXXXX, allowing spaces)
+    plate_match = re.search(r'License\s*\n?\s*([A-Z]{2}-[A-Z0-9 ]+)', full_text)
+    if plate_match:
+        result['vehicle']['plate'] = plate_match.group(1)
+    
+    # Extract Vehicle Description. Year and make come from the VIN when it
+    # decodes, and the text is only searched for that make's model. The
+    # all-makes pattern is the fallback (no VIN, an unknown WMI, or a badge
+    # that differs from the WMI make, e.g. Nissan-built Infinitis).
+    decoded = vin_decoder.decode_vin(vin_match.group(1)) if vin_match else None
+    vehicle_match = None
+    make = decoded['make'] if decoded else ''
+    if make:
+        vehicle_match = _model_re_for_make(make).search(full_text)
+    if vehicle_match is None:
+        vehicle_match = _VEHICLE_RE.search(full_text)
+        if vehicle_match:
+            make = vehicle_match.group(2).strip()
+    if vehicle_match:
+        result['vehicle']['year'] = (decoded and decoded['year']) or vehicle_match.group(1) or ''
+        model_raw = vehicle_match.group(3).strip()
+        model = re.sub(r'\s+\d+["\']?\s*WB.*$', '', model_raw, flags=re.IGNORECASE).strip()
+        result['vehicle']['makeModel'] = f"{make} {model}"
+    elif make:
+        result['vehicle']['year'] = decoded['year']
+        result['vehicle']['makeModel'] = make
+
+    now = time.perf_counter()
+    timings['fields'] += (now - mark) * 1000
+    mark = now
+
+    if items is None:
+        items = extract_line_items(lines, flags, stats)
+        timings['items'] += (time.perf_counter() - mark) * 1000
+    result['items'] = items
+
+    stats['items_emitted'] = len(items)
+    return result
+
+
+# --- Estimate format registry ---
+# Detectors only look at the first page's text and the PDF metadata, so an
+# upload from an unsupported estimating system is rejected without reading
+# the rest of the document.
+
+class UnsupportedEstimateFormat(ValueError):
+    """Raised when an uploaded PDF is not an estimate format we can parse."""
+    pass
+
+
+ESTIMATE_PARSERS = []
+DEFAULT_ESTIMATE_FORMAT = 'mitchell'
+# Words that show a first page is some kind of repair estimate at all
+ESTIMATE_MARKERS = ('estimate', 'vin', 'supplement', 'repair order')
+
+
+def register_parser(name, label, detect, parse=None):
+    """
+    Register an estimate format.
+
+    Args:
+        name: short format id reported in stats and errors
+        label: human readable name for error messages
+        detect: fn(first_page_text, metadata_text) -> bool; both lowercased
+        parse: fn(doc, mode, stats) -> result dict, or None when the format
+               is recognised but not supported (fails fast)
+    """
+    ESTIMATE_PARSERS.append({'name': name, 'label': label, 'detect': detect, 'parse': parse})
+
+
+def detect_format(doc):
+    """Pick a registered format from the first page and metadata; Mitchell is the default."""
+    first_page = doc[0].get_text().lower() if doc.page_count else ''
+    metadata = ' '.join(str(v) for v in (doc.metadata or {}).values() if v).lower()
+
+    for parser in ESTIMATE_PARSERS:
+        if parser['detect'](first_page, metadata):
+            return parser
+    if not first_page.strip():
+        raise UnsupportedEstimateFormat(
+            'No text found on the first page. Scanned estimates are not supported; '
+            'export the estimate as a digital PDF.'
+        )
+    if not any(marker in first_page for marker in ESTIMATE_MARKERS):
+        raise UnsupportedEstimateFormat('This PDF does not look like a repair estimate.')
+    return next(p for p in ESTIMATE_PARSERS if p['name'] == DEFAULT_ESTIMATE_FORMAT)
+
+
+register_parser(
+    'mitchell', 'Mitchell',
+    detect=lambda page, meta: 'mitchell' in page or 'mitchell' in meta,
+    parse=parse_mitchell
+)
+register_parser(
+    'ccc', 'CCC ONE',
+    detect=lambda page, meta: 'ccc one' in page or 'ccc one' in meta
+    or 'ccc intelligent solutions' in page or 'ccc information services' in page
+)
+register_parser(
+    'audatex', 'Audatex',
+    detect=lambda page, meta: 'audatex' in page or 'audatex' in meta or 'qapter' in meta
+)
+
+
+def _open_for_extraction(pdf_source, mode, stats):
+    """Validate the mode, initialise stats and open the document."""
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+    stats['mode'] = mode
+    started = time.perf_counter()
+    doc = open_pdf(pdf_source)
+    stats['pages_total'] = doc.page_count
+    stats['timings_ms']['open'] += (time.perf_counter() - started) * 1000
+    return doc
+
+
+def extract_estimate(pdf_source, mode=None, stats=None):
+    """
+    Detect the estimate format and extract it with the matching parser.
+
+    Args:
+        pdf_source: Path to the PDF file, or the raw PDF bytes/memoryview
+        mode: 'text' or 'layout' (defaults to EXTRACTION_MODE). Layout mode
+              falls back to text mode when no line-item table is found.
+        stats: optional dict from new_extraction_stats(); filled with per-stage
+               timings (ms) and page/line/item counters
+
+    Raises:
+        UnsupportedEstimateFormat: for recognised-but-unsupported formats and
+            PDFs that are not estimates, after reading only the first page
+    """
+    mode = mode or DEFAULT_EXTRACTION_MODE
+    stats = stats if stats is not None else new_extraction_stats(mode)
+    started = time.perf_counter()
+    doc = _open_for_extraction(pdf_source, mode, stats)
+    try:
+        mark = time.perf_counter()
+        parser = detect_format(doc)
+        stats['format'] = parser['name']
+        stats['timings_ms']['detect'] += (time.perf_counter() - mark) * 1000
+        if parser['parse'] is None:
+            raise UnsupportedEstimateFormat(
+                f"{parser['label']} estimates are not supported yet. Please upload a Mitchell estimate."
+            )
+        return parser['parse'](doc, mode, stats)
+    finally:
+        doc.close()
+        stats['timings_ms']['total'] = (time.perf_counter() - started) * 1000
+
+
+def extract_from_mitchell_estimate(pdf_source, mode=None, stats=None):
+    """
+    Extract data from Mitchell Estimate PDF format, skipping format detection.
+
+    Args:
+        pdf_source: Path to the PDF file, or the raw PDF bytes/memoryview
+        mode: 'text' or 'layout' (defaults to EXTRACTION_MODE)
+        stats: optional dict from new_extraction_stats()
+    """
+    mode = mode or DEFAULT_EXTRACTION_MODE
+    stats = stats if stats is not None else new_extraction_stats(mode)
+    started = time.perf_counter()
+    doc = _open_for_extraction(pdf_source, mode, stats)
+    try:
+        return parse_mitchell(doc, mode, stats)
+    finally:
+        doc.close()
+        stats['timings_ms']['total'] = (time.perf_counter() - started) * 1000
@@ -0,0 +1,237 @@
+"""
+Extraction Result Cache
+Content-addressed cache for estimate extraction results, keyed by a hash of
+the PDF bytes and the extractor version. An in-memory LRU tier is always on;
+an on-disk tier is enabled by setting EXTRACTION_CACHE_DIR.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from extraction import EXTRACTOR_VERSION, DEFAULT_EXTRACTION_MODE
+from extraction_pool import extract_batch, extract_in_pool
+from metrics import get_metrics
+
+
+_cache = None
+_cache_lock = Lock()
+
+
+class ExtractionCache:
+    """Two-tier (memory + optional disk) LRU cache with size-based eviction."""
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = Lock()
+        self._entries = OrderedDict()  # key -> serialized JSON bytes, oldest first
+        self._size = 0
+        self._disk_entries = OrderedDict()  # key -> file size, oldest first
+        self._disk_size = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def key_for(data, mode=None):
+        """Cache key for a PDF: sha256 over the extractor version, mode and the raw bytes."""
+        digest = hashlib.sha256(f"{EXTRACTOR_VERSION}:{mode or DEFAULT_EXTRACTION_MODE}".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return a fresh copy of the cached result, or None on a miss."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, payload)
+        return json.loads(payload)
+
+    def put(self, key, result):
+        """Store an extraction result in both tiers."""
+        payload = json.dumps(result).encode()
+        with self._lock:
+            self._store_memory(key, payload)
+        self._write_disk(key, payload)
+
+    def stats(self):
+        """Counters and current sizes for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'extractor_version': EXTRACTOR_VERSION,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'disk_entries': len(self._disk_entries),
+                'disk_bytes': self._disk_size,
+                'disk_max_bytes': self.disk_max_bytes if self.disk_dir else 0,
+            }
+
+    # --- Memory tier (caller holds self._lock) ---
+
+    def _store_memory(self, key, payload):
+        if len(payload) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = payload
+        self._size += len(payload)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    # --- Disk tier ---
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        """Rebuild the disk LRU order from file modification times after a restart."""
+        # Entries written by an older extractor version are never hit again
+        # and simply age out of the LRU order.
+        found = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.json'):
+                continue
+            stat = os.stat(os.path.join(self.disk_dir, name))
+            found.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(found):
+            self._disk_entries[key] = size
+            self._disk_size += size
+        self._evict_disk()
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        with self._lock:
+            if key not in self._disk_entries:
+                return None
+            self._disk_entries.move_to_end(key)
+        try:
+            with open(self._path(key), 'rb') as f:
+                payload = f.read()
+            os.utime(self._path(key))  # keep LRU order across restarts
+            return payload
+        except OSError:
+            with self._lock:
+                self._disk_size -= self._disk_entries.pop(key, 0)
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.disk_dir or len(payload) > self.disk_max_bytes:
+            return
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Extraction cache write failed: {e}")
+            return
+        with self._lock:
+            self._disk_size -= self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(payload)
+            self._disk_size += len(payload)
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop least recently used files until the disk tier fits (caller holds self._lock)."""
+        while self._disk_size > self.disk_max_bytes and self._disk_entries:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+
+def get_extraction_cache():
+    """Get the process-wide extraction cache, configured from the environment."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache(
+                max_bytes=int(os.getenv('EXTRACTION_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+                disk_dir=os.getenv('EXTRACTION_CACHE_DIR') or None,
+                disk_max_bytes=int(os.getenv('EXTRACTION_CACHE_DISK_MAX_BYTES', 256 * 1024 * 1024)),
+            )
+        return _cache
+
+
+def _store_fresh(cache, key, result):
+    """Cache a freshly parsed result and record its stage metrics."""
+    stats = result.pop('debug', None)
+    cache.put(key, result)
+    if stats:
+        get_metrics().record_extraction(stats, estimate_id=key)
+        result['debug'] = dict(stats, cache='miss')
+    return result
+
+
+def extract_cached(data, mode=None):
+    """
+    Extract an estimate from PDF bytes in the worker pool, reusing a cached
+    result when the bytes were seen before. The result's 'debug' field holds
+    stage timings on a miss, or just {'cache': 'hit'}.
+    """
+    cache = get_extraction_cache()
+    key = cache.key_for(data, mode)
+    result = cache.get(key)
+    if result is not None:
+        result['debug'] = {'cache': 'hit'}
+        return result
+    return _store_fresh(cache, key, extract_in_pool(data, mode))
+
+
+def extract_batch_cached(files, mode=None):
+    """
+    Like extraction_pool.extract_batch, but answers repeat uploads from the cache
+    and only sends cache misses to the worker pool.
+    """
+    cache = get_extraction_cache()
+    keys = {}
+    misses = []
+    for index, filename, data in files:
+        key = cache.key_for(data, mode)
+        result = cache.get(key)
+        if result is not None:
+            result['debug'] = {'cache': 'hit'}
+            yield {'index': index, 'filename': filename, 'result': result}
+        else:
+            keys[index] = key
+            misses.append((index, filename, data))
+
+    for outcome in extract_batch(misses, mode):
+        if 'result' in outcome:
+            _store_fresh(cache, keys[outcome['index']], outcome['result'])
+        yield outcome
@@ -0,0 +1,270 @@
+"""
+Extraction Worker Pool
+Persistent worker processes that run the estimate extractor outside the web
+process, so CPU-bound parsing never competes with request threads for the GIL.
+PDF bytes are handed over through shared memory, every task has a timeout and
+every worker runs under an address-space limit. A worker that hangs, crashes
+or runs out of memory is replaced and only its own task fails.
+"""
+
+import os
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
+try:
+    import resource
+except ImportError:  # Windows development machines
+    resource = None
+
+from extraction import extract_estimate, new_extraction_stats, UnsupportedEstimateFormat
+from metrics import get_metrics
+
+
+_pool = None
+_pool_lock = Lock()
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a PDF takes longer than the per-task timeout to parse."""
+    pass
+
+
+class ExtractionWorkerCrashed(Exception):
+    """Raised when a worker process dies (e.g. out of memory) while parsing."""
+    pass
+
+
+class ExtractionPoolBusy(Exception):
+    """Raised when no worker becomes free within the pool's wait timeout."""
+    pass
+
+
+def _worker_main(conn, memory_limit_bytes):
+    """Worker process loop: parse PDFs named by shared memory blocks until told to stop."""
+    if resource is not None and memory_limit_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message is None:
+            return
+
+        shm_name, size, mode = message
+        shm = data = None
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            # Drop the name as soon as the block is mapped (the mapping stays
+            # valid until close). unlink() also unregisters it from the resource
+            # tracker this worker shares with the parent, so it is neither
+            # reported as leaked nor unlinked twice.
+            shm.unlink()
+            data = shm.buf[:size]
+            stats = new_extraction_stats(mode)
+            result = extract_estimate(data, mode, stats)
+            result['debug'] = stats
+            reply = ('ok', result)
+        except UnsupportedEstimateFormat as e:
+            reply = ('unsupported', str(e))
+        except MemoryError:
+            reply = ('error', 'Estimate exceeded the extraction memory limit')
+        except Exception as e:
+            reply = ('error', str(e))
+        finally:
+            if data is not None:
+                data.release()
+            if shm is not None:
+                shm.close()
+        conn.send(reply)
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, memory_limit_bytes):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_bytes),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks_run = 0
+
+    def stop(self, force=False):
+        if not force:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Fixed-size pool of persistent extraction worker processes."""
+
+    def __init__(self, size, task_timeout, memory_limit_bytes, max_tasks_per_worker, wait_timeout):
+        self.size = size
+        self.task_timeout = task_timeout
+        self.wait_timeout = wait_timeout
+        self.memory_limit_bytes = memory_limit_bytes
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+        # 'spawn' keeps workers free of the web process's gRPC/Firestore threads
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._new_worker())
+        # Dispatcher threads only wait on worker pipes, one per worker
+        self._dispatcher = ThreadPoolExecutor(max_workers=size, thread_name_prefix='extract-dispatch')
+        # Recycled workers are stopped here rather than on the request thread
+        self._retirer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='extract-retire')
+
+        self.timeouts = 0
+        self.crashes = 0
+
+    def _new_worker(self):
+        return _Worker(self._context, self.memory_limit_bytes)
+
+    def run(self, data, mode=None, timeout=None):
+        """
+        Parse one PDF (bytes or memoryview) in a worker and return the result.
+        The result carries the extractor's stage timings and counters under 'debug'.
+        Raises ExtractionPoolBusy if no worker frees up within wait_timeout.
+        """
+        timeout = timeout or self.task_timeout
+        try:
+            worker = self._idle.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            get_metrics().increment('extraction.pool_busy')
+            raise ExtractionPoolBusy(f"No extraction worker was free within {self.wait_timeout}s")
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        try:
+            shm.buf[:len(data)] = data
+            try:
+                worker.conn.send((shm.name, len(data), mode))
+                ready = worker.conn.poll(timeout)
+                status, payload = worker.conn.recv() if ready else (None, None)
+            except (EOFError, OSError):
+                self.crashes += 1
+                get_metrics().increment('extraction.worker_crashes')
+                worker.stop(force=True)
+                worker = self._new_worker()
+                raise ExtractionWorkerCrashed('Extraction worker crashed')
+
+            if not ready:
+                self.timeouts += 1
+                get_metrics().increment('extraction.timeouts')
+                worker.stop(force=True)
+                worker = self._new_worker()
+                raise ExtractionTimeout(f"Estimate took longer than {timeout}s to parse")
+
+            worker.tasks_run += 1
+            if self.max_tasks_per_worker and worker.tasks_run >= self.max_tasks_per_worker:
+                self._retirer.submit(worker.stop)
+                worker = self._new_worker()
+
+            if status == 'unsupported':
+                get_metrics().increment('extraction.unsupported_format')
+                raise UnsupportedEstimateFormat(payload)
+            if status == 'error':
+                raise ValueError(payload)
+            return payload
+        finally:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass  # the worker already unlinked it
+            self._idle.put(worker)
+
+    def submit(self, data, mode=None):
+        """Schedule run() and return a Future."""
+        return self._dispatcher.submit(self.run, data, mode)
+
+    def stats(self):
+        return {
+            'workers': self.size,
+            'idle_workers': self._idle.qsize(),
+            'task_timeout_seconds': self.task_timeout,
+            'wait_timeout_seconds': self.wait_timeout,
+            'memory_limit_bytes': self.memory_limit_bytes,
+            'timeouts': self.timeouts,
+            'crashes': self.crashes,
+        }
+
+    def shutdown(self):
+        self._dispatcher.shutdown(wait=True)
+        self._retirer.shutdown(wait=True)
+        while not self._idle.empty():
+            self._idle.get().stop()
+
+
+def get_worker_count():
+    """Number of extraction worker processes (EXTRACTION_WORKERS or usable CPU cores)."""
+    configured = os.getenv('EXTRACTION_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_extraction_pool():
+    """Get the shared extraction pool, starting all of its workers on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool(
+                size=get_worker_count(),
+                task_timeout=float(os.getenv('EXTRACTION_TASK_TIMEOUT_SECONDS', 30)),
+                memory_limit_bytes=int(os.getenv('EXTRACTION_WORKER_MEMORY_MB', 1024)) * 1024 * 1024,
+                max_tasks_per_worker=int(os.getenv('EXTRACTION_WORKER_MAX_TASKS', 200)),
+                wait_timeout=float(os.getenv('EXTRACTION_WORKER_WAIT_SECONDS', 30)),
+            )
+        return _pool
+
+
+def extract_in_pool(data, mode=None):
+    """Parse a single PDF in the worker pool and wait for its result."""
+    return get_extraction_pool().run(data, mode)
+
+
+def extract_batch(files, mode=None):
+    """
+    Extract many estimates in parallel, yielding each outcome as soon as it finishes.
+
+    Args:
+        files: list of (index, filename, pdf_bytes) tuples; index identifies
+               the file in the caller's upload order
+        mode: extraction mode passed to extract_estimate
+
+    Yields:
+        dict: {'index', 'filename', 'result'} on success or
+              {'index', 'filename', 'error'} on failure, in completion order
+    """
+    if not files:
+        return
+    pool = get_extraction_pool()
+    futures = {
+        pool.submit(data, mode): (index, filename)
+        for index, filename, data in files
+    }
+    for future in as_completed(futures):
+        index, filename = futures[future]
+        try:
+            yield {'index': index, 'filename': filename, 'result': future.result()}
+        except Exception as e:
+            print(f"Batch extraction error ({filename}): {e}")
+            yield {'index': index, 'filename': filename, 'error': str(e)}
@@ -0,0 +1,145 @@
+"""
+Asynchronous Extraction Tasks
+Queues estimate parsing on a bounded background executor so request threads
+return immediately. Clients poll a task or subscribe to its progress events.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition
+
+from extraction_cache import extract_cached
+
+
+# Task statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'error'
+FINISHED_STATUSES = (DONE, FAILED)
+
+
+class TaskQueueFull(Exception):
+    """Raised when the background executor already has its maximum backlog."""
+    pass
+
+
+class ExtractionTasks:
+    """In-memory registry of extraction tasks backed by a bounded thread pool."""
+
+    def __init__(self, threads, max_pending, ttl_seconds):
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='extract-task')
+        self._changed = Condition()
+        self._tasks = {}
+
+    def submit(self, data, filename='', mode=None, debug=False):
+        """Queue a PDF for extraction and return its task id."""
+        with self._changed:
+            self._expire()
+            pending = sum(1 for t in self._tasks.values() if t['status'] not in FINISHED_STATUSES)
+            if pending >= self.max_pending:
+                raise TaskQueueFull(f"{pending} extractions already queued")
+
+            task_id = uuid.uuid4().hex
+            self._tasks[task_id] = {
+                'id': task_id,
+                'filename': filename,
+                'status': QUEUED,
+                'events': [self._event(QUEUED, 'Waiting for a free extraction worker')],
+                'result': None,
+                'error': None,
+                'debug': debug,
+                'created_at': time.time(),
+                'finished_at': None,
+            }
+        self._executor.submit(self._run, task_id, bytes(data), mode)
+        return task_id
+
+    def get(self, task_id):
+        """Snapshot of a task for JSON responses, or None if unknown/expired."""
+        with self._changed:
+            task = self._tasks.get(task_id)
+            return self._public(task) if task else None
+
+    def wait_for_events(self, task_id, seen, timeout):
+        """
+        Block until the task has more than `seen` events, finishes, or `timeout` passes.
+        Returns (new_events, finished_task_snapshot_or_None), or None if the task is unknown.
+        """
+        with self._changed:
+            def ready():
+                task = self._tasks.get(task_id)
+                return task is None or len(task['events']) > seen or task['status'] in FINISHED_STATUSES
+
+            self._changed.wait_for(ready, timeout=timeout)
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            finished = self._public(task) if task['status'] in FINISHED_STATUSES else None
+            return task['events'][seen:], finished
+
+    # --- Internals ---
+
+    def _run(self, task_id, data, mode):
+        self._update(task_id, RUNNING, 'Parsing estimate')
+        try:
+            result = extract_cached(data, mode)
+        except Exception as e:
+            print(f"Extraction task {task_id} failed: {e}")
+            self._update(task_id, FAILED, 'Extraction failed', error=str(e))
+        else:
+            self._update(task_id, DONE, f"Found {len(result.get('items', []))} items", result=result)
+
+    def _update(self, task_id, status, message, result=None, error=None):
+        with self._changed:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            task['status'] = status
+            task['events'].append(self._event(status, message))
+            if status in FINISHED_STATUSES:
+                if result is not None and not task['debug']:
+                    result.pop('debug', None)
+                task['result'] = result
+                task['error'] = error
+                task['finished_at'] = time.time()
+            self._changed.notify_all()
+
+    def _expire(self):
+        """Forget finished tasks older than the TTL (caller holds the lock)."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [tid for tid, t in self._tasks.items()
+                   if t['finished_at'] is not None and t['finished_at'] < cutoff]
+        for task_id in expired:
+            del self._tasks[task_id]
+
+    @staticmethod
+    def _event(status, message):
+        return {'status': status, 'message': message, 'at': time.time()}
+
+    @staticmethod
+    def _public(task):
+        return {
+            'id': task['id'],
+            'filename': task['filename'],
+            'status': task['status'],
+            'progress': task['events'][-1]['message'],
+            'result': task['result'],
+            'error': task['error'],
+        }
+
+
+_tasks = ExtractionTasks(
+    threads=int(os.getenv('EXTRACTION_TASK_THREADS', 2)),
+    max_pending=int(os.getenv('EXTRACTION_TASK_MAX_PENDING', 32)),
+    ttl_seconds=int(os.getenv('EXTRACTION_TASK_TTL_SECONDS', 15 * 60)),
+)
+
+
+def get_extraction_tasks():
+    """Get the process-wide extraction task registry."""
+    return _tasks
@@ -17,6 +17,8 @@ _db = None
 # Collection names
 JOBS_COLLECTION = 'jobs'
 INSURANCE_COLLECTION = 'insurance_cases'
+TOMBSTONES_COLLECTION = 'job_tombstones'
+ARCHIVE_COLLECTION = 'jobs_archive'
 
 
 def get_jobs_collection():
@@ -31,6 +33,18 @@ def get_insurance_collection():
     return db.collection(INSURANCE_COLLECTION)
 
 
+def get_tombstones_collection():
+    """Get reference to the collection recording removed jobs for delta sync."""
+    db = get_db()
+    return db.collection(TOMBSTONES_COLLECTION)
+
+
+def get_archive_collection():
+    """Get reference to the collection holding archived (long finished) jobs."""
+    db = get_db()
+    return db.collection(ARCHIVE_COLLECTION)
+
+
 def get_storage_bucket():
     """Get reference to the Firebase Storage bucket."""
     from firebase_admin import storage
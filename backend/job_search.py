@@ -0,0 +1,255 @@
+"""
+Job Search Index
+In-memory inverted index over the searchable fields of jobs, kept current one
+job at a time. Query words match whole terms, term prefixes and (from three
+characters on) any part of a term through a trigram index, so plate, VIN and
+phone fragments are found. Results are ranked with BM25.
+"""
+
+import re
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from math import log
+from threading import Lock
+
+
+# Job fields that are indexed; items contribute their desc and partNum
+SEARCH_FIELDS = ['customer_name', 'customer_phone', 'vehicle_plate', 'vehicle_vin', 'vehicle_make_model']
+ITEM_SEARCH_FIELDS = ['desc', 'partNum']
+
+# Identifier-like fields are also indexed with punctuation and spaces removed,
+# so "ABC-123" is found as "abc123" and "(555) 123-4567" as "5551234567"
+COMPACT_FIELDS = ['customer_phone', 'vehicle_plate', 'vehicle_vin']
+
+# How much a match counts toward the score, by how the query word matched
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.7
+SUBSTRING_WEIGHT = 0.4
+
+# Most index terms a single query word expands to (keeps lookups fast for short words)
+MAX_EXPANSIONS = 64
+
+# Best postings kept per term for single-word queries, so a word found in
+# every job (e.g. "bumper") is ranked without scoring all of them. Also the
+# most results a single-word query returns per matching term.
+TOP_POSTINGS = 100
+
+# Relative change in average job length after which cached best postings are
+# picked again (which postings score best shifts with it)
+TOP_POSTINGS_AVGDL_DRIFT = 0.1
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase alphanumeric words of a value."""
+    return _WORD_RE.findall(str(text).lower()) if text else []
+
+
+def _trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def job_terms(job):
+    """Index terms of a job with their counts."""
+    words = []
+    for field in SEARCH_FIELDS:
+        words.extend(tokenize(job.get(field)))
+    for field in COMPACT_FIELDS:
+        compact = ''.join(tokenize(job.get(field)))
+        if compact and compact not in words:
+            words.append(compact)
+    for item in job.get('items') or []:
+        if isinstance(item, dict):
+            for field in ITEM_SEARCH_FIELDS:
+                words.extend(tokenize(item.get(field)))
+
+    terms = defaultdict(int)
+    for word in words:
+        terms[word] += 1
+    return terms
+
+
+class JobSearchIndex:
+    """Thread-safe inverted index with BM25 ranking (k1, b as in Okapi BM25)."""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = Lock()
+        self._postings = {}  # term -> {job id: term count}
+        self._docs = {}  # job id -> {term: count}
+        self._lengths = {}  # job id -> number of terms
+        self._total_length = 0
+        self._terms = []  # sorted terms, for prefix lookups
+        self._trigram_terms = defaultdict(set)  # trigram -> terms containing it
+        self._top = {}  # term -> (avgdl when picked, cached _top_postings)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def rebuild(self, jobs):
+        """Replace the index contents with `jobs` (an iterable of job dicts)."""
+        with self._lock:
+            self._postings = {}
+            self._docs = {}
+            self._lengths = {}
+            self._total_length = 0
+            self._trigram_terms = defaultdict(set)
+            self._top = {}
+            for job in jobs:
+                self._add(job['id'], job_terms(job), sort=False)
+            self._terms = sorted(self._postings)
+
+    def put(self, job):
+        """Index a new or changed job."""
+        terms = job_terms(job)
+        with self._lock:
+            if self._docs.get(job['id']) == terms:
+                return
+            self._remove(job['id'])
+            self._add(job['id'], terms)
+
+    def remove(self, job_id):
+        """Drop a job from the index."""
+        with self._lock:
+            self._remove(job_id)
+
+    def search(self, query, limit=20):
+        """
+        Job ids matching every word of `query`, best first.
+
+        Returns:
+            list: [(job id, score)], at most `limit` long
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            if not self._docs:
+                return []
+            avgdl = self._total_length / len(self._docs)
+            expansions = [self._expand(word) for word in dict.fromkeys(words)]
+            if not all(expansions):
+                return []
+
+            if len(expansions) == 1:
+                # Each term's best postings are enough to rank a single word
+                scores = {}
+                for term, weight in expansions[0].items():
+                    idf = self._idf(term)
+                    for job_id, tf in self._top_postings(term, avgdl):
+                        score = weight * idf * self._term_weight(job_id, tf, avgdl)
+                        if score > scores.get(job_id, 0.0):
+                            scores[job_id] = score
+            else:
+                # Candidates come from the most selective word; the others only filter and score them
+                expansions.sort(key=lambda expansion: sum(len(self._postings[term]) for term in expansion))
+                candidates = set().union(*(self._postings[term] for term in expansions[0]))
+                for expansion in expansions[1:]:
+                    candidates = {job_id for job_id in candidates
+                                  if any(job_id in self._postings[term] for term in expansion)}
+                scores = {
+                    job_id: sum(self._word_score(job_id, expansion, avgdl) for expansion in expansions)
+                    for job_id in candidates
+                }
+        return sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))[:limit]
+
+    # --- Internals (caller holds the lock) ---
+
+    def _idf(self, term):
+        matching = len(self._postings[term])
+        return log((len(self._docs) - matching + 0.5) / (matching + 0.5) + 1)
+
+    def _term_weight(self, job_id, tf, avgdl):
+        """BM25 term frequency part for one job."""
+        norm = 1 - self.b + self.b * self._lengths[job_id] / avgdl
+        return tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+    def _word_score(self, job_id, expansion, avgdl):
+        """Best weighted BM25 score of one query word's matching terms in a job."""
+        best = 0.0
+        for term, weight in expansion.items():
+            tf = self._postings[term].get(job_id)
+            if tf:
+                best = max(best, weight * self._idf(term) * self._term_weight(job_id, tf, avgdl))
+        return best
+
+    def _top_postings(self, term, avgdl):
+        """
+        The TOP_POSTINGS highest scoring (job id, count) postings of a term.
+        The order depends on avgdl as well as counts and job lengths, so the
+        cache is an approximation while other jobs come and go: it is kept until
+        the term's postings change or avgdl drifts by TOP_POSTINGS_AVGDL_DRIFT.
+        """
+        cached = self._top.get(term)
+        if cached is not None and abs(avgdl - cached[0]) <= TOP_POSTINGS_AVGDL_DRIFT * cached[0]:
+            return cached[1]
+        postings = self._postings[term]
+        if len(postings) <= TOP_POSTINGS:
+            top = list(postings.items())
+        else:
+            top = heapq.nlargest(TOP_POSTINGS, postings.items(),
+                                 key=lambda posting: self._term_weight(posting[0], posting[1], avgdl))
+        self._top[term] = (avgdl, top)
+        return top
+
+    def _expand(self, word):
+        """Index terms a query word matches, with the weight of each kind of match."""
+        matches = {}
+        if word in self._postings:
+            matches[word] = EXACT_WEIGHT
+
+        start = bisect_left(self._terms, word)
+        for term in self._terms[start:start + MAX_EXPANSIONS]:
+            if not term.startswith(word):
+                break
+            matches.setdefault(term, PREFIX_WEIGHT)
+
+        if len(word) >= 3 and len(matches) < MAX_EXPANSIONS:
+            trigram_terms = [self._trigram_terms.get(trigram) for trigram in _trigrams(word)]
+            if not all(trigram_terms):
+                return matches
+            trigram_terms.sort(key=len)
+            candidates = trigram_terms[0].intersection(*trigram_terms[1:])
+            for term in sorted(candidates):
+                if len(matches) >= MAX_EXPANSIONS:
+                    break
+                if word in term:
+                    matches.setdefault(term, SUBSTRING_WEIGHT)
+        return matches
+
+    def _add(self, job_id, terms, sort=True):
+        self._docs[job_id] = terms
+        self._lengths[job_id] = sum(terms.values())
+        self._total_length += self._lengths[job_id]
+        for term, count in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if sort:
+                    insort(self._terms, term)
+                for trigram in _trigrams(term):
+                    self._trigram_terms[trigram].add(term)
+            postings[job_id] = count
+            self._top.pop(term, None)
+
+    def _remove(self, job_id):
+        terms = self._docs.pop(job_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(job_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(job_id, None)
+            self._top.pop(term, None)
+            if postings:
+                continue
+            del self._postings[term]
+            del self._terms[bisect_left(self._terms, term)]
+            for trigram in _trigrams(term):
+                trigram_terms = self._trigram_terms[trigram]
+                trigram_terms.discard(term)
+                if not trigram_terms:
+                    del self._trigram_terms[trigram]
@@ -0,0 +1,89 @@
+"""
+Metrics Registry
+Process-wide counters and timers for the backend, readable at GET /metrics.
+"""
+
+import time
+import heapq
+from threading import Lock
+
+
+# How many of the slowest extractions to keep for inspection
+SLOWEST_EXTRACTIONS_KEPT = 20
+
+
+class MetricsRegistry:
+    """Thread-safe counters, timer summaries and a slowest-extractions list."""
+
+    def __init__(self, slowest_kept=SLOWEST_EXTRACTIONS_KEPT):
+        self.slowest_kept = slowest_kept
+        self.started_at = time.time()
+        self._lock = Lock()
+        self._counters = {}
+        self._timers = {}
+        self._slowest = []  # min-heap of (total_ms, sequence, record)
+        self._sequence = 0
+
+    def increment(self, name, value=1):
+        """Add value to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, milliseconds):
+        """Record one duration sample for a timer."""
+        with self._lock:
+            self._observe(name, milliseconds)
+
+    def record_extraction(self, stats, estimate_id=None):
+        """
+        Record the stats dict produced by extraction.extract_estimate.
+        estimate_id (e.g. the content hash) identifies slow estimates later.
+        """
+        with self._lock:
+            for counter in ('pages_read', 'lines_scanned', 'candidate_lines', 'items_emitted'):
+                key = f"extraction.{counter}"
+                self._counters[key] = self._counters.get(key, 0) + stats.get(counter, 0)
+            mode_key = f"extraction.mode.{stats.get('mode')}"
+            self._counters[mode_key] = self._counters.get(mode_key, 0) + 1
+            format_key = f"extraction.format.{stats.get('format')}"
+            self._counters[format_key] = self._counters.get(format_key, 0) + 1
+            for stage, milliseconds in stats.get('timings_ms', {}).items():
+                self._observe(f"extraction.{stage}_ms", milliseconds)
+
+            total = stats.get('timings_ms', {}).get('total', 0.0)
+            record = dict(stats, estimate_id=estimate_id, recorded_at=time.time())
+            self._sequence += 1
+            entry = (total, self._sequence, record)
+            if len(self._slowest) < self.slowest_kept:
+                heapq.heappush(self._slowest, entry)
+            elif total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def snapshot(self):
+        """Copy of all metrics for JSON responses."""
+        with self._lock:
+            timers = {}
+            for name, t in self._timers.items():
+                timers[name] = dict(t, avg_ms=t['total_ms'] / t['count'] if t['count'] else 0.0)
+            return {
+                'uptime_seconds': time.time() - self.started_at,
+                'counters': dict(self._counters),
+                'timers': timers,
+                'slowest_extractions': [r for _, _, r in sorted(self._slowest, reverse=True)],
+            }
+
+    def _observe(self, name, milliseconds):
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        timer['count'] += 1
+        timer['total_ms'] += milliseconds
+        timer['max_ms'] = max(timer['max_ms'], milliseconds)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """Get the process-wide metrics registry."""
+    return _registry
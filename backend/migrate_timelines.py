@@ -0,0 +1,72 @@
+"""
+Data Migration Utility: Job Timelines to Subcollections
+Moves the timeline array stored inside each job document into the append-only
+jobs/<id>/timeline subcollection, leaving timeline_latest and timeline_count
+on the job. Jobs that were already migrated are skipped, so it is safe to re-run.
+"""
+
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+
+from firebase_config import get_db, get_jobs_collection, init_firebase
+from database import MAX_BATCH_WRITES, TIMELINE_SUBCOLLECTION
+
+
+def migrate_job(doc):
+    """Move one job's timeline array; returns the number of entries moved."""
+    timeline = doc.to_dict().get('timeline') or []
+    if len(timeline) >= MAX_BATCH_WRITES:
+        raise ValueError(f"{len(timeline)} entries do not fit in one commit")
+    db = get_db()
+    timeline_ref = doc.reference.collection(TIMELINE_SUBCOLLECTION)
+    batch = db.batch()
+
+    # Older entries sort before anything appended since (empty recorded_at)
+    for index, entry in enumerate(timeline):
+        batch.create(timeline_ref.document(), dict(entry, recorded_at='', sequence=index))
+
+    updates = {'timeline': firestore.DELETE_FIELD}
+    if timeline:
+        updates['timeline_count'] = firestore.Increment(len(timeline))
+        if not doc.to_dict().get('timeline_latest'):
+            updates['timeline_latest'] = timeline[-1]
+    # Fails if the job changed since it was read; the next run picks it up again
+    batch.update(doc.reference, updates, option=db.write_option(last_update_time=doc.update_time))
+    batch.commit()
+    return len(timeline)
+
+
+def migrate():
+    print("--- Moving job timelines to subcollections ---")
+
+    try:
+        init_firebase()
+        jobs_ref = get_jobs_collection()
+    except Exception as e:
+        print(f"Failed to initialize Firebase: {e}")
+        return
+
+    migrated = skipped = errors = 0
+    for doc in jobs_ref.stream():
+        if 'timeline' not in (doc.to_dict() or {}):
+            skipped += 1
+            continue
+        try:
+            moved = migrate_job(doc)
+            print(f"✅ Moved {moved} timeline entries for job {doc.id}")
+            migrated += 1
+        except FailedPrecondition:
+            print(f"⚠️ Job {doc.id} changed during migration; run again to finish it")
+            errors += 1
+        except Exception as e:
+            print(f"❌ Failed to migrate job {doc.id}: {e}")
+            errors += 1
+
+    print(f"\n--- Migration Complete ---")
+    print(f"Migrated: {migrated}")
+    print(f"Already migrated: {skipped}")
+    print(f"Errors: {errors}")
+
+
+if __name__ == "__main__":
+    migrate()
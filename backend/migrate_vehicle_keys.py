@@ -0,0 +1,80 @@
+"""
+Data Migration Utility: Vehicle Lookup Keys
+Adds the vin_key and plate_key fields used by /jobs/by-vin, /jobs/by-plate, archive search and
+duplicate detection to jobs and archived jobs written before those fields
+existed. Documents that already have the right keys are skipped, so it is safe to re-run.
+"""
+
+from google.api_core.exceptions import FailedPrecondition
+
+from firebase_config import get_db, get_jobs_collection, get_archive_collection, init_firebase
+from database import MAX_BATCH_WRITES, VEHICLE_KEY_FIELDS, vehicle_key
+
+
+def missing_keys(data):
+    """The key fields a stored job lacks or has out of date."""
+    return {
+        key_field: vehicle_key(data.get(field))
+        for field, key_field in VEHICLE_KEY_FIELDS.values()
+        if data.get(key_field) != vehicle_key(data.get(field))
+    }
+
+
+def commit_updates(pending):
+    """Write one batch of (doc, updates); returns (updated, errors)."""
+    db = get_db()
+    batch = db.batch()
+    for doc, updates in pending:
+        # Fails if the job changed since it was read; the next run picks it up again
+        batch.update(doc.reference, updates, option=db.write_option(last_update_time=doc.update_time))
+    try:
+        batch.commit()
+        return len(pending), 0
+    except FailedPrecondition:
+        print(f"⚠️ {len(pending)} documents changed during migration; run again to finish them")
+        return 0, len(pending)
+
+
+def migrate_collection(collection_ref):
+    """Add keys to one collection's documents; returns (updated, skipped, errors)."""
+    updated = skipped = errors = 0
+    pending = []  # (doc, updates)
+    for doc in collection_ref.stream():
+        updates = missing_keys(doc.to_dict() or {})
+        if not updates:
+            skipped += 1
+            continue
+        pending.append((doc, updates))
+        if len(pending) == MAX_BATCH_WRITES:
+            done, failed = commit_updates(pending)
+            updated, errors, pending = updated + done, errors + failed, []
+    if pending:
+        done, failed = commit_updates(pending)
+        updated, errors = updated + done, errors + failed
+    return updated, skipped, errors
+
+
+def migrate():
+    print("--- Adding vehicle lookup keys to jobs ---")
+
+    try:
+        init_firebase()
+        collections = [('jobs', get_jobs_collection()), ('archived jobs', get_archive_collection())]
+    except Exception as e:
+        print(f"Failed to initialize Firebase: {e}")
+        return
+
+    for name, collection_ref in collections:
+        try:
+            updated, skipped, errors = migrate_collection(collection_ref)
+        except Exception as e:
+            print(f"❌ Failed to migrate {name}: {e}")
+            continue
+        print(f"\n--- {name.capitalize()} ---")
+        print(f"Updated: {updated}")
+        print(f"Already up to date: {skipped}")
+        print(f"Errors: {errors}")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,175 @@
+"""
+VIN Decoder
+Offline decoding of model year and make from a 17-character VIN, using the
+World Manufacturer Identifier (first three characters) and the model-year
+character (tenth). Both are plain dictionary lookups. Only VINs from a known
+WMI are decoded, and North American ones must also pass the check digit.
+"""
+
+import re
+from datetime import date
+
+
+# WMI -> make, spelled the way estimates print it. WMIs shared by several
+# brands (e.g. 1C4 for Jeep, Dodge and Chrysler, 3C3 for Fiat and Chrysler)
+# are left out on purpose; for those the estimate text gives year and make.
+WMI_MAKES = {
+    # Acura
+    '19U': 'Acura', '19V': 'Acura', 'JH4': 'Acura', '5J8': 'Acura',
+    # Alfa Romeo
+    'ZAR': 'Alfa Romeo', 'ZAS': 'Alfa Romeo',
+    # Audi
+    'WAU': 'Audi', 'WA1': 'Audi', 'WUA': 'Audi', 'TRU': 'Audi',
+    # BMW
+    'WBA': 'BMW', 'WBS': 'BMW', 'WBX': 'BMW', 'WBY': 'BMW', '5UX': 'BMW', '5YM': 'BMW', '4US': 'BMW',
+    # Buick
+    '1G4': 'Buick', '2G4': 'Buick', 'KL4': 'Buick', 'LRB': 'Buick',
+    # Cadillac
+    '1G6': 'Cadillac', '1GY': 'Cadillac',
+    # Chevrolet
+    '1G1': 'Chevrolet', '1GC': 'Chevrolet', '1GN': 'Chevrolet', '1GB': 'Chevrolet',
+    '2G1': 'Chevrolet', '2GC': 'Chevrolet', '2GN': 'Chevrolet',
+    '3G1': 'Chevrolet', '3GC': 'Chevrolet', '3GN': 'Chevrolet',
+    'KL7': 'Chevrolet', 'KL8': 'Chevrolet',
+    # Dodge
+    '1B3': 'Dodge', '2B3': 'Dodge',
+    # Fiat
+    'ZFA': 'Fiat',
+    # Ford
+    '1FA': 'Ford', '1FB': 'Ford', '1FC': 'Ford', '1FD': 'Ford', '1FM': 'Ford', '1FT': 'Ford',
+    '2FA': 'Ford', '2FM': 'Ford', '2FT': 'Ford', '3FA': 'Ford', '3FM': 'Ford', '3FT': 'Ford',
+    '1ZV': 'Ford', 'NM0': 'Ford', 'MAJ': 'Ford', 'WF0': 'Ford',
+    # Genesis
+    'KMT': 'Genesis',
+    # GMC
+    '1GK': 'GMC', '1GT': 'GMC', '2GK': 'GMC', '2GT': 'GMC', '3GK': 'GMC', '3GT': 'GMC',
+    # Honda
+    '1HG': 'Honda', '2HG': 'Honda', '2HK': 'Honda', '3HG': 'Honda', '5FN': 'Honda',
+    '5J6': 'Honda', '7FA': 'Honda', '19X': 'Honda', 'JHL': 'Honda', 'JHM': 'Honda', 'SHH': 'Honda',
+    # Hyundai
+    'KMH': 'Hyundai', 'KM8': 'Hyundai', '5NP': 'Hyundai', '5NM': 'Hyundai',
+    # Infiniti
+    'JNK': 'Infiniti', 'JNR': 'Infiniti', '5N3': 'Infiniti', '3PC': 'Infiniti',
+    # Jaguar
+    'SAJ': 'Jaguar', 'SAD': 'Jaguar',
+    # Jeep
+    '1J4': 'Jeep', '1J8': 'Jeep', 'ZAC': 'Jeep',
+    # Kia
+    'KNA': 'Kia', 'KND': 'Kia', '5XX': 'Kia', '5XY': 'Kia', '3KP': 'Kia',
+    # Land Rover
+    'SAL': 'Land Rover',
+    # Lexus
+    'JTH': 'Lexus', 'JTJ': 'Lexus', '2T2': 'Lexus', '58A': 'Lexus',
+    # Lincoln
+    '1LN': 'Lincoln', '2LM': 'Lincoln', '3LN': 'Lincoln', '5LM': 'Lincoln', '5LT': 'Lincoln',
+    # Lucid
+    '50E': 'Lucid',
+    # Mazda
+    'JM1': 'Mazda', 'JM3': 'Mazda', '1YV': 'Mazda', '3MZ': 'Mazda', '3MV': 'Mazda', '7MM': 'Mazda',
+    # Mercedes-Benz
+    'WDB': 'Mercedes-Benz', 'WDC': 'Mercedes-Benz', 'WDD': 'Mercedes-Benz', 'WMX': 'Mercedes-Benz',
+    'W1K': 'Mercedes-Benz', 'W1N': 'Mercedes-Benz', 'W1V': 'Mercedes-Benz',
+    '4JG': 'Mercedes-Benz', '55S': 'Mercedes-Benz',
+    # Mercury
+    '1ME': 'Mercury', '2ME': 'Mercury', '4M2': 'Mercury',
+    # MINI
+    'WMW': 'MINI',
+    # Mitsubishi
+    'JA3': 'Mitsubishi', 'JA4': 'Mitsubishi', '4A3': 'Mitsubishi', '4A4': 'Mitsubishi', 'ML3': 'Mitsubishi',
+    # Nissan
+    '1N4': 'Nissan', '1N6': 'Nissan', '3N1': 'Nissan', '3N6': 'Nissan', '4N2': 'Nissan',
+    '5N1': 'Nissan', 'JN1': 'Nissan', 'JN8': 'Nissan',
+    # Porsche
+    'WP0': 'Porsche', 'WP1': 'Porsche',
+    # Ram
+    '1C6': 'Ram', '3C6': 'Ram', '3C7': 'Ram',
+    # Rivian
+    '7FC': 'Rivian', '7PD': 'Rivian',
+    # Scion
+    'JTK': 'Scion', 'JTL': 'Scion',
+    # Subaru
+    'JF1': 'Subaru', 'JF2': 'Subaru', '4S3': 'Subaru', '4S4': 'Subaru',
+    # Suzuki
+    'JS2': 'Suzuki', 'JS3': 'Suzuki', '2S3': 'Suzuki',
+    # Tesla
+    '5YJ': 'Tesla', '7SA': 'Tesla', 'LRW': 'Tesla', 'XP7': 'Tesla',
+    # Toyota
+    '2T1': 'Toyota', '2T3': 'Toyota', '3TM': 'Toyota', '3TY': 'Toyota', '4T1': 'Toyota',
+    '4T3': 'Toyota', '4T4': 'Toyota', '5TB': 'Toyota', '5TD': 'Toyota', '5TE': 'Toyota',
+    '5TF': 'Toyota', '7MU': 'Toyota', 'JT2': 'Toyota', 'JT3': 'Toyota', 'JT4': 'Toyota',
+    'JTD': 'Toyota', 'JTE': 'Toyota', 'JTM': 'Toyota', 'JTN': 'Toyota',
+    # Volkswagen
+    '1VW': 'Volkswagen', '3VV': 'Volkswagen', '3VW': 'Volkswagen', 'WVG': 'Volkswagen',
+    'WVW': 'Volkswagen', 'WV1': 'Volkswagen', 'WV2': 'Volkswagen',
+    # Volvo
+    'YV1': 'Volvo', 'YV4': 'Volvo', '7JR': 'Volvo',
+}
+
+# How a make may be written in an estimate's vehicle description
+MAKE_TEXT_PATTERNS = {
+    'Mercedes-Benz': r'Mercedes-Benz|Mercedes',
+    'Land Rover': r'Land\s*Rover|Range\s*Rover',
+}
+
+# Model-year character (VIN position 10). The 30 codes repeat every 30 years;
+# for North American VINs position 7 tells the cycles apart: a digit means
+# 1980-2009, a letter 2010-2039. Elsewhere the latest plausible year is used.
+YEAR_CODES = 'ABCDEFGHJKLMNPRSTVWXY123456789'
+MODEL_YEARS = {code: 1980 + offset for offset, code in enumerate(YEAR_CODES)}
+
+# First VIN characters of vehicles built for North America (7 covers newer US plants),
+# whose VINs carry a check digit in position 9
+NORTH_AMERICAN_REGIONS = '123457'
+
+# Check digit transliteration and position weights (49 CFR 565)
+_TRANSLITERATION = {
+    **{str(digit): digit for digit in range(10)},
+    **dict(zip('ABCDEFGH', range(1, 9))),
+    **dict(zip('JKLMN', range(1, 6))), 'P': 7, 'R': 9,
+    **dict(zip('STUVWXYZ', range(2, 10))),
+}
+_WEIGHTS = [8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2]
+
+_VIN_RE = re.compile(r'[A-HJ-NPR-Z0-9]{17}')
+
+
+def check_digit_valid(vin):
+    """True if position 9 of a well-formed VIN matches its computed check digit."""
+    total = sum(_TRANSLITERATION[char] * weight for char, weight in zip(vin, _WEIGHTS))
+    remainder = total % 11
+    return vin[8] == ('X' if remainder == 10 else str(remainder))
+
+
+def decode_vin(vin):
+    """
+    Decode model year and make from a VIN.
+
+    Returns:
+        dict: {'year': '2019' or '', 'make': 'Honda' or ''}, or None if the
+              value is not a well-formed 17-character VIN. Both are empty
+              unless the WMI is known; a North American VIN whose check digit
+              fails gets no year.
+    """
+    vin = (vin or '').upper()
+    if not _VIN_RE.fullmatch(vin):
+        return None
+
+    make = WMI_MAKES.get(vin[:3], '')
+    year = MODEL_YEARS.get(vin[9]) if make else None
+    if year is not None:
+        if vin[0] in NORTH_AMERICAN_REGIONS:
+            if not check_digit_valid(vin):
+                year = None
+            elif vin[6].isalpha():
+                year += 30
+        elif year + 30 <= date.today().year + 1:
+            year += 30
+    return {
+        'year': str(year) if year else '',
+        'make': make,
+    }
+
+
+def make_text_pattern(make):
+    """Regex alternative matching a decoded make as written in estimate text."""
+    return MAKE_TEXT_PATTERNS.get(make) or re.escape(make).replace(r'\ ', r'\s*')
@@ -410,18 +410,6 @@ function Dashboard({
 
 
 
-    // Helper: Map extracted items to job items structure (ensure uniqueness logic if needed)
-    const mapExtractedItemsToJobItems = (items) => {
-        if (!items || !Array.isArray(items)) return [];
-        return items.map((item, i) => ({
-            id: Date.now() + i,
-            type: item.type || 'Repair',
-            desc: item.desc || '',
-            partNum: item.partNum || '',
-            customTitle: ''
-        }));
-    };
-
     // Get stage badge styling
     const getStageBadge = (stage) => {
         switch (stage) {
@@ -902,19 +890,20 @@ function Dashboard({
                                 type="file"
                                 ref={fileInputRef}
                                 onChange={async (e) => {
-                                    const file = e.target.files?.[0];
-                                    if (!file) return;
+                                    const files = Array.from(e.target.files || []);
+                                    if (files.length === 0) return;
 
                                     setIsUploading(true);
                                     try {
                                         const formData = new FormData();
-                                        formData.append('file', file);
+                                        files.forEach(file => formData.append('files', file));
 
                                         // Get auth token for API calls
                                         const token = getAuthToken();
 
-                                        // 1. Analyze PDF
-                                        const analyzeRes = await fetch(`${API_URL}/analyze`, {
+                                        // Analyze all PDFs and create their jobs in one request;
+                                        // estimates for a car that already has an open job reuse that job
+                                        const importRes = await fetch(`${API_URL}/jobs/import?dedupe=true`, {
                                             method: 'POST',
                                             headers: {
                                                 'Authorization': `Bearer ${token}`
@@ -922,47 +911,22 @@ function Dashboard({
                                             body: formData,
                                         });
 
-                                        if (!analyzeRes.ok) throw new Error('Analysis failed');
-                                        const extractedData = await analyzeRes.json();
-
-                                        // 2. Prepare Job Data
-                                        const jobData = {
-                                            customer: {
-                                                name: extractedData.customer?.name || '',
-                                                phone: extractedData.customer?.phone || ''
-                                            },
-                                            vehicle: {
-                                                year: extractedData.vehicle?.year || '',
-                                                makeModel: extractedData.vehicle?.makeModel || '',
-                                                plate: extractedData.vehicle?.plate || '',
-                                                vin: extractedData.vehicle?.vin || ''
-                                            },
-                                            dates: {
-                                                start: '',
-                                                end: ''
-                                            },
-                                            items: mapExtractedItemsToJobItems(extractedData.items),
-                                            notes: extractedData.notes || '',
-                                            stage: JOB_STAGES.CONFIRMED // Start in Confirmed Stage
-                                        };
-
-                                        // 3. Create Job
-                                        const createRes = await fetch(`${API_URL}/jobs`, {
-                                            method: 'POST',
-                                            headers: {
-                                                'Content-Type': 'application/json',
-                                                'Authorization': `Bearer ${token}`
-                                            },
-                                            body: JSON.stringify(jobData)
-                                        });
-
-                                        if (!createRes.ok) throw new Error('Job creation failed');
+                                        if (![200, 201, 422].includes(importRes.status)) throw new Error('Import failed');
+                                        const { created = [], existing = [], failed = [] } = await importRes.json();
 
-                                        const newJob = await createRes.json();
+                                        // Pull the new jobs in with a delta sync; the live
+                                        // job stream may be unavailable or lagging
+                                        if (created.length > 0) onRefresh();
+                                        const opened = [...created, ...existing];
+                                        if (opened.length === 1) onSelectJob(opened[0].job);
+                                        if (existing.length > 0 && opened.length > 1) {
+                                            alert(`${existing.length} estimate(s) matched an open job and were not imported again.`);
+                                        }
 
-                                        // 4. Refresh & Navigate
-                                        await onRefresh();
-                                        onSelectJob(newJob);
+                                        if (failed.length > 0) {
+                                            const names = failed.map(f => `${f.filename}: ${f.error}`).join('\n');
+                                            alert(`Could not import ${failed.length} of ${files.length} estimate(s):\n${names}`);
+                                        }
 
                                     } catch (error) {
                                         console.error("Quick upload failed:", error);
@@ -973,6 +937,7 @@ function Dashboard({
                                     }
                                 }}
                                 accept=".pdf"
+                                multiple
                                 className="hidden"
                             />
                         </div>
@@ -20,6 +20,9 @@ function JobDetails({
     job,
     onBack,
     onUpdate,
+    onAddItem,
+    onUpdateItem,
+    onDeleteItem,
     onDelete,
     onAdvanceStage,
     onRevertStage,
@@ -50,6 +53,21 @@ function JobDetails({
     const [showActionsMenu, setShowActionsMenu] = useState(false);
     const [partsStatusExpanded, setPartsStatusExpanded] = useState(false);
     const [isEditingNotes, setIsEditingNotes] = useState(false);
+    const [timeline, setTimeline] = useState([]);
+
+    // Timeline history is loaded per job (the job itself only carries the
+    // latest entry and a count); reload it whenever entries are added
+    useEffect(() => {
+        if (!job?.id) return;
+        let cancelled = false;
+        fetch(`${API_URL}/jobs/${job.id}/timeline`, {
+            headers: { 'Authorization': `Bearer ${getAuthToken()}` }
+        })
+            .then(response => response.ok ? response.json() : Promise.reject(new Error('Failed to load timeline')))
+            .then(data => { if (!cancelled) setTimeline(data.timeline || []); })
+            .catch(err => console.error(err));
+        return () => { cancelled = true; };
+    }, [job?.id, job?.timeline_count, getAuthToken]);
 
     const pdfDocument = useMemo(() => {
         if (!job) return <PDFOrder data={{
@@ -83,15 +101,13 @@ function JobDetails({
             day: 'numeric'
         });
 
-        const newTimeline = [...(job.timeline || []), {
-            stage: job.stage || JOB_STAGES.IN_PROGRESS,
-            timestamp: new Date().toISOString(),
-            label: `📅 Due Date Changed to ${formattedDate}`
-        }];
-
         onUpdate(job.id, {
             end_date: newDate,
-            timeline: newTimeline
+            timeline_append: [{
+                stage: job.stage || JOB_STAGES.IN_PROGRESS,
+                timestamp: new Date().toISOString(),
+                label: `📅 Due Date Changed to ${formattedDate}`
+            }]
         });
     };
 
@@ -191,15 +207,16 @@ function JobDetails({
                         }
                         // Add timeline entry for schedule
                         const hadScheduleBefore = job.start_date && job.end_date;
-                        const newTimeline = hadScheduleBefore ? job.timeline : [...(job.timeline || []), {
-                            type: 'schedule',
-                            timestamp: new Date().toISOString(),
-                            label: '📅 Vehicle drop off date scheduled.'
-                        }];
                         onUpdate(job.id, {
                             start_date: format(selectedDates[0]),
                             end_date: format(selectedDates[1]),
-                            ...(hadScheduleBefore ? {} : { timeline: newTimeline })
+                            ...(hadScheduleBefore ? {} : {
+                                timeline_append: [{
+                                    type: 'schedule',
+                                    timestamp: new Date().toISOString(),
+                                    label: '📅 Vehicle drop off date scheduled.'
+                                }]
+                            })
                         });
                     }
                 }
@@ -365,6 +382,20 @@ function JobDetails({
         setEditedJob(null);
     };
 
+    // Items with an id are added, changed and removed on their own, so edits
+    // by other users to other items are kept. Jobs whose items have no ids yet
+    // fall back to rewriting the list once (the server assigns ids then).
+    const itemsHaveIds = (job?.items || []).every(item => item.id);
+
+    const changeItem = (index, fields) => {
+        const currentItems = job.items || [];
+        const item = currentItems[index];
+        if (item?.id) return onUpdateItem(job.id, item.id, fields);
+        return onUpdate(job.id, {
+            items: currentItems.map((it, idx) => idx === index ? { ...it, ...fields } : it)
+        });
+    };
+
     // Add new job item
     const handleAddItem = () => {
         if (!newItemDesc.trim()) return;
@@ -377,7 +408,11 @@ function JobDetails({
             // Mark items added during In Progress stage as "new"
             ...(isInProgressStage && { addedInProgress: true })
         };
-        onUpdate(job.id, { items: [...currentItems, newItem] });
+        if (itemsHaveIds) {
+            onAddItem(job.id, newItem);
+        } else {
+            onUpdate(job.id, { items: [...currentItems, newItem] });
+        }
         setNewItemDesc('');
         // Keep the same item type for quick entry of similar items
         // setNewItemType('Repair'); // Don't reset type
@@ -387,19 +422,17 @@ function JobDetails({
 
     // Update existing job item
     const handleUpdateItem = (index, field, value) => {
-        const currentItems = job.items || [];
-        const updatedItems = currentItems.map((item, idx) => {
-            if (idx === index) {
-                return { ...item, [field]: field === 'desc' ? value.toUpperCase() : value };
-            }
-            return item;
-        });
-        onUpdate(job.id, { items: updatedItems });
+        changeItem(index, { [field]: field === 'desc' ? value.toUpperCase() : value });
     };
 
     // Delete job item
     const handleDeleteItem = (indexToDelete) => {
         const currentItems = job.items || [];
+        const item = currentItems[indexToDelete];
+        if (item?.id) {
+            onDeleteItem(job.id, item.id);
+            return;
+        }
         const updatedItems = currentItems.filter((_, idx) => idx !== indexToDelete);
         onUpdate(job.id, { items: updatedItems });
     };
@@ -491,7 +524,7 @@ function JobDetails({
         const [status, setStatus] = useState('idle'); // idle, loading, success, failed
 
         // Check if already filed in (persisted in job data)
-        const alreadyFiled = (job.timeline || []).some(event => event.type === 'car_in') || job.car_filed_in === true;
+        const alreadyFiled = timeline.some(event => event.type === 'car_in') || job.car_filed_in === true;
 
         const handleClick = async () => {
             if (status === 'loading' || alreadyFiled) return;
@@ -519,13 +552,12 @@ function JobDetails({
                 if (response.ok) {
                     setStatus('success');
                     // Add timeline entry AND mark as filed
-                    const newTimeline = [...(job.timeline || []), {
-                        type: 'car_in',
-                        timestamp: new Date().toISOString(),
-                        label: '🚗 Vehicle dropped off and filed car-in.'
-                    }];
                     onUpdate(job.id, {
-                        timeline: newTimeline,
+                        timeline_append: [{
+                            type: 'car_in',
+                            timestamp: new Date().toISOString(),
+                            label: '🚗 Vehicle dropped off and filed car-in.'
+                        }],
                         car_filed_in: true,  // Persist the filed state
                         car_here: true       // Mark car as on site
                     });
@@ -591,23 +623,19 @@ function JobDetails({
         const allArrived = arrivedCount === totalParts;
 
         const togglePartStatus = (partIndex) => {
-            const updatedItems = [...job.items];
-            const item = updatedItems[partIndex];
+            const item = job.items[partIndex];
 
             // Cycle through: Not Ordered -> Ordered -> Arrived -> Not Ordered
             if (item.arrived) {
                 // Arrived -> Not Ordered
-                item.ordered = false;
-                item.arrived = false;
+                changeItem(partIndex, { ordered: false, arrived: false });
             } else if (item.ordered) {
                 // Ordered -> Arrived
-                item.arrived = true;
+                changeItem(partIndex, { arrived: true });
             } else {
                 // Not Ordered -> Ordered
-                item.ordered = true;
+                changeItem(partIndex, { ordered: true });
             }
-
-            onUpdate(job.id, { items: updatedItems });
         };
 
         const getPartStatus = (part) => {
@@ -850,12 +878,13 @@ function JobDetails({
 
                                                         if (response.ok && result.success) {
                                                             // Add timeline entry
-                                                            const newTimeline = [...(job.timeline || []), {
-                                                                type: 'calendar_export',
-                                                                timestamp: new Date().toISOString(),
-                                                                label: '📅 Exported to Google Calendar'
-                                                            }];
-                                                            onUpdate(job.id, { timeline: newTimeline });
+                                                            onUpdate(job.id, {
+                                                                timeline_append: [{
+                                                                    type: 'calendar_export',
+                                                                    timestamp: new Date().toISOString(),
+                                                                    label: '📅 Exported to Google Calendar'
+                                                                }]
+                                                            });
                                                             alert(`✅ Exported to Google Calendar!\n\nEvent: ${result.title}\nDates: ${result.start} to ${result.end}`);
                                                         } else {
                                                             alert(`❌ Error: ${result.error || 'Unknown error'}`);
@@ -1811,21 +1840,19 @@ function JobDetails({
                                                     key={idx}
                                                     onClick={() => {
                                                         if (!isClickable) return;
-                                                        const updatedItems = [...job.items];
                                                         const itemIndex = item.originalIndex;
 
                                                         // Cycle: not ordered → ordered → arrived → not ordered
                                                         if (item.arrived) {
                                                             // Arrived - reset to not ordered
-                                                            updatedItems[itemIndex] = { ...updatedItems[itemIndex], ordered: false, arrived: false };
+                                                            changeItem(itemIndex, { ordered: false, arrived: false });
                                                         } else if (item.ordered) {
                                                             // Ordered - mark as arrived
-                                                            updatedItems[itemIndex] = { ...updatedItems[itemIndex], arrived: true };
+                                                            changeItem(itemIndex, { arrived: true });
                                                         } else {
                                                             // Not ordered - mark as ordered
-                                                            updatedItems[itemIndex] = { ...updatedItems[itemIndex], ordered: true };
+                                                            changeItem(itemIndex, { ordered: true });
                                                         }
-                                                        onUpdate(job.id, { items: updatedItems });
                                                     }}
                                                     className={`flex items-center justify-between gap-3 py-2 px-2 -mx-2 rounded-lg border-b border-subtle last:border-b-0 transition-all
                                                         ${isClickable ? 'cursor-pointer hover:bg-white/5' : ''}
@@ -2145,12 +2172,13 @@ function JobDetails({
                                             <button
                                                 onClick={() => {
                                                     if (timelineNoteText.trim()) {
-                                                        const newTimeline = [...(job.timeline || []), {
-                                                            stage: job.stage,
-                                                            timestamp: new Date().toISOString(),
-                                                            label: `📝 ${timelineNoteText.trim()}`
-                                                        }];
-                                                        onUpdate(job.id, { timeline: newTimeline });
+                                                        onUpdate(job.id, {
+                                                            timeline_append: [{
+                                                                stage: job.stage,
+                                                                timestamp: new Date().toISOString(),
+                                                                label: `📝 ${timelineNoteText.trim()}`
+                                                            }]
+                                                        });
                                                         setTimelineNoteText('');
                                                         setShowTimelineNote(false);
                                                     }
@@ -2164,13 +2192,13 @@ function JobDetails({
                                     </div>
                                 )}
                                 <div className="p-5 overflow-y-auto" style={{ maxHeight: '500px' }}>
-                                    {job.timeline && job.timeline.length > 0 ? (
+                                    {timeline.length > 0 ? (
                                         <div className="space-y-3">
-                                            {[...job.timeline].reverse().map((event, idx) => (
+                                            {[...timeline].reverse().map((event, idx) => (
                                                 <div key={idx} className="flex gap-3">
                                                     <div className="flex flex-col items-center">
                                                         <div className={`w-2.5 h-2.5 rounded-full shrink-0 ${idx === 0 ? 'bg-accent' : 'bg-white/20'}`} />
-                                                        {idx < job.timeline.length - 1 && (
+                                                        {idx < timeline.length - 1 && (
                                                             <div className="w-0.5 h-full bg-white/10 mt-1" />
                                                         )}
                                                     </div>
@@ -2286,9 +2314,9 @@ function JobDetails({
                                 <CheckCircle size={24} className="text-green-400" />
                                 <div>
                                     <p className="font-bold text-green-400">Case Completed!</p>
-                                    {job.timeline && job.timeline.length > 0 && (
+                                    {job.timeline_latest && (
                                         <p className="text-xs text-muted">
-                                            Completed: {formatTimelineDate(job.timeline[job.timeline.length - 1]?.timestamp)}
+                                            Completed: {formatTimelineDate(job.timeline_latest.timestamp)}
                                         </p>
                                     )}
                                 </div>
@@ -2553,7 +2581,7 @@ export default React.memo(JobDetails, (prevProps, nextProps) => {
     if (prevProps.job?.stage !== nextProps.job?.stage) return false;
 
     // Re-render if timeline changes (new entries added)
-    if (prevProps.job?.timeline?.length !== nextProps.job?.timeline?.length) return false;
+    if (prevProps.job?.timeline_count !== nextProps.job?.timeline_count) return false;
 
     // Skip re-render if only functions changed
     return prevProps.onBack === nextProps.onBack &&
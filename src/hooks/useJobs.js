@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5001';
@@ -100,6 +100,20 @@ export const getPreparationPhase = (job) => {
     return { phase: 'pending', label: 'Pending', color: 'gray' };
 };
 
+/**
+ * Apply a /jobs/changes response to the current jobs list (newest first)
+ */
+const mergeJobChanges = (prev, { jobs: changed = [], deleted = [], full }) => {
+    if (full) return changed;
+    if (!changed.length && !deleted.length) return prev;
+    const removed = new Set(deleted);
+    const byId = new Map(prev.filter(j => !removed.has(j.id)).map(j => [j.id, j]));
+    changed.forEach(j => byId.set(j.id, j));
+    return [...byId.values()].sort((a, b) =>
+        (b.created_at || '').localeCompare(a.created_at || '') || String(b.id).localeCompare(String(a.id))
+    );
+};
+
 /**
  * Custom hook for Jobs state management
  */
@@ -109,8 +123,10 @@ export function useJobs() {
     const [error, setError] = useState(null);
     const [selectedJob, setSelectedJob] = useState(null);
     const { getAuthToken, isAuthenticated } = useAuth();
+    // Sync token from the last /jobs/changes call; later fetches only download changes
+    const syncTokenRef = useRef(null);
 
-    // Fetch all jobs
+    // Fetch jobs (everything on first load, then only what changed)
     const fetchJobs = useCallback(async () => {
         if (!isAuthenticated) return;
 
@@ -118,14 +134,19 @@ export function useJobs() {
         setError(null);
         try {
             const token = getAuthToken();
-            const response = await fetch(`${API_URL}/jobs`, {
+            const since = syncTokenRef.current ? `?since=${encodeURIComponent(syncTokenRef.current)}` : '';
+            const response = await fetch(`${API_URL}/jobs/changes${since}`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
             });
-            if (!response.ok) throw new Error('Failed to fetch jobs');
+            if (!response.ok) {
+                syncTokenRef.current = null;
+                throw new Error('Failed to fetch jobs');
+            }
             const data = await response.json();
-            setJobs(data);
+            setJobs(prev => mergeJobChanges(prev, data));
+            syncTokenRef.current = data.token;
         } catch (err) {
             setError(err.message);
         } finally {
@@ -164,7 +185,7 @@ export function useJobs() {
 
             if (!response.ok) throw new Error('Failed to create job');
             const created = await response.json();
-            setJobs(prev => [...prev, created]);
+            setJobs(prev => mergeJobChanges(prev, { jobs: [created] }));
             return created;
         } catch (err) {
             setError(err.message);
@@ -186,14 +207,19 @@ export function useJobs() {
             });
 
             if (!response.ok) throw new Error('Failed to update job');
-            const updated = await response.json();
+            // The response may only contain the changed fields, so merge it;
+            // a partial one lacks server-side counters, which a delta sync brings in
+            const changes = await response.json();
+            if (response.headers.get('X-Partial-Job')) fetchJobs();
+            const current = jobs.find(j => j.id === jobId);
+            const updated = { ...current, ...changes };
 
             // Update local state
-            setJobs(prev => prev.map(j => j.id === jobId ? updated : j));
+            setJobs(prev => prev.map(j => j.id === jobId ? { ...j, ...changes } : j));
 
             // Update selected job if it's the one being updated (unless skipSelectedUpdate is true)
             if (selectedJob?.id === jobId && !options.skipSelectedUpdate) {
-                setSelectedJob(updated);
+                setSelectedJob(prev => ({ ...prev, ...changes }));
             }
 
             return updated;
@@ -203,6 +229,77 @@ export function useJobs() {
         }
     };
 
+    // Apply a change to one job in local state, including the selected job
+    const applyToJob = (jobId, change) => {
+        setJobs(prev => prev.map(j => j.id === jobId ? change(j) : j));
+        setSelectedJob(prev => prev?.id === jobId ? change(prev) : prev);
+    };
+
+    // Add one item to a job without rewriting the other items
+    const addJobItem = async (jobId, item) => {
+        try {
+            const token = getAuthToken();
+            const response = await fetch(`${API_URL}/jobs/${jobId}/items`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Authorization': `Bearer ${token}`
+                },
+                body: JSON.stringify(item)
+            });
+
+            if (!response.ok) throw new Error('Failed to add item');
+            const created = await response.json();
+            applyToJob(jobId, j => ({ ...j, items: [...(j.items || []).filter(i => i.id !== created.id), created] }));
+            return created;
+        } catch (err) {
+            setError(err.message);
+            throw err;
+        }
+    };
+
+    // Update fields of one item (e.g. part ordered/arrived); safe to run alongside other item updates
+    const updateJobItem = async (jobId, itemId, fields) => {
+        try {
+            const token = getAuthToken();
+            const response = await fetch(`${API_URL}/jobs/${jobId}/items/${itemId}`, {
+                method: 'PATCH',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Authorization': `Bearer ${token}`
+                },
+                body: JSON.stringify(fields)
+            });
+
+            if (!response.ok) throw new Error('Failed to update item');
+            const updated = await response.json();
+            applyToJob(jobId, j => ({ ...j, items: (j.items || []).map(i => i.id === itemId ? updated : i) }));
+            return updated;
+        } catch (err) {
+            setError(err.message);
+            throw err;
+        }
+    };
+
+    // Remove one item from a job
+    const deleteJobItem = async (jobId, itemId) => {
+        try {
+            const token = getAuthToken();
+            const response = await fetch(`${API_URL}/jobs/${jobId}/items/${itemId}`, {
+                method: 'DELETE',
+                headers: {
+                    'Authorization': `Bearer ${token}`
+                }
+            });
+
+            if (!response.ok) throw new Error('Failed to delete item');
+            applyToJob(jobId, j => ({ ...j, items: (j.items || []).filter(i => i.id !== itemId) }));
+        } catch (err) {
+            setError(err.message);
+            throw err;
+        }
+    };
+
     // Delete a job
     const deleteJob = async (jobId) => {
         try {
@@ -258,12 +355,14 @@ export function useJobs() {
                 timelineLabel = '🎉 Case completed and closed.';
             }
 
-            const newTimeline = [...(job.timeline || []), {
+            return updateJob(jobId, {
                 stage: nextStage,
-                timestamp: new Date().toISOString(),
-                label: timelineLabel
-            }];
-            return updateJob(jobId, { stage: nextStage, timeline: newTimeline });
+                timeline_append: [{
+                    stage: nextStage,
+                    timestamp: new Date().toISOString(),
+                    label: timelineLabel
+                }]
+            });
         }
     };
 
@@ -283,12 +382,14 @@ export function useJobs() {
         const currentIndex = stageOrder.indexOf(job.stage);
         if (currentIndex > 0) {
             const prevStage = stageOrder[currentIndex - 1];
-            const newTimeline = [...(job.timeline || []), {
+            return updateJob(jobId, {
                 stage: prevStage,
-                timestamp: new Date().toISOString(),
-                label: `⏪ Reverted to ${STAGE_INFO[prevStage].label}.`
-            }];
-            return updateJob(jobId, { stage: prevStage, timeline: newTimeline });
+                timeline_append: [{
+                    stage: prevStage,
+                    timestamp: new Date().toISOString(),
+                    label: `⏪ Reverted to ${STAGE_INFO[prevStage].label}.`
+                }]
+            });
         }
     };
 
@@ -296,60 +397,70 @@ export function useJobs() {
     const toggleCarHere = async (jobId, currentValue = false) => {
         const job = jobs.find(j => j.id === jobId);
         const newValue = !currentValue;
-        const newTimeline = [...(job?.timeline || []), {
-            stage: job?.stage,
-            timestamp: new Date().toISOString(),
-            label: newValue ? '🚗 Vehicle arrived on site.' : '🚗 Vehicle marked as not on site.'
-        }];
-        return updateJob(jobId, { car_here: newValue, timeline: newTimeline });
+        return updateJob(jobId, {
+            car_here: newValue,
+            timeline_append: [{
+                stage: job?.stage,
+                timestamp: new Date().toISOString(),
+                label: newValue ? '🚗 Vehicle arrived on site.' : '🚗 Vehicle marked as not on site.'
+            }]
+        });
     };
 
     // Toggle parts ordered
     const togglePartsOrdered = async (jobId, currentValue = false) => {
         const job = jobs.find(j => j.id === jobId);
         const newValue = !currentValue;
-        const newTimeline = [...(job?.timeline || []), {
-            stage: job?.stage,
-            timestamp: new Date().toISOString(),
-            label: newValue ? '📦 All parts are ordered, waiting for arrival.' : '📦 Parts order cancelled.'
-        }];
-        return updateJob(jobId, { parts_ordered: newValue, timeline: newTimeline });
+        return updateJob(jobId, {
+            parts_ordered: newValue,
+            timeline_append: [{
+                stage: job?.stage,
+                timestamp: new Date().toISOString(),
+                label: newValue ? '📦 All parts are ordered, waiting for arrival.' : '📦 Parts order cancelled.'
+            }]
+        });
     };
 
     // Toggle parts arrived
     const togglePartsArrived = async (jobId, currentValue = false) => {
         const job = jobs.find(j => j.id === jobId);
         const newValue = !currentValue;
-        const newTimeline = [...(job?.timeline || []), {
-            stage: job?.stage,
-            timestamp: new Date().toISOString(),
-            label: newValue ? '✅ All parts have arrived.' : '📦 Parts marked as not arrived.'
-        }];
-        return updateJob(jobId, { parts_arrived: newValue, timeline: newTimeline });
+        return updateJob(jobId, {
+            parts_arrived: newValue,
+            timeline_append: [{
+                stage: job?.stage,
+                timestamp: new Date().toISOString(),
+                label: newValue ? '✅ All parts have arrived.' : '📦 Parts marked as not arrived.'
+            }]
+        });
     };
 
     // Toggle rental requested
     const toggleRentalRequested = async (jobId, currentValue = false) => {
         const job = jobs.find(j => j.id === jobId);
         const newValue = !currentValue;
-        const newTimeline = [...(job?.timeline || []), {
-            stage: job?.stage,
-            timestamp: new Date().toISOString(),
-            label: newValue ? '🚙 Rental has been arranged.' : '🚙 Rental request cancelled.'
-        }];
-        return updateJob(jobId, { rental_requested: newValue, timeline: newTimeline });
+        return updateJob(jobId, {
+            rental_requested: newValue,
+            timeline_append: [{
+                stage: job?.stage,
+                timestamp: new Date().toISOString(),
+                label: newValue ? '🚙 Rental has been arranged.' : '🚙 Rental request cancelled.'
+            }]
+        });
     };
 
     // Toggle customer notified
     const toggleCustomerNotified = async (jobId, currentValue = false) => {
         const job = jobs.find(j => j.id === jobId);
         const newValue = !currentValue;
-        const newTimeline = [...(job?.timeline || []), {
-            stage: job?.stage,
-            timestamp: new Date().toISOString(),
-            label: newValue ? '📞 Customer notified.' : '📞 Customer notification undone.'
-        }];
-        return updateJob(jobId, { customer_notified: newValue, timeline: newTimeline });
+        return updateJob(jobId, {
+            customer_notified: newValue,
+            timeline_append: [{
+                stage: job?.stage,
+                timestamp: new Date().toISOString(),
+                label: newValue ? '📞 Customer notified.' : '📞 Customer notification undone.'
+            }]
+        });
     };
 
     // Check if job has replace items (needs parts)
@@ -370,6 +481,79 @@ export function useJobs() {
         fetchJobs();
     }, [fetchJobs]);
 
+    // Live updates: apply job changes pushed by /jobs/stream (including other
+    // users' edits) instead of refetching. The OAuth token never goes in the
+    // URL: each connection uses a short-lived ticket from /jobs/stream/ticket,
+    // and ?since= makes the server replay anything missed meanwhile.
+    useEffect(() => {
+        if (!isAuthenticated) return;
+
+        let source = null;
+        let retryTimer = null;
+        let retryDelay = 1000;
+        let stopped = false;
+
+        const reconnect = () => {
+            if (stopped) return;
+            retryTimer = setTimeout(connect, retryDelay);
+            retryDelay = Math.min(retryDelay * 2, 60000);
+        };
+
+        const connect = async () => {
+            let ticket;
+            try {
+                const response = await fetch(`${API_URL}/jobs/stream/ticket`, {
+                    method: 'POST',
+                    headers: {
+                        'Authorization': `Bearer ${getAuthToken()}`
+                    }
+                });
+                if (!response.ok) throw new Error('Failed to get a stream ticket');
+                ({ ticket } = await response.json());
+            } catch (err) {
+                console.error("Live updates unavailable:", err);
+                reconnect();
+                return;
+            }
+            if (stopped) return;
+
+            const params = new URLSearchParams({ ticket });
+            if (syncTokenRef.current) params.set('since', syncTokenRef.current);
+            source = new EventSource(`${API_URL}/jobs/stream?${params}`);
+
+            const handle = (apply) => (event) => {
+                retryDelay = 1000;
+                if (event.lastEventId) syncTokenRef.current = event.lastEventId;
+                apply(JSON.parse(event.data));
+            };
+            const upsert = handle((job) => {
+                setJobs(prev => mergeJobChanges(prev, { jobs: [job] }));
+                setSelectedJob(prev => prev?.id === job.id ? { ...prev, ...job } : prev);
+            });
+            source.addEventListener('add', upsert);
+            source.addEventListener('modify', upsert);
+            source.addEventListener('remove', handle(({ id }) => {
+                setJobs(prev => mergeJobChanges(prev, { deleted: [id] }));
+                setSelectedJob(prev => prev?.id === id ? null : prev);
+            }));
+            source.addEventListener('resync', handle(() => fetchJobs()));
+
+            // The browser would reconnect with the same, by then expired, ticket;
+            // reconnect with a fresh one instead (after a backoff)
+            source.onerror = () => {
+                source.close();
+                reconnect();
+            };
+        };
+
+        connect();
+        return () => {
+            stopped = true;
+            clearTimeout(retryTimer);
+            if (source) source.close();
+        };
+    }, [isAuthenticated, getAuthToken, fetchJobs]);
+
     return {
         // State
         jobs,
@@ -383,6 +567,9 @@ export function useJobs() {
         createJob,
         updateJob,
         deleteJob,
+        addJobItem,
+        updateJobItem,
+        deleteJobItem,
         advanceStage,
         revertStage,
         toggleCarHere,
@@ -64,6 +64,9 @@ function DesktopLayout({ form }) {
         createJob,
         updateJob,
         deleteJob,
+        addJobItem,
+        updateJobItem,
+        deleteJobItem,
         advanceStage,
         revertStage,
         toggleCarHere,
@@ -119,7 +122,6 @@ function DesktopLayout({ form }) {
     const handleCreateJob = async (jobData = {}) => {
         try {
             const newJob = await createJob(jobData);
-            await fetchJobs(); // Refresh jobs list
             if (newJob) {
                 setSelectedJob(newJob);
             }
@@ -439,6 +441,9 @@ function DesktopLayout({ form }) {
                             job={selectedJob}
                             onBack={() => setSelectedJob(null)}
                             onUpdate={updateJob}
+                            onAddItem={addJobItem}
+                            onUpdateItem={updateJobItem}
+                            onDeleteItem={deleteJobItem}
                             onDelete={deleteJob}
                             onAdvanceStage={advanceStage}
                             onRevertStage={revertStage}
@@ -127,7 +127,6 @@ function MobileLayout({ form }) {
 
         try {
             const newJob = await createJob(data);
-            await fetchJobs();
             if (newJob) {
                 setSelectedJob(newJob);
             }